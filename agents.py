@@ -1,22 +1,27 @@
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 import numpy as np
 from models import UserProfile, Charity, DonationPlan, ImpactReport
 from nlp_processor import NLPProcessor
 from ml_engine import MLEngine
 from charity_database import CharityDatabase
+from chart_renderer import ImpactChartRenderer, draw_impact_charts
+from impact_timeline import ImpactTimeline, build_timeline, build_timelines, milestone_text, milestone_tier
+from telemetry import EventBus, default_bus
+from instrumentation import Instrumentation, default_instruments
 
 
 class OnboardingAgent:
     """Enhanced onboarding with NLP text analysis"""
 
-    def __init__(self):
+    def __init__(self, events: Optional[EventBus] = None, instruments: Optional[Instrumentation] = None):
         self.questions = self._define_questions()
-        self.nlp_processor = NLPProcessor()
+        self.instruments = instruments or default_instruments()
+        self.nlp_processor = NLPProcessor(instruments=self.instruments)
         self.ml_engine = MLEngine()
+        self.events = events or default_bus()
 
-    def _define_questions(self) -> List[Dict[str, any]]:
+    @staticmethod
+    def _define_questions() -> List[Dict[str, any]]:
         """Define onboarding questions"""
         return [
             {
@@ -79,6 +84,61 @@ class OnboardingAgent:
 
     def conduct_onboarding(self, responses: Dict[str, any]) -> UserProfile:
         """Enhanced onboarding with NLP analysis of free text"""
+        with self.instruments.stage("onboarding"):
+            return self._onboard(responses)
+
+    def _onboard(self, responses: Dict[str, any]) -> UserProfile:
+        """NLP analysis, profile and engagement prediction for one user"""
+        # NEW: NLP Analysis of free text
+        nlp_results = {}
+        if 'free_text_interests' in responses and responses['free_text_interests']:
+            if self.events.enabled:
+                self.events.emit("onboarding.nlp_started")
+            nlp_results = self.nlp_processor.extract_interests_from_text(responses['free_text_interests'])
+            if self.events.enabled:
+                self.events.emit("onboarding.nlp_analyzed",
+                                 personality_traits=list(nlp_results.get('personality_traits', {}).keys()),
+                                 keywords=nlp_results.get('keywords', []))
+
+        # Create enhanced profile
+        profile = self._build_profile(responses, nlp_results)
+
+        # NEW: ML Prediction of engagement score
+        with self.instruments.stage("predict_engagement_score"):
+            profile.predicted_engagement_score = self.ml_engine.predict_engagement_score(profile)
+        if self.events.enabled:
+            self.events.emit("onboarding.engagement_predicted", score=profile.predicted_engagement_score)
+
+        return profile
+
+    def conduct_onboarding_batch(self, responses_list: List[Dict[str, any]]) -> List[UserProfile]:
+        """Onboard many users at once with a single text pass and one model call"""
+
+        if not responses_list:
+            return []
+
+        # Analyze every non-empty free text answer in one batch
+        text_positions = [i for i, responses in enumerate(responses_list)
+                          if responses.get('free_text_interests')]
+        texts = [responses_list[i]['free_text_interests'] for i in text_positions]
+        nlp_batch = self.nlp_processor.extract_interests_from_texts(texts)
+
+        nlp_results_list = [{} for _ in responses_list]
+        for position, nlp_results in zip(text_positions, nlp_batch):
+            nlp_results_list[position] = nlp_results
+
+        profiles = [self._build_profile(responses, nlp_results)
+                    for responses, nlp_results in zip(responses_list, nlp_results_list)]
+
+        # One vectorized prediction for the whole batch
+        scores = self.ml_engine.predict_engagement_scores(profiles)
+        for profile, score in zip(profiles, scores):
+            profile.predicted_engagement_score = score
+
+        return profiles
+
+    def _build_profile(self, responses: Dict[str, any], nlp_results: Dict[str, any]) -> UserProfile:
+        """Map raw onboarding answers and NLP insights to a UserProfile"""
 
         # Traditional profile creation
         comfort_mapping = {
@@ -104,16 +164,7 @@ class OnboardingAgent:
         income_range = income_ranges[responses['income']]
         estimated_income = (income_range[0] + income_range[1]) / 2
 
-        # NEW: NLP Analysis of free text
-        nlp_results = {}
-        if 'free_text_interests' in responses and responses['free_text_interests']:
-            print("Analyzing your passions using NLP...")
-            nlp_results = self.nlp_processor.extract_interests_from_text(responses['free_text_interests'])
-            print(f"Discovered personality traits: {list(nlp_results.get('personality_traits', {}).keys())}")
-            print(f"Extracted keywords: {nlp_results.get('keywords', [])[:5]}")
-
-        # Create enhanced profile
-        profile = UserProfile(
+        return UserProfile(
             name=responses['name'],
             interests=responses['interests'],
             causes=responses['causes'],
@@ -128,37 +179,31 @@ class OnboardingAgent:
             extracted_keywords=nlp_results.get('keywords', [])
         )
 
-        # NEW: ML Prediction of engagement score
-        profile.predicted_engagement_score = self.ml_engine.predict_engagement_score(profile)
-        print(f"Predicted engagement score: {profile.predicted_engagement_score:.2f}")
-
-        return profile
-
 
 class CurationAgent:
     """Enhanced charity matching using ML and NLP"""
 
-    def __init__(self, charity_db: CharityDatabase):
+    def __init__(self, charity_db: CharityDatabase, events: Optional[EventBus] = None):
         self.charity_db = charity_db
+        self.events = events or default_bus()
 
     def find_perfect_match(self, user_profile: UserProfile) -> Optional[Charity]:
         """Find the single best charity match using ML-enhanced scoring"""
-        matches = self.charity_db.find_matches(user_profile)
+        matches = self.charity_db.find_top_k(user_profile, 1)
 
         if not matches:
             return None
 
         best_match, score = matches[0]
 
-        print(f"AI-Enhanced Perfect Match Found!")
-        print(f"Overall ML Score: {score:.1%}")
-        print(f"Charity: {best_match.name}")
-        print(f"Predicted Impact Score: {best_match.predicted_impact_score:.2f}")
-        print(f"Donor Retention Rate: {best_match.donor_retention_rate:.1%}")
-
-        # Enhanced explanation using NLP insights
-        explanation = self._generate_ai_explanation(user_profile, best_match, score)
-        print(f"AI Analysis: {explanation}")
+        if self.events.enabled:
+            # Enhanced explanation using NLP insights
+            explanation = self._generate_ai_explanation(user_profile, best_match, score)
+            self.events.emit("curation.match_found", score=score, charity_id=best_match.id,
+                             charity_name=best_match.name,
+                             predicted_impact_score=best_match.predicted_impact_score,
+                             donor_retention_rate=best_match.donor_retention_rate,
+                             explanation=explanation)
 
         return best_match
 
@@ -193,8 +238,10 @@ class CurationAgent:
 class DonationPlanningAgent:
     """ML-enhanced donation planning for optimal engagement"""
 
-    def __init__(self):
+    def __init__(self, events: Optional[EventBus] = None, instruments: Optional[Instrumentation] = None):
         self.ml_engine = MLEngine()
+        self.events = events or default_bus()
+        self.instruments = instruments or default_instruments()
 
     def create_plan(self, user_profile: UserProfile, charity: Charity) -> DonationPlan:
         """Create ML-optimized donation plan"""
@@ -203,8 +250,34 @@ class DonationPlanningAgent:
         base_amount = self._calculate_suggested_amount(user_profile)
 
         # NEW: ML optimization for maximum engagement
-        print("Optimizing donation amount using ML...")
-        optimized_amount = self.ml_engine.optimize_donation_amount(user_profile, base_amount)
+        if self.events.enabled:
+            self.events.emit("planning.optimizing")
+        plan = self._build_plan(user_profile, charity, base_amount)
+
+        if self.events.enabled:
+            self.events.emit("planning.plan_created", charity_id=charity.id, base_amount=base_amount,
+                             amount=plan.amount, frequency=plan.frequency,
+                             annual_total=plan.annual_total,
+                             impact_description=plan.impact_description,
+                             engagement_score=user_profile.predicted_engagement_score)
+
+        return plan
+
+    def create_plans(self, user_profiles: List[UserProfile], charities: List[Charity]) -> List[DonationPlan]:
+        """Plan for many user/charity pairs, without the console report"""
+        base_amounts = [self._calculate_suggested_amount(profile) for profile in user_profiles]
+        # One model call optimizes every amount
+        optimized_amounts = self.ml_engine.optimize_donation_amounts(user_profiles, base_amounts)
+        return [self._build_plan(profile, charity, base_amount, optimized_amount)
+                for profile, charity, base_amount, optimized_amount
+                in zip(user_profiles, charities, base_amounts, optimized_amounts)]
+
+    def _build_plan(self, user_profile: UserProfile, charity: Charity, base_amount: float,
+                    optimized_amount: Optional[float] = None) -> DonationPlan:
+        """Optimize the amount (unless given) and assemble the plan"""
+        if optimized_amount is None:
+            with self.instruments.stage("optimize_donation_amount"):
+                optimized_amount = self.ml_engine.optimize_donation_amount(user_profile, base_amount)
 
         # Ensure minimum requirements
         final_amount = max(optimized_amount, charity.min_donation)
@@ -218,7 +291,7 @@ class DonationPlanningAgent:
             charity, final_amount, user_profile
         )
 
-        plan = DonationPlan(
+        return DonationPlan(
             charity=charity,
             amount=final_amount,
             frequency=user_profile.preferred_frequency,
@@ -226,15 +299,6 @@ class DonationPlanningAgent:
             impact_description=impact_desc
         )
 
-        print(f"\nML-Optimized Donation Plan")
-        print(f"Original suggestion: ${base_amount:.2f}")
-        print(f"ML-optimized amount: ${final_amount:.2f} {user_profile.preferred_frequency}")
-        print(f"Annual Total: ${annual_total:.2f}")
-        print(f"Personalized Impact: {impact_desc}")
-        print(f"Engagement-optimized for your profile: {user_profile.predicted_engagement_score:.2f}")
-
-        return plan
-
     def _generate_personalized_impact_description(self, charity: Charity, amount: float, profile: UserProfile) -> str:
         """Generate AI-personalized impact description based on user psychology"""
 
@@ -307,8 +371,39 @@ class DonationPlanningAgent:
 class ImpactVisualizationAgent:
     """Creates visual impact reports and proof of donation effectiveness"""
 
+    def __init__(self, render_mode: str = "interactive", renderer: Optional[ImpactChartRenderer] = None,
+                 events: Optional[EventBus] = None, instruments: Optional[Instrumentation] = None):
+        # 'interactive' shows charts with pyplot; 'headless' renders image bytes
+        # in the background and attaches a future to ImpactReport.chart
+        if render_mode not in ("interactive", "headless"):
+            raise ValueError(f"Unknown render mode: {render_mode}")
+        self.render_mode = render_mode
+        self.instruments = instruments or default_instruments()
+        self.renderer = renderer
+        if render_mode == "headless" and renderer is None:
+            self.renderer = ImpactChartRenderer(instruments=self.instruments)
+        self.events = events or default_bus()
+
     def generate_impact_report(self, donation_plan: DonationPlan, months_donated: int = 6) -> ImpactReport:
         """Generate comprehensive impact report with visualizations"""
+        with self.instruments.stage("timeline"):
+            timeline = self._generate_timeline(donation_plan, months_donated)
+        report = self._build_report(donation_plan, months_donated, timeline)
+
+        # Generate visualizations
+        self._create_visualizations(report)
+
+        return report
+
+    def generate_impact_reports(self, plans: List[DonationPlan], months_donated: int = 6) -> List[ImpactReport]:
+        """Reports for many plans, without charts or the console summary"""
+        timelines = self.generate_timelines(plans, months_donated)
+        return [self._build_report(plan, months_donated, timeline)
+                for plan, timeline in zip(plans, timelines)]
+
+    def _build_report(self, donation_plan: DonationPlan, months_donated: int,
+                      timeline: ImpactTimeline) -> ImpactReport:
+        """Impact totals, metrics and beneficiaries for a plan"""
 
         # Calculate total impact over time
         frequency_multiplier = {"weekly": 4.33, "monthly": 1, "quarterly": 0.33}
@@ -321,10 +416,7 @@ class ImpactVisualizationAgent:
         # Estimate beneficiaries helped
         beneficiaries = self._estimate_beneficiaries(donation_plan.charity, total_donated)
 
-        # Create timeline
-        timeline = self._generate_timeline(donation_plan, months_donated)
-
-        report = ImpactReport(
+        return ImpactReport(
             charity_name=donation_plan.charity.name,
             total_donated=total_donated,
             impact_metrics=impact_metrics,
@@ -332,11 +424,6 @@ class ImpactVisualizationAgent:
             timeline=timeline
         )
 
-        # Generate visualizations
-        self._create_visualizations(report)
-
-        return report
-
     def _calculate_impact_metrics(self, charity: Charity, total_amount: float) -> Dict[str, float]:
         """Calculate concrete impact metrics"""
 
@@ -383,123 +470,52 @@ class ImpactVisualizationAgent:
         rate = beneficiary_rates.get(charity.category, 25)  # Default rate
         return int(total_amount / rate)
 
-    def _generate_timeline(self, plan: DonationPlan, months: int) -> List[Dict[str, any]]:
+    def _generate_timeline(self, plan: DonationPlan, months: int) -> ImpactTimeline:
         """Generate donation timeline with milestones"""
+        # Columnar, closed-form timeline; reads like the old list of dicts
+        return build_timeline(plan.amount, plan.frequency, months, plan.charity.category)
 
-        timeline = []
-        current_date = datetime.now()
-
-        frequency_days = {"weekly": 7, "monthly": 30, "quarterly": 90}
-        days_between = frequency_days[plan.frequency]
-
-        cumulative_amount = 0
+    def generate_timelines(self, plans: List[DonationPlan], months: int) -> List[ImpactTimeline]:
+        """Generate timelines for many plans, vectorized per donation frequency"""
+        timelines: List[Optional[ImpactTimeline]] = [None] * len(plans)
 
-        for i in range(months * (30 // days_between)):
-            donation_date = current_date - timedelta(days=i * days_between)
-            cumulative_amount += plan.amount
+        by_frequency: Dict[str, List[int]] = {}
+        for position, plan in enumerate(plans):
+            by_frequency.setdefault(plan.frequency, []).append(position)
 
-            # Add milestone events
-            milestone = None
-            if i % 5 == 4:  # Every 5th donation
-                milestone = self._generate_milestone(plan.charity, cumulative_amount)
+        for frequency, positions in by_frequency.items():
+            amounts = np.array([plans[i].amount for i in positions], dtype=np.float64)
+            categories = [plans[i].charity.category for i in positions]
+            for position, timeline in zip(positions, build_timelines(amounts, frequency, months, categories)):
+                timelines[position] = timeline
 
-            timeline.append({
-                "date": donation_date.strftime("%Y-%m-%d"),
-                "amount": plan.amount,
-                "cumulative": cumulative_amount,
-                "milestone": milestone
-            })
-
-        return list(reversed(timeline))  # Chronological order
+        return timelines
 
     def _generate_milestone(self, charity: Charity, cumulative_amount: float) -> str:
         """Generate milestone descriptions"""
-
-        milestones = {
-            "water_sanitation": [
-                "Milestone: Provided clean water for 10 people for a month!",
-                "Milestone: Supported maintenance of a water pump for a full month!",
-                "Milestone: Contributed to building a new well access point!"
-            ],
-            "education": [
-                "Milestone: Provided school supplies for an entire classroom!",
-                "Milestone: Sponsored a child's education for a full semester!",
-                "Milestone: Funded a week of teacher training!"
-            ],
-            "environment": [
-                "Milestone: Planted a small forest of 25 trees!",
-                "Milestone: Protected an acre of rainforest!",
-                "Milestone: Powered a village with solar for a month!"
-            ]
-        }
-
-        charity_milestones = milestones.get(charity.category, ["Milestone: Making a real difference!"])
-
-        # Choose milestone based on amount
-        if cumulative_amount > 200:
-            return charity_milestones[-1]
-        elif cumulative_amount > 100:
-            return charity_milestones[-2] if len(charity_milestones) > 1 else charity_milestones[0]
-        else:
-            return charity_milestones[0]
+        return milestone_text(charity.category, milestone_tier(cumulative_amount))
 
     def _create_visualizations(self, report: ImpactReport):
         """Create visual impact charts"""
 
-        # Create figure with subplots
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-        fig.suptitle(f'Your Impact with {report.charity_name}', fontsize=16, fontweight='bold')
-
-        # 1. Cumulative donations over time
-        dates = [item['date'] for item in report.timeline]
-        cumulative = [item['cumulative'] for item in report.timeline]
-
-        ax1.plot(range(len(dates)), cumulative, 'b-', linewidth=3, marker='o', markersize=4)
-        ax1.set_title('Your Donations Over Time')
-        ax1.set_xlabel('Donation Number')
-        ax1.set_ylabel('Cumulative Amount ($)')
-        ax1.grid(True, alpha=0.3)
-        ax1.fill_between(range(len(dates)), cumulative, alpha=0.3)
-
-        # 2. Impact metrics pie chart
-        if report.impact_metrics:
-            metrics_names = list(report.impact_metrics.keys())[:4]  # Top 4 metrics
-            metrics_values = [report.impact_metrics[name] for name in metrics_names]
-
-            # Clean up names for display
-            clean_names = [name.replace('_', ' ').title() for name in metrics_names]
-
-            ax2.pie(metrics_values, labels=clean_names, autopct='%1.0f', startangle=90)
-            ax2.set_title('Impact Breakdown')
-
-        # 3. Beneficiaries helped
-        ax3.bar(['People Helped'], [report.beneficiaries_helped],
-                color='green', alpha=0.7, width=0.5)
-        ax3.set_title('Lives Impacted')
-        ax3.set_ylabel('Number of Beneficiaries')
-
-        # Add value labels on bars
-        for i, v in enumerate([report.beneficiaries_helped]):
-            ax3.text(i, v + 0.1, str(int(v)), ha='center', va='bottom', fontweight='bold')
-
-        # 4. Donation frequency visualization
-        donation_amounts = [item['amount'] for item in report.timeline]
-        ax4.hist(donation_amounts, bins=10, color='purple', alpha=0.7, edgecolor='black')
-        ax4.set_title('Donation Amount Distribution')
-        ax4.set_xlabel('Donation Amount ($)')
-        ax4.set_ylabel('Frequency')
-
-        plt.tight_layout()
-        plt.show()
-
-        # Print summary statistics
-        print(f"\nImpact Summary for {report.charity_name}")
-        print(f"Total Donated: ${report.total_donated:.2f}")
-        print(f"Beneficiaries Helped: {report.beneficiaries_helped:,}")
-        print(f"Donations Made: {len(report.timeline)}")
-
-        if report.impact_metrics:
-            print(f"\nSpecific Impact:")
-            for metric, value in report.impact_metrics.items():
-                clean_name = metric.replace('_', ' ').title()
-                print(f"• {clean_name}: {value:.1f}")
\ No newline at end of file
+        if self.render_mode == "headless":
+            # Render off-thread; callers collect the bytes from report.chart
+            report.chart = self.renderer.submit(report)
+        else:
+            import matplotlib.pyplot as plt
+
+            fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+            try:
+                # Time the drawing only; show() waits on the user
+                with self.instruments.stage("render"):
+                    draw_impact_charts(fig, axes, report)
+                plt.show()
+            finally:
+                plt.close(fig)
+
+        # Report summary statistics
+        if self.events.enabled:
+            self.events.emit("impact.summary", charity_name=report.charity_name,
+                             total_donated=report.total_donated,
+                             beneficiaries_helped=report.beneficiaries_helped,
+                             donations=len(report.timeline), impact_metrics=report.impact_metrics)
\ No newline at end of file
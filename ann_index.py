@@ -0,0 +1,145 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest neighbour index for cosine similarity
+
+    Vectors are assumed unit length, so inner product equals cosine. At build
+    time a spherical k-means splits the vectors into ``n_lists`` cells; a query
+    only scans the ``n_probe`` cells whose centroids are closest to it, which
+    keeps search sublinear in the number of vectors. Small collections (below
+    ``min_train_size``) are searched exactly.
+    """
+
+    def __init__(self, dim: int, n_lists: Optional[int] = None, n_probe: int = 8,
+                 min_train_size: int = 1024, n_iter: int = 10, random_state: int = 42):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.n_iter = n_iter
+        self.random_state = random_state
+
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._positions: Dict[int, int] = {}
+
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def build(self, vectors: np.ndarray, ids: np.ndarray):
+        """Replace the index contents and train the coarse quantizer"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.vectors = vectors.copy()
+        self.ids = np.asarray(ids, dtype=np.int64).copy()
+        self.alive = np.ones(len(vectors), dtype=bool)
+        self._size = len(vectors)
+        self._positions = {int(item): position for position, item in enumerate(self.ids)}
+        self._train()
+
+    def add(self, vector: np.ndarray, item_id: int):
+        """Insert one vector, assigning it to its nearest existing cell"""
+        if item_id in self._positions:
+            raise ValueError(f"Item {item_id} is already indexed")
+
+        if self._size == len(self.vectors):
+            capacity = max(16, len(self.vectors) * 2)
+            self.vectors = self._resized(self.vectors, (capacity, self.dim))
+            self.ids = self._resized(self.ids, (capacity,))
+            self.alive = self._resized(self.alive, (capacity,))
+
+        position = self._size
+        self.vectors[position] = vector
+        self.ids[position] = item_id
+        self.alive[position] = True
+        self._positions[item_id] = position
+        self._size += 1
+
+        if self.centroids is not None:
+            cell = int(np.argmax(self.centroids @ self.vectors[position]))
+            self._lists[cell].append(position)
+            self._list_arrays.pop(cell, None)
+        elif self._size >= self.min_train_size:
+            self._train()
+
+    def remove(self, item_id: int):
+        """Drop a vector from search results"""
+        position = self._positions.pop(item_id)
+        self.alive[position] = False
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Approximate top-k (item id, cosine) pairs, best first"""
+        if k <= 0 or not self._positions:
+            return []
+
+        query = np.asarray(query, dtype=np.float32)
+        if self.centroids is None:
+            candidates = np.flatnonzero(self.alive[:self._size])
+        else:
+            n_probe = min(self.n_probe, len(self.centroids))
+            cells = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+            candidates = np.concatenate([self._list_array(int(cell)) for cell in cells])
+            candidates = candidates[self.alive[candidates]]
+
+        if len(candidates) == 0:
+            return []
+
+        similarities = self.vectors[candidates] @ query
+        if len(candidates) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-similarities[top], kind="stable")]
+
+        return [(int(item), float(score))
+                for item, score in zip(self.ids[candidates[top]], similarities[top])]
+
+    def _train(self):
+        """Fit spherical k-means centroids and fill the inverted lists"""
+        self._lists = []
+        self._list_arrays = {}
+        live = np.flatnonzero(self.alive[:self._size])
+        if len(live) < self.min_train_size:
+            self.centroids = None
+            return
+
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(self.random_state)
+        data = self.vectors[live]
+        centroids = data[rng.choice(len(data), size=n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, data)
+            empty = ~np.any(sums, axis=1)
+            sums[empty] = centroids[empty]  # Keep empty cells where they were
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        self.centroids = centroids
+        assignment = np.argmax(data @ centroids.T, axis=1)
+        self._lists = [[] for _ in range(n_lists)]
+        for position, cell in zip(live.tolist(), assignment.tolist()):
+            self._lists[cell].append(position)
+
+    def _list_array(self, cell: int) -> np.ndarray:
+        array = self._list_arrays.get(cell)
+        if array is None:
+            array = np.array(self._lists[cell], dtype=np.int64)
+            self._list_arrays[cell] = array
+        return array
+
+    @staticmethod
+    def _resized(array: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        grown = np.zeros(shape, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
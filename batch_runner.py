@@ -0,0 +1,137 @@
+import json
+import os
+from collections import deque
+from dataclasses import asdict
+from typing import Deque, Dict, Iterator, Optional, Tuple
+from cohort_runner import CohortRunner
+
+CHECKPOINT_VERSION = 1
+
+
+def read_responses(path: str, start_offset: int = 0) -> Iterator[Tuple[int, Dict[str, any]]]:
+    """Stream (end byte offset, record) for each JSONL line from ``start_offset`` on
+
+    Blank lines are skipped. A line that is not a JSON object raises
+    ValueError naming its byte offset, so the input can be fixed and the
+    run resumed.
+    """
+    with open(path, "rb") as handle:
+        handle.seek(start_offset)
+        offset = start_offset
+        for line in handle:
+            line_offset, offset = offset, offset + len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                raise ValueError(f"{path}: invalid JSON at byte {line_offset}: {error}") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}: expected a JSON object at byte {line_offset}")
+            yield offset, record
+
+
+class BatchRunner:
+    """Runs onboarding, matching and planning over a JSONL file of user responses
+
+    Records are streamed from ``input_path`` and processed by a CohortRunner
+    in bounded chunks; each result is written as one JSON line to
+    ``output_path``, in input order. Every ``checkpoint_every`` records the
+    output is flushed to disk and a checkpoint holding the input and output
+    byte offsets is replaced atomically. A new run over the same paths
+    resumes from it: the output is truncated back to the checkpointed size
+    (dropping results written after it) and reading restarts at the
+    checkpointed input offset. Memory is bounded by the runner's in-flight
+    window, whatever the input size.
+
+    Without a ``catalogue_path`` the sample charities are written once next
+    to the output, so a resumed run matches against the same catalogue.
+    """
+
+    def __init__(self, input_path: str, output_path: str, checkpoint_path: Optional[str] = None,
+                 catalogue_path: Optional[str] = None, workers: Optional[int] = None,
+                 chunk_size: int = 256, checkpoint_every: int = 10000):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+        self.catalogue_path = catalogue_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.checkpoint_every = checkpoint_every
+
+    def run(self, resume: bool = True) -> Dict[str, any]:
+        """Process the input to the end; returns the final checkpoint"""
+        checkpoint = self._load_checkpoint() if resume else None
+        if checkpoint is None:
+            checkpoint = {"version": CHECKPOINT_VERSION, "input_path": os.path.abspath(self.input_path),
+                          "catalogue_path": self._catalogue(), "input_offset": 0,
+                          "output_offset": 0, "records": 0, "complete": False}
+        if checkpoint["complete"]:
+            return checkpoint
+
+        # Offsets of records sent to the runner whose results are not written yet
+        pending: Deque[int] = deque()
+
+        def responses():
+            for end_offset, record in read_responses(self.input_path, checkpoint["input_offset"]):
+                pending.append(end_offset)
+                yield record
+
+        mode = "r+b" if os.path.exists(self.output_path) else "wb"
+        with open(self.output_path, mode) as output, \
+                CohortRunner(self.workers, self.chunk_size,
+                             catalogue_path=checkpoint["catalogue_path"]) as runner:
+            output.seek(checkpoint["output_offset"])
+            output.truncate()
+
+            since_checkpoint = 0
+            for result in runner.run(responses()):
+                output.write(json.dumps(asdict(result)).encode("utf-8") + b"\n")
+                checkpoint["input_offset"] = pending.popleft()
+                checkpoint["records"] += 1
+                since_checkpoint += 1
+                if since_checkpoint >= self.checkpoint_every:
+                    self._save_checkpoint(checkpoint, output)
+                    since_checkpoint = 0
+
+            checkpoint["complete"] = True
+            self._save_checkpoint(checkpoint, output)
+        return checkpoint
+
+    def _catalogue(self) -> str:
+        if self.catalogue_path is not None:
+            return os.path.abspath(self.catalogue_path)
+        path = os.path.abspath(self.output_path + ".catalogue")
+        from charity_database import CharityDatabase
+        from charity_catalogue import write_catalogue
+
+        write_catalogue(list(CharityDatabase().charities), path)
+        return path
+
+    def _load_checkpoint(self) -> Optional[Dict[str, any]]:
+        """The saved checkpoint, if one exists for this input"""
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as handle:
+            checkpoint = json.load(handle)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{self.checkpoint_path}: unsupported checkpoint version")
+        if checkpoint["input_path"] != os.path.abspath(self.input_path):
+            raise ValueError(f"{self.checkpoint_path} belongs to {checkpoint['input_path']}; "
+                             f"remove it or pass resume=False to start over")
+        if not os.path.exists(self.output_path) or os.path.getsize(self.output_path) < checkpoint["output_offset"]:
+            raise ValueError(f"{self.output_path} is shorter than its checkpoint")
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict[str, any], output):
+        """Make the output durable, then atomically record how far it got"""
+        output.flush()
+        os.fsync(output.fileno())
+        checkpoint["output_offset"] = output.tell()
+
+        tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as handle:
+            json.dump(checkpoint, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
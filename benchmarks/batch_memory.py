@@ -0,0 +1,62 @@
+"""Peak memory and throughput of the JSONL batch runner vs input size
+
+Writes generated response records for each --sizes entry to a temporary
+JSONL file, runs BatchRunner over it in a fresh process (in-process
+pipeline, --workers 0) and reports records per second and the process's
+peak RSS. Flat peak memory across sizes means the run streams.
+
+    python -m benchmarks.batch_memory --sizes 2000 20000 100000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generators import responses
+
+
+def child(input_path: str, output_path: str, chunk_size: int):
+    """Run one batch and print its stats as JSON"""
+    from batch_runner import BatchRunner
+
+    start = time.perf_counter()
+    checkpoint = BatchRunner(input_path, output_path, workers=0, chunk_size=chunk_size).run()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"records": checkpoint["records"], "seconds": elapsed,
+                      "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.chunk_size)
+        return
+
+    print(f"{'records':>9} {'input MB':>9} {'records/s':>10} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            input_path = os.path.join(directory, f"responses-{size}.jsonl")
+            with open(input_path, "w") as handle:
+                for record in responses(size):
+                    handle.write(json.dumps(record) + "\n")
+
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.batch_memory", "--chunk-size", str(args.chunk_size),
+                 "--child", input_path, input_path + ".out"],
+                check=True, capture_output=True, text=True).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            print(f"{stats['records']:>9} {os.path.getsize(input_path) / 1e6:>9.1f} "
+                  f"{stats['records'] / stats['seconds']:>10,.0f} {stats['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
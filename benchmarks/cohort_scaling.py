@@ -0,0 +1,54 @@
+"""Throughput of CohortRunner as worker processes are added
+
+Generates N synthetic onboarding responses and streams them through the
+matching pipeline with 1, 2, 4, ... worker processes (up to the core count),
+reporting users per second and the speedup over one worker.
+
+    python -m benchmarks.cohort_scaling --users 100000
+"""
+import argparse
+import os
+import time
+from typing import List
+
+from cohort_runner import CohortRunner
+from benchmarks.generators import responses
+
+
+def worker_counts(max_workers: int) -> List[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--catalogue", help="catalogue file (default: the sample charities)")
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'users/s':>10} {'speedup':>8}")
+    for workers in worker_counts(args.max_workers):
+        with CohortRunner(workers=workers, chunk_size=args.chunk_size,
+                          catalogue_path=args.catalogue) as runner:
+            # Start the pool (and load models in every worker) before timing
+            for _ in runner.run(responses(workers * args.chunk_size, seed=1)):
+                pass
+
+            start = time.perf_counter()
+            processed = sum(1 for _ in runner.run(responses(args.users)))
+            elapsed = time.perf_counter() - start
+
+        throughput = processed / elapsed
+        baseline = baseline or throughput
+        print(f"{workers:>8} {elapsed:>9.2f} {throughput:>10.0f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compiled forests vs sklearn: prediction parity and latency
+
+Checks that MLEngine's compiled engagement and donation-amount forests give
+exactly sklearn's predictions on --rows random feature rows (exit status 1
+otherwise), including the generated single-row code, then times single-row
+prediction (p50/p99 over --number calls) and batch throughput for both.
+Finally times MLEngine's own single-profile calls, feature extraction
+included, on generated users.
+
+    python -m benchmarks.forest_latency --rows 5000 --number 2000
+"""
+import argparse
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from agents import OnboardingAgent
+from ml_engine import MLEngine
+from benchmarks.generators import responses
+
+
+def latencies(predict: Callable, rows: np.ndarray, number: int) -> np.ndarray:
+    samples: List[float] = []
+    for i in range(number):
+        row = rows[i % len(rows)][np.newaxis, :]
+        start = time.perf_counter()
+        predict(row)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1e6
+
+
+def rows_per_second(predict: Callable, rows: np.ndarray) -> float:
+    start = time.perf_counter()
+    predict(rows)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="random rows for the parity check")
+    parser.add_argument("--number", type=int, default=2000, help="single-row timing calls")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = MLEngine()
+    rng = np.random.default_rng(args.seed)
+    forests = {
+        "engagement": (engine.engagement_model, engine.engagement_forest),
+        "donation_amount": (engine.donation_amount_model, engine.donation_amount_forest),
+    }
+
+    mismatches = 0
+    for name, (model, compiled) in forests.items():
+        rows = rng.random((args.rows, compiled.n_features))
+        expected = model.predict(rows)
+        batch = compiled.predict(rows)
+        single = np.array([compiled.predict(row) for row in rows[:500]]).ravel()
+        generated = np.array([compiled.predict_row(row) for row in rows.tolist()])
+        mismatches += (int(np.sum(batch != expected)) + int(np.sum(single != expected[:500]))
+                       + int(np.sum(generated != expected)))
+        print(f"{name}: {compiled.n_trees} trees, {compiled.node_count} nodes, "
+              f"depth {compiled.max_depth}, max abs diff {np.abs(batch - expected).max():.3g}, "
+              f"row code {'loaded' if compiled.has_row_code else 'absent'}")
+
+        # Warm both paths before timing
+        model.predict(rows[:1])
+        compiled.predict(rows[:1])
+        print(f"  {'single row':<12} {'p50 us':>10} {'p99 us':>10}")
+        for label, predict, number in (("sklearn", model.predict, max(1, args.number // 20)),
+                                       ("compiled", compiled.predict, args.number),
+                                       ("predict_row", lambda row: compiled.predict_row(row[0]), args.number)):
+            micros = latencies(predict, rows, number)
+            print(f"  {label:<12} {np.percentile(micros, 50):>10.1f} {np.percentile(micros, 99):>10.1f}")
+
+        print(f"  {'batch rows':<12} {'sklearn/s':>10} {'compiled/s':>10}")
+        for size in (8, 64, 256, 2048):
+            print(f"  {size:<12} {rows_per_second(model.predict, rows[:size]):>10,.0f} "
+                  f"{rows_per_second(compiled.predict, rows[:size]):>10,.0f}")
+
+    users = OnboardingAgent().conduct_onboarding_batch(list(responses(200, seed=args.seed)))
+    print(f"\n{'MLEngine, one profile':<26} {'p50 us':>10} {'p99 us':>10}")
+    for label, call in (("predict_engagement_score", engine.predict_engagement_score),
+                        ("optimize_donation_amount", lambda user: engine.optimize_donation_amount(user, 25.0))):
+        for user in users[:20]:
+            call(user)
+        samples = []
+        for i in range(args.number):
+            user = users[i % len(users)]
+            start = time.perf_counter()
+            call(user)
+            samples.append(time.perf_counter() - start)
+        micros = np.array(samples) * 1e6
+        print(f"{label:<26} {np.percentile(micros, 50):>10.1f} {np.percentile(micros, 99):>10.1f}")
+
+    print(f"\nparity: {'ok' if mismatches == 0 else f'{mismatches} mismatches'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
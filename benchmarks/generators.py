@@ -0,0 +1,90 @@
+"""Deterministic synthetic charities and onboarding responses for the benchmarks
+
+The vocabulary comes from the app itself: charities reuse the categories,
+descriptions, tags and impact metrics of the sample charities in
+CharityDatabase._initialize_charities, and responses draw from the option
+lists of OnboardingAgent._define_questions. The same arguments always give
+the same data, so timings are comparable between commits.
+"""
+import random
+from typing import Dict, Iterator, List
+
+from models import Charity
+from agents import OnboardingAgent
+from charity_database import CharityDatabase
+
+PASSAGES = [
+    "I care deeply about children getting a good education and school supplies.",
+    "Climate change and protecting forests and wildlife matter a lot to me.",
+    "I want to help families facing hunger in my local community.",
+    "Clean water and sanitation are basic rights that everyone deserves.",
+    "I volunteer at an animal rescue and love supporting conservation work.",
+    "Injustice makes me angry and I want to drive systemic change.",
+]
+
+SAMPLE_CHARITIES = CharityDatabase._initialize_charities()
+LOCATIONS = list(dict.fromkeys(charity.location for charity in SAMPLE_CHARITIES))
+# Every tag of the sample charities, in first-seen order
+TAGS = list(dict.fromkeys(tag for charity in SAMPLE_CHARITIES for tag in charity.tags))
+
+QUESTIONS = {question["id"]: question for question in OnboardingAgent._define_questions()}
+
+
+def charities(count: int, seed: int = 0) -> List[Charity]:
+    """``count`` charities modelled on the samples, with shuffled tags and scores
+
+    Each one copies a sample's category, description and impact metrics,
+    keeps that sample's first tag and draws four more from the shared tag
+    vocabulary.
+    """
+    rng = random.Random(seed)
+    generated = []
+    for i in range(count):
+        template = rng.choice(SAMPLE_CHARITIES)
+        other_tags = [tag for tag in TAGS if tag != template.tags[0]]
+        generated.append(Charity(
+            id=f"{template.category}_{i:07d}",
+            name=f"{template.name} {i}",
+            category=template.category,
+            description=template.description,
+            location=rng.choice(LOCATIONS),
+            efficiency_score=round(rng.uniform(60, 99), 1),
+            tags=[template.tags[0]] + rng.sample(other_tags, 4),
+            min_donation=float(rng.randint(3, 20)),
+            impact_metrics=dict(template.impact_metrics),
+            success_stories=[f"Thanks to donations, we helped {rng.randint(100, 1000)} people this month",
+                             f"Your support made possible {rng.randint(10, 50)} new projects"],
+            donor_retention_rate=rng.uniform(0.7, 0.95),
+            predicted_impact_score=rng.uniform(0.8, 1.0),
+            semantic_keywords=[],
+        ))
+    return generated
+
+
+def responses(count: int, seed: int = 0) -> Iterator[Dict[str, any]]:
+    """Onboarding answers in the shape main() uses, with two free-text passages each"""
+    rng = random.Random(seed)
+    options = {question_id: question.get("options") for question_id, question in QUESTIONS.items()}
+    income_levels = len(QUESTIONS["income"]["ranges"])
+    for i in range(count):
+        yield {
+            'name': f"User {i}",
+            'free_text_interests': ' '.join(rng.sample(PASSAGES, 2)),
+            'interests': rng.sample(options["interests"], rng.randint(1, 5)),
+            'causes': rng.sample(options["causes"], rng.randint(1, 3)),
+            'income': rng.randrange(income_levels),
+            'comfort_level': rng.choice(options["comfort_level"]),
+            'frequency': rng.choice(options["frequency"]),
+            'geography': rng.choice(options["geography"]),
+        }
+
+
+def free_texts(count: int, passages: int, seed: int = 0) -> List[str]:
+    """Free-text answers of ``passages`` passages each, for text-length sweeps
+
+    Passages are drawn with replacement from PASSAGES, so short answers
+    repeat: one-passage answers take only six values. Clear any per-text
+    cache between timed calls.
+    """
+    rng = random.Random(seed)
+    return [' '.join(rng.choices(PASSAGES, k=passages)) for _ in range(count)]
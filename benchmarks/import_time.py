@@ -0,0 +1,93 @@
+"""Import-time report and regression guard for the Python entry points
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter,
+summarizes the slowest imports, and fails when a heavy library is pulled in at
+import time or the total exceeds a budget.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --module agents --budget-ms 400 --json out.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that must only load on first use, never on import
+DEFERRED_LIBRARIES = ("matplotlib", "sklearn", "scipy", "textblob", "nltk", "joblib", "pandas")
+
+_LINE_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str, runs: int = 5) -> Dict[str, object]:
+    """Import a module in fresh interpreters and keep the fastest run"""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        entries = []
+        for line in result.stderr.splitlines():
+            match = _LINE_PATTERN.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                entries.append({
+                    "module": name,
+                    "self_us": int(self_us),
+                    "cumulative_us": int(cumulative_us),
+                    "depth": (len(indent) - 1) // 2,
+                })
+        total = next(e["cumulative_us"] for e in reversed(entries) if e["module"] == module)
+        if best is None or total < best["total_us"]:
+            best = {"module": module, "total_us": total, "entries": entries}
+    return best
+
+
+def deferred_violations(entries: List[Dict[str, object]]) -> List[str]:
+    """Heavy top-level packages that were imported eagerly"""
+    imported = {entry["module"].split(".")[0] for entry in entries}
+    return sorted(imported & set(DEFERRED_LIBRARIES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=500.0,
+                        help="fail when the import takes longer than this")
+    parser.add_argument("--json", help="write the full report to this path")
+    args = parser.parse_args()
+
+    report = measure(args.module, args.runs)
+    violations = deferred_violations(report["entries"])
+    report["deferred_violations"] = violations
+    report["budget_ms"] = args.budget_ms
+
+    print(f"import {args.module}: {report['total_us'] / 1000:.1f} ms (best of {args.runs})")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    slowest = sorted(report["entries"], key=lambda e: e["cumulative_us"], reverse=True)[:args.top]
+    for entry in slowest:
+        print(f"{entry['cumulative_us'] / 1000:14.1f} {entry['self_us'] / 1000:9.1f}  {entry['module']}")
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+    failed = False
+    if violations:
+        print(f"FAIL: imported eagerly: {', '.join(violations)}")
+        failed = True
+    if report["total_us"] / 1000 > args.budget_ms:
+        print(f"FAIL: over budget of {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
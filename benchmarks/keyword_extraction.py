@@ -0,0 +1,52 @@
+"""Throughput of hashed TF-IDF keyword extraction
+
+Learns document frequencies from --repeat copies of the bundled corpus of
+onboarding answers, then ranks the top keywords of every answer in one
+sparse batch and one answer at a time. Also checks that ranking the same
+batch twice gives the same keywords.
+
+    python -m benchmarks.keyword_extraction --repeat 100
+"""
+import argparse
+import time
+from typing import Callable
+
+from keyword_extractor import KeywordExtractor
+from nlp_processor import NLPProcessor
+from benchmarks.sentiment_accuracy import load_corpus
+
+
+def rate(run: Callable[[], object], documents: int) -> float:
+    start = time.perf_counter()
+    run()
+    return documents / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100, help="corpus copies per timing run")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    clean = NLPProcessor()._clean_text
+    extractor = KeywordExtractor(top_k=args.top_k)
+    token_lists = [extractor.tokens(clean(text)) for text in load_corpus()] * args.repeat
+
+    results = {
+        "partial_fit": rate(lambda: extractor.partial_fit(token_lists), len(token_lists)),
+        "transform (batch)": rate(lambda: extractor.transform(token_lists), len(token_lists)),
+        "transform (single)": rate(lambda: [extractor.transform([tokens]) for tokens in token_lists],
+                                   len(token_lists)),
+    }
+    print(f"documents: {len(token_lists)}, documents seen: {extractor.n_documents}")
+    print(f"\n{'step':<20} {'docs/s':>12}")
+    for name, docs_per_second in results.items():
+        print(f"{name:<20} {docs_per_second:>12,.0f}")
+
+    deterministic = extractor.transform(token_lists) == extractor.transform(token_lists)
+    print(f"\ndeterministic ranking: {deterministic}")
+    print(f"example: {extractor.transform(token_lists[:1])[0]}")
+
+
+if __name__ == "__main__":
+    main()
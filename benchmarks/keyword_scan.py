@@ -0,0 +1,78 @@
+"""Keyword scanner vs per-keyword substring scans
+
+Times text analysis on free-text answers of growing length (built from the
+bundled corpus): keyword extraction plus personality, emotional-driver and
+category detection. The baseline runs the original ``keyword in text`` loop
+over every keyword of every table; NLPProcessor scans the answer's words once
+with KeywordScanner, sharing the tokenization with keyword extraction. The
+scan alone, tokenization included, is timed too. Also lists the corpus
+answers where the two disagree: substring false positives such as "care"
+inside "career" or "help" inside "helpless", and inflections a substring
+misses such as "families".
+
+    python -m benchmarks.keyword_scan
+"""
+import argparse
+import timeit
+from typing import Dict, List
+
+from nlp_processor import NLPProcessor
+from benchmarks.sentiment_accuracy import load_corpus
+
+
+def substring_scan(processor: NLPProcessor, text: str) -> Dict[str, Dict[str, int]]:
+    """The original approach: one substring search per keyword"""
+    tables = {'personality': processor.personality_keywords,
+              'emotion': processor.emotional_patterns,
+              'category': processor.category_themes}
+    return {table: {label: sum(1 for keyword in keywords if keyword in text)
+                    for label, keywords in labels.items()}
+            for table, labels in tables.items()}
+
+
+def scanner_scan(processor: NLPProcessor, text: str) -> Dict[str, Dict[str, int]]:
+    matches = processor.keyword_scanner.scan(text)
+    return {table: matches.counts(table) for table in ('personality', 'emotion', 'category')}
+
+
+def substring_analysis(processor: NLPProcessor, text: str):
+    """Keyword extraction followed by the original per-keyword scans"""
+    processor._extract_keywords(text)
+    return substring_scan(processor, text)
+
+
+def scanner_analysis(processor: NLPProcessor, text: str):
+    """NLPProcessor's analysis, minus sentiment"""
+    return processor._analyze(text, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="timing iterations per text")
+    args = parser.parse_args()
+
+    processor = NLPProcessor()
+    corpus = [processor._clean_text(text) for text in load_corpus()]
+
+    for title, baseline, candidate in (("analysis", substring_analysis, scanner_analysis),
+                                       ("scan only", substring_scan, scanner_scan)):
+        print(f"\n{title}\n{'chars':>8} {'substring us':>13} {'scanner us':>11} {'speedup':>8}")
+        for answers in (1, 5, 20, 60, len(corpus)):
+            text = ' '.join(corpus[:answers])
+            # Fresh strings (and so fresh word hashes) for every call
+            texts = [text + ' ' for _ in range(args.number)]
+            substring = timeit.timeit(lambda: baseline(processor, texts.pop()), number=args.number)
+            texts = [text + ' ' for _ in range(args.number)]
+            scanner = timeit.timeit(lambda: candidate(processor, texts.pop()), number=args.number)
+            print(f"{len(text):>8} {substring / args.number * 1e6:>13.1f} "
+                  f"{scanner / args.number * 1e6:>11.1f} {substring / scanner:>7.1f}x")
+
+    differences: List[str] = [text for text in corpus
+                              if substring_scan(processor, text) != scanner_scan(processor, text)]
+    print(f"\n{len(differences)} of {len(corpus)} answers differ, e.g.:")
+    for text in differences[:5]:
+        print(f"  {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Local load test for the matching HTTP service
+
+Starts MatchingService on an ephemeral port (or targets --host/--port of a
+running one), opens --concurrency keep-alive connections and sends --requests
+POST /match requests in total. A --duplicate-rate share of them reuse a few
+popular profiles, which exercises request coalescing. Reports requests per
+second, p50/p99 latency and the service's own counters.
+
+    python -m benchmarks.load_test --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.generators import responses
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+                  method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+    """One request over an open keep-alive connection"""
+    payload = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n")
+                 .encode("latin-1") + payload)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length) if length else b""
+    return status, json.loads(data) if data else {}
+
+
+def match_bodies(count: int, duplicate_rate: float, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    popular = [{"responses": answers, "k": 5} for answers in responses(4, seed=seed + 1)]
+    unique = responses(count, seed=seed)
+    return [rng.choice(popular) if rng.random() < duplicate_rate else {"responses": next(unique), "k": 5}
+            for _ in range(count)]
+
+
+async def run(host: str, port: int, bodies: List[Dict], concurrency: int) -> Tuple[List[float], int]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for body in bodies:
+        queue.put_nowait(body)
+    latencies: List[float] = []
+    failures = 0
+
+    async def client():
+        nonlocal failures
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while not queue.empty():
+                body = queue.get_nowait()
+                start = time.perf_counter()
+                status, _ = await request(reader, writer, host, "POST", "/match", body)
+                latencies.append(time.perf_counter() - start)
+                failures += status != 200
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, failures
+
+
+async def main_async(args):
+    service = server = None
+    host, port = args.host, args.port
+    if port is None:
+        from service import MatchingService
+
+        service = MatchingService(max_workers=args.workers)
+        server = await service.start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    try:
+        # Warm up models and caches before timing
+        await run(host, port, match_bodies(args.concurrency, 0.0, seed=99), args.concurrency)
+
+        bodies = match_bodies(args.requests, args.duplicate_rate)
+        start = time.perf_counter()
+        latencies, failures = await run(host, port, bodies, args.concurrency)
+        elapsed = time.perf_counter() - start
+
+        milliseconds = np.array(latencies) * 1000
+        print(f"requests:     {len(latencies)} ({failures} failed)")
+        print(f"concurrency:  {args.concurrency}")
+        print(f"throughput:   {len(latencies) / elapsed:.0f} req/s")
+        print(f"latency p50:  {np.percentile(milliseconds, 50):.1f} ms")
+        print(f"latency p99:  {np.percentile(milliseconds, 99):.1f} ms")
+
+        reader, writer = await asyncio.open_connection(host, port)
+        _, stats = await request(reader, writer, host, "GET", "/stats")
+        writer.close()
+        await writer.wait_closed()
+        print(f"service:      {stats['service']}")
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="target a running service instead of starting one")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=2, help="executor threads of the local service")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""find_matches latency with and without the match cache, and what the cache holds
+
+Onboards --users generated users, then replays --calls profiles drawn from
+them (so repeat visitors hit the cache) against a catalogue of each
+--charities size, once with caching off and once with a fresh MatchCache.
+Prints p50/p95 per call, the hit rate and the bytes held per entry.
+
+    python -m benchmarks.match_cache --charities 100 1000 10000 --users 300 --calls 1000
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from agents import OnboardingAgent
+from charity_catalogue import write_catalogue
+from charity_database import CharityDatabase
+from match_cache import MatchCache
+from benchmarks.generators import charities, responses
+from benchmarks.suite import time_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--charities", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--users", type=int, default=300, help="distinct generated users")
+    parser.add_argument("--calls", type=int, default=1000, help="timed find_matches calls")
+    args = parser.parse_args()
+
+    users = OnboardingAgent().conduct_onboarding_batch(list(responses(args.users, seed=1)))
+    rng = random.Random(4)
+    profiles = [rng.choice(users) for _ in range(args.calls)]
+
+    print(f"{'charities':>9} {'cache':>6} {'p50 us':>9} {'p95 us':>9} {'hit rate':>9} {'KiB/entry':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.charities:
+            path = os.path.join(directory, f"charities-{size}.cat")
+            write_catalogue(charities(size), path)
+            for cache in (None, MatchCache()):
+                charity_db = CharityDatabase(path)
+                charity_db.match_cache = cache
+                timing = time_calls(charity_db.find_matches, profiles)
+                info = charity_db.match_cache_info()
+                hit_rate = f"{info['hit_rate']:.1%}" if info else "-"
+                per_entry = f"{info['bytes'] / info['size'] / 1024:.1f}" if info.get("size") else "-"
+                print(f"{size:>9} {'on' if cache is not None else 'off':>6} {timing['p50_us']:>9.1f} "
+                      f"{timing['p95_us']:>9.1f} {hit_rate:>9} {per_entry:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Memory footprint of Charity/UserProfile dataclasses vs their compact variants
+
+Builds N charities and N user profiles from JSON records (so every string is a
+separate object, as when loading a real catalogue), measures the retained
+allocation with tracemalloc, and repeats with CompactCharity and
+CompactUserProfile.
+
+    python -m benchmarks.model_memory --count 100000
+"""
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from typing import Callable, Dict, List
+
+from models import Charity, UserProfile, CompactCharity, CompactUserProfile
+
+TAGS = ["water", "health", "global", "sustainability", "children", "education", "literacy",
+        "opportunity", "local", "environment", "climate", "forests", "renewable", "future",
+        "hunger", "nutrition", "families", "emergency", "animals", "wildlife", "conservation",
+        "rescue", "habitat"]
+CATEGORIES = ["water_sanitation", "education", "environment", "hunger", "animals"]
+LOCATIONS = ["global", "national", "local"]
+INTERESTS = ["health", "education", "environment", "animals", "technology",
+             "arts", "sports", "children", "elderly", "community"]
+CAUSES = ["Water & Sanitation", "Education", "Environment", "Hunger Relief",
+          "Animal Welfare", "Healthcare", "Disaster Relief", "Human Rights"]
+TRAITS = ["empathetic", "analytical", "activist", "community-oriented", "global-minded"]
+
+
+def charity_records(count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return json.dumps([
+        {
+            "id": f"charity_{i:07d}",
+            "name": f"Charity {i}",
+            "category": rng.choice(CATEGORIES),
+            "description": f"Charity {i} provides programs for communities in need worldwide",
+            "location": rng.choice(LOCATIONS),
+            "efficiency_score": round(rng.uniform(60, 99), 1),
+            "tags": rng.sample(TAGS, 5),
+            "min_donation": float(rng.randint(3, 20)),
+            "impact_metrics": {"$5": "provides a meal", "$25": "funds a week", "$100": "builds a well"},
+            "description_embedding": [rng.random() for _ in range(50)],
+            "success_stories": [f"We helped {rng.randint(100, 1000)} people this month",
+                                f"Your support made possible {rng.randint(10, 50)} new projects"],
+            "donor_retention_rate": rng.uniform(0.7, 0.95),
+            "predicted_impact_score": rng.uniform(0.8, 1.0),
+            "semantic_keywords": rng.sample(TAGS, 3),
+        }
+        for i in range(count)
+    ])
+
+
+def profile_records(count: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    return json.dumps([
+        {
+            "name": f"User {i}",
+            "interests": rng.sample(INTERESTS, 4),
+            "causes": rng.sample(CAUSES, 2),
+            "monthly_income": rng.choice([1000.0, 3000.0, 5000.0, 8000.0]),
+            "donation_comfort_level": rng.choice(["low", "medium", "high"]),
+            "preferred_frequency": rng.choice(["weekly", "monthly", "quarterly"]),
+            "geographic_preference": rng.choice(LOCATIONS),
+            "personality_traits": {trait: rng.random() for trait in TRAITS},
+            "emotional_drivers": rng.sample(["injustice", "empathy", "hope", "responsibility"], 2),
+            "giving_history_sentiment": rng.uniform(-1, 1),
+            "extracted_keywords": rng.sample(TAGS, 6),
+            "predicted_engagement_score": rng.random(),
+        }
+        for i in range(count)
+    ])
+
+
+def retained_bytes(records_json: str, build: Callable[[Dict], object]) -> int:
+    """Bytes still allocated after building objects from parsed records"""
+    gc.collect()
+    tracemalloc.start()
+    records: List[Dict] = json.loads(records_json)
+    objects = [build(record) for record in records]
+    # Parsed records are dropped; only what the objects keep stays allocated
+    del records
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--json", help="write results to this path")
+    args = parser.parse_args()
+
+    charities_json = charity_records(args.count)
+    profiles_json = profile_records(args.count)
+
+    results = {
+        "count": args.count,
+        "charity_bytes": retained_bytes(charities_json, lambda r: Charity(**r)),
+        "compact_charity_bytes": retained_bytes(charities_json, lambda r: CompactCharity(**r)),
+        "profile_bytes": retained_bytes(profiles_json, lambda r: UserProfile(**r)),
+        "compact_profile_bytes": retained_bytes(profiles_json, lambda r: CompactUserProfile(**r)),
+    }
+
+    for kind in ("charity", "profile"):
+        full, compact = results[f"{kind}_bytes"], results[f"compact_{kind}_bytes"]
+        print(f"{kind:>8}: {full / args.count:8.0f} B/object -> {compact / args.count:8.0f} B/object "
+              f"({full / compact:.1f}x smaller, {full / 2**20:.0f} MiB -> {compact / 2**20:.0f} MiB)")
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
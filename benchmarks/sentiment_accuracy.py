@@ -0,0 +1,77 @@
+"""Accuracy vs throughput of the sentiment backends against TextBlob
+
+Scores the bundled corpus of onboarding answers (benchmarks/data/
+sentiment_corpus.txt), cleaned the way NLPProcessor cleans them, with
+TextBlob and with the compiled-lexicon backend. Reports agreement with
+TextBlob (mean/max absolute error, sign agreement) and texts per second for
+TextBlob, a cold lexicon batch and the cached lexicon backend. ``--raw``
+scores the uncleaned text instead, which exercises the punctuation and "!"
+handling; the corpus ends with a sentence whose sign flipped when the
+lexicon backend left "good," unsplit.
+
+    python -m benchmarks.sentiment_accuracy --repeat 20
+"""
+import argparse
+import os
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from nlp_processor import NLPProcessor
+from sentiment import CachedSentiment, LexiconSentiment, TextBlobSentiment
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sentiment_corpus.txt")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[str]:
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip() and not line.startswith("#")]
+
+
+def throughput(score: Callable[[List[str]], List[float]], texts: List[str]) -> float:
+    start = time.perf_counter()
+    score(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="corpus copies per timing run")
+    parser.add_argument("--raw", action="store_true", help="score uncleaned text")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if not args.raw:
+        clean = NLPProcessor()._clean_text
+        corpus = [clean(text) for text in corpus]
+
+    reference = np.array(TextBlobSentiment().polarities(corpus))
+    lexicon = LexiconSentiment()
+    scores = np.array(lexicon.polarities(corpus))  # also loads the compiled lexicon
+
+    errors = np.abs(scores - reference)
+    print(f"corpus:            {len(corpus)} texts ({'raw' if args.raw else 'cleaned'})")
+    print(f"mean abs error:    {errors.mean():.6f}")
+    print(f"max abs error:     {errors.max():.6f}")
+    print(f"exact matches:     {np.mean(errors < 1e-12):.1%}")
+    print(f"sign agreement:    {np.mean(np.sign(scores) == np.sign(reference)):.1%}")
+
+    # Distinct texts so the timings measure scoring, not caching
+    texts = [f"{text} {'again ' * (copy % 7)}".strip()
+             for copy in range(args.repeat) for text in corpus]
+    cached = CachedSentiment(LexiconSentiment(lexicon.lexicon), maxsize=len(texts))
+    cached.polarities(texts)
+
+    results = {
+        "textblob": throughput(TextBlobSentiment().polarities, texts),
+        "lexicon (batch)": throughput(lexicon.polarities, texts),
+        "lexicon (cached)": throughput(cached.polarities, texts),
+    }
+    print(f"\n{'backend':<18} {'texts/s':>12} {'speedup':>9}")
+    for name, rate in results.items():
+        print(f"{name:<18} {rate:>12,.0f} {rate / results['textblob']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Per-stage latency of the single-user path, and what recording it costs
+
+Runs --requests generated users through onboarding, perfect match and the
+donation plan with instrumentation enabled and disabled (interleaved, best
+of --repeat), reports the per-request overhead, then prints p50/p95/p99 of
+every stage. With --profile STAGE the stage is also sampled every
+--every calls and its cProfile report printed.
+
+    python -m benchmarks.stage_latency --requests 500 --profile find_top_k
+"""
+import argparse
+import time
+from typing import Callable, Dict
+
+from agents import OnboardingAgent, CurationAgent, DonationPlanningAgent
+from charity_database import CharityDatabase
+from instrumentation import Instrumentation
+from benchmarks.generators import responses
+
+
+def request_runner(instruments: Instrumentation) -> Callable[[Dict], None]:
+    """One user through onboarding, perfect match and plan, timed by ``instruments``"""
+    charity_db = CharityDatabase(instruments=instruments)
+    onboarding = OnboardingAgent(instruments=instruments)
+    curation = CurationAgent(charity_db)
+    planning = DonationPlanningAgent(instruments=instruments)
+
+    def request(answers):
+        with instruments.stage("request"):
+            profile = onboarding.conduct_onboarding(answers)
+            match = curation.find_perfect_match(profile)
+            if match is not None:
+                planning.create_plan(profile, match)
+    return request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs, best is kept")
+    parser.add_argument("--profile", metavar="STAGE", action="append", default=[])
+    parser.add_argument("--every", type=int, default=10, help="profile every n-th call of a stage")
+    args = parser.parse_args()
+
+    users = list(responses(args.requests))
+    instruments = {"disabled": Instrumentation(enabled=False), "enabled": Instrumentation()}
+    runners = {name: request_runner(instrumentation) for name, instrumentation in instruments.items()}
+    for run in runners.values():  # warm caches and models
+        for answers in users[:20]:
+            run(answers)
+
+    # Interleave so drift affects both alike
+    best = {name: float("inf") for name in runners}
+    for _ in range(args.repeat):
+        instruments["enabled"].reset()
+        for name, run in runners.items():
+            start = time.perf_counter()
+            for answers in users:
+                run(answers)
+            best[name] = min(best[name], time.perf_counter() - start)
+    micros = {name: seconds / len(users) * 1e6 for name, seconds in best.items()}
+    print(f"instrumentation disabled {micros['disabled']:.1f}us/request, enabled {micros['enabled']:.1f}us "
+          f"({micros['enabled'] - micros['disabled']:+.1f}us)")
+
+    print(f"\n{'stage':<26} {'count':>6} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    for name, summary in instruments["enabled"].snapshot().items():
+        print(f"{name:<26} {summary['count']:>6} {summary['p50'] * 1e6:>9.1f} "
+              f"{summary['p95'] * 1e6:>9.1f} {summary['p99'] * 1e6:>9.1f}")
+
+    if args.profile:
+        profiled = Instrumentation()
+        for stage in args.profile:
+            profiled.profile(stage, every=args.every, memory=True)
+        run = request_runner(profiled)
+        for answers in users:
+            run(answers)
+        for profiler in profiled.profilers.values():
+            print()
+            print(profiler.report(limit=15))
+
+
+if __name__ == "__main__":
+    main()
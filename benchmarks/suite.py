@@ -0,0 +1,229 @@
+"""Latency of every hot path across input sizes, saved as JSON for comparing commits
+
+Times single calls of find_matches (per catalogue size),
+extract_interests_from_text (per free-text length), predict_engagement_score,
+create_plan, _generate_timeline (per months simulated) and the end-to-end
+pipeline of onboarding, match, plan and impact report (per catalogue size).
+Inputs come from benchmarks.generators, so every run sees the same data.
+Each benchmark warms up on inputs of its own, so the timed calls don't hit
+caches the warm-up filled. The free-text sweep clears the sentiment cache
+before every call: texts repeat at short lengths, and it times the text,
+not the cache. CharityDatabase's match cache is off unless --match-cache is
+given, so find_matches stays comparable with runs from before the cache.
+Results go to --output (default benchmarks/results/<commit>.json); with
+--compare the run is printed against an earlier results file.
+
+    python -m benchmarks.suite --charities 100 1000 10000 --calls 300
+    python -m benchmarks.suite --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+from agents import OnboardingAgent, CurationAgent, DonationPlanningAgent, ImpactVisualizationAgent
+from charity_catalogue import write_catalogue
+from charity_database import CharityDatabase
+from ml_engine import MLEngine
+from nlp_processor import NLPProcessor
+from benchmarks.generators import charities, free_texts, responses
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BENCHMARKS = ("find_matches", "extract_interests_from_text", "predict_engagement_score",
+              "create_plan", "generate_timeline", "end_to_end")
+WARMUP_CALLS = 20
+
+
+def time_calls(call: Callable[[object], object], inputs: Sequence, warmup: Sequence = ()) -> Dict[str, float]:
+    """Time ``call`` once per input after a call per ``warmup`` input
+
+    Warm-up inputs should differ from the timed ones, or timed calls hit
+    whatever the warm-up cached. As with timeit, the garbage collector is
+    paused while timing so a collection triggered by earlier benchmarks'
+    garbage doesn't land here.
+    """
+    for item in warmup:
+        call(item)
+    seconds = np.empty(len(inputs))
+    gc.collect()
+    gc.disable()
+    try:
+        for i, item in enumerate(inputs):
+            start = time.perf_counter()
+            call(item)
+            seconds[i] = time.perf_counter() - start
+    finally:
+        gc.enable()
+    micros = seconds * 1e6
+    return {"calls": len(inputs), "mean_us": float(micros.mean()),
+            "p50_us": float(np.percentile(micros, 50)), "p95_us": float(np.percentile(micros, 95)),
+            "p99_us": float(np.percentile(micros, 99)), "per_second": len(inputs) / float(seconds.sum())}
+
+
+class Suite:
+    """Builds the shared inputs once and runs the selected benchmarks"""
+
+    def __init__(self, calls: int, charity_sizes: List[int], passage_counts: List[int],
+                 months: List[int], directory: str, match_cache: bool = False):
+        self.calls = calls
+        self.match_cache = match_cache
+        self.charity_sizes = charity_sizes
+        self.passage_counts = passage_counts
+        self.months = months
+        self.directory = directory
+        self.responses = list(responses(calls, seed=1))
+        self.warmup_responses = list(responses(WARMUP_CALLS, seed=11))
+        self.onboarding = OnboardingAgent()
+        self.profiles = self.onboarding.conduct_onboarding_batch(self.responses)
+        self.warmup_profiles = self.onboarding.conduct_onboarding_batch(self.warmup_responses)
+        self.planning = DonationPlanningAgent()
+        self.impact = ImpactVisualizationAgent(render_mode="headless")
+        self._databases: Dict[int, CharityDatabase] = {}
+
+    def database(self, size: int) -> CharityDatabase:
+        """A CharityDatabase over ``size`` generated charities, from a catalogue file
+
+        The match cache is off unless the suite was built with it, so repeat
+        profiles are scored rather than served from the cache, as before it
+        existed. benchmarks/match_cache.py times the cache itself.
+        """
+        if size not in self._databases:
+            path = os.path.join(self.directory, f"charities-{size}.cat")
+            write_catalogue(charities(size), path)
+            charity_db = CharityDatabase(path)
+            if not self.match_cache:
+                charity_db.match_cache = None
+            self._databases[size] = charity_db
+        return self._databases[size]
+
+    def find_matches(self) -> Iterator[Dict]:
+        for size in self.charity_sizes:
+            yield {"charities": size}, time_calls(self.database(size).find_matches, self.profiles,
+                                                  self.warmup_profiles)
+
+    def extract_interests_from_text(self) -> Iterator[Dict]:
+        for passages in self.passage_counts:
+            processor = NLPProcessor()
+
+            def extract(text):
+                processor.sentiment.cache.clear()
+                return processor.extract_interests_from_text(text)
+            yield {"passages": passages}, time_calls(extract, free_texts(self.calls, passages, seed=2),
+                                                     free_texts(WARMUP_CALLS, passages, seed=12))
+
+    def predict_engagement_score(self) -> Iterator[Dict]:
+        yield {}, time_calls(MLEngine().predict_engagement_score, self.profiles, self.warmup_profiles)
+
+    def create_plan(self) -> Iterator[Dict]:
+        pairs = list(zip(self.profiles, charities(self.calls, seed=3)))
+        warmup = list(zip(self.warmup_profiles, charities(WARMUP_CALLS, seed=13)))
+        yield {}, time_calls(lambda pair: self.planning.create_plan(*pair), pairs, warmup)
+
+    def generate_timeline(self) -> Iterator[Dict]:
+        plans = self.planning.create_plans(self.profiles, charities(self.calls, seed=3))
+        warmup = self.planning.create_plans(self.warmup_profiles, charities(WARMUP_CALLS, seed=13))
+        for months in self.months:
+            yield {"months": months}, time_calls(lambda plan: self.impact._generate_timeline(plan, months),
+                                                 plans, warmup)
+
+    def end_to_end(self) -> Iterator[Dict]:
+        for size in self.charity_sizes:
+            curation = CurationAgent(self.database(size))
+
+            def request(answers):
+                profile = self.onboarding.conduct_onboarding(answers)
+                match = curation.find_perfect_match(profile)
+                if match is not None:
+                    plan = self.planning.create_plan(profile, match)
+                    self.impact.generate_impact_reports([plan])
+            yield {"charities": size}, time_calls(request, self.responses, self.warmup_responses)
+
+    def run(self, names: Sequence[str]) -> Iterator[Dict]:
+        for name in names:
+            for params, timing in getattr(self, name)():
+                yield {"benchmark": name, "params": params, **timing}
+
+    def close(self):
+        self.impact.renderer.shutdown()
+
+
+def environment() -> Dict[str, str]:
+    """Commit, interpreter and machine the results were taken on"""
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD") or "unknown",
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def result_key(result: Dict) -> str:
+    params = ", ".join(f"{name}={value}" for name, value in result["params"].items())
+    return f"{result['benchmark']}({params})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300, help="timed calls per benchmark and size")
+    parser.add_argument("--charities", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--passages", type=int, nargs="+", default=[1, 4, 16],
+                        help="free-text lengths, in passages")
+    parser.add_argument("--months", type=int, nargs="+", default=[6, 24, 120])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--match-cache", action="store_true",
+                        help="keep CharityDatabase's match cache on (not comparable with uncached runs)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    report = {"environment": environment(),
+              "config": {"calls": args.calls, "charities": args.charities,
+                         "passages": args.passages, "months": args.months, "match_cache": args.match_cache},
+              "results": []}
+
+    print(f"{'benchmark':<44} {'mean us':>9} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        suite = Suite(args.calls, args.charities, args.passages, args.months, directory, args.match_cache)
+        try:
+            for result in suite.run(args.only):
+                report["results"].append(result)
+                print(f"{result_key(result):<44} {result['mean_us']:>9.1f} {result['p50_us']:>9.1f} "
+                      f"{result['p95_us']:>9.1f} {result['p99_us']:>9.1f}")
+        finally:
+            suite.close()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['environment']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        before = {result_key(result): result for result in baseline["results"]}
+        print(f"\nAgainst {baseline['environment']['commit']} ({args.compare}); ratio < 1 is faster")
+        if baseline["config"].get("match_cache", False) != args.match_cache:
+            print("Warning: match cache setting differs; find_matches and end_to_end are not comparable")
+        print(f"{'benchmark':<44} {'p50 before':>11} {'p50 now':>9} {'ratio':>7}")
+        for result in report["results"]:
+            key = result_key(result)
+            if key in before:
+                old = before[key]["p50_us"]
+                print(f"{key:<44} {old:>11.1f} {result['p50_us']:>9.1f} {result['p50_us'] / old:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
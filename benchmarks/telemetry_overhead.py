@@ -0,0 +1,83 @@
+"""Per-request cost of progress reporting: silent bus vs console vs buffered sink
+
+Runs the single-user path of run_full_process (onboarding, perfect match,
+donation plan) for --requests generated users with three event buses:
+no subscribers, the console subscriber writing to /dev/null (the old
+print() behaviour), and a BufferedJsonlSink writing to /dev/null. Reports
+microseconds per request and the overhead over the silent bus, plus the
+raw cost of one guarded emit.
+
+    python -m benchmarks.telemetry_overhead --requests 500
+"""
+import argparse
+import os
+import time
+import timeit
+from typing import Callable, Dict
+
+from agents import OnboardingAgent, CurationAgent, DonationPlanningAgent
+from charity_database import CharityDatabase
+from telemetry import EventBus, ConsoleSubscriber, BufferedJsonlSink
+from benchmarks.generators import responses
+
+
+def request_runner(events: EventBus, charity_db: CharityDatabase) -> Callable[[Dict], None]:
+    """One user through onboarding, perfect match and plan, reporting to ``events``"""
+    onboarding = OnboardingAgent(events)
+    curation = CurationAgent(charity_db, events)
+    planning = DonationPlanningAgent(events)
+
+    def request(answers):
+        profile = onboarding.conduct_onboarding(answers)
+        match = curation.find_perfect_match(profile)
+        if match is not None:
+            planning.create_plan(profile, match)
+    return request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs, best is kept")
+    args = parser.parse_args()
+
+    users = list(responses(args.requests))
+    charity_db = CharityDatabase()
+
+    with open(os.devnull, "w") as devnull:
+        sink = BufferedJsonlSink(devnull)
+        buses = {
+            "silent": EventBus(),
+            "console": EventBus([ConsoleSubscriber(devnull)]),
+            "buffered sink": EventBus([sink]),
+        }
+        runners = {name: request_runner(bus, charity_db) for name, bus in buses.items()}
+        for run in runners.values():  # warm caches and models
+            for answers in users[:20]:
+                run(answers)
+
+        # Interleave the buses in every round so drift affects them alike
+        best = {name: float("inf") for name in runners}
+        for _ in range(args.repeat):
+            for name, run in runners.items():
+                start = time.perf_counter()
+                for answers in users:
+                    run(answers)
+                best[name] = min(best[name], time.perf_counter() - start)
+        results = {name: seconds / len(users) * 1e6 for name, seconds in best.items()}
+        sink.close()
+
+        print(f"{'bus':<15} {'us/request':>11} {'overhead':>10}")
+        for name, micros in results.items():
+            print(f"{name:<15} {micros:>11.1f} {micros - results['silent']:>+9.1f}us")
+        print(f"sink: {sink.written} events written, {sink.dropped} dropped")
+
+        for name, bus in (("silent", buses["silent"]), ("console", buses["console"])):
+            def guarded():
+                if bus.enabled:
+                    bus.emit("onboarding.engagement_predicted", score=0.5)
+            print(f"guarded emit ({name}): {timeit.timeit(guarded, number=20000) / 20000 * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Streaming mini-batch clustering of donors vs full KMeans
+
+Streams --users generated profiles through MLEngine.cluster_users_streaming
+(twice, the second run resuming from the persisted centroids), counting the
+labels handed back per chunk and the peak traced memory, then clusters
+the first --compare of them with the full-batch cluster_user_behavior and
+compares time and mean squared distance to the nearest centroid. Also times
+O(k) assignment of single new users in a fresh MLEngine that loads the
+saved centroids.
+
+    python -m benchmarks.user_clustering --users 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Iterator
+
+import numpy as np
+
+from ml_engine import MLEngine
+from models import UserProfile
+from user_clustering import StreamingKMeans
+from benchmarks.model_memory import CAUSES, INTERESTS, LOCATIONS, TRAITS
+
+
+def profiles(count: int, seed: int = 0) -> Iterator[UserProfile]:
+    rng = random.Random(seed)
+    for i in range(count):
+        yield UserProfile(
+            name=f"User {i}",
+            interests=rng.sample(INTERESTS, rng.randint(1, 6)),
+            causes=rng.sample(CAUSES, rng.randint(1, 4)),
+            monthly_income=rng.choice([1000.0, 3000.0, 5000.0, 8000.0, 15000.0]),
+            donation_comfort_level=rng.choice(["low", "medium", "high"]),
+            preferred_frequency=rng.choice(["weekly", "monthly", "quarterly"]),
+            geographic_preference=rng.choice(LOCATIONS),
+            personality_traits={trait: rng.random() for trait in TRAITS},
+            giving_history_sentiment=rng.uniform(-1, 1),
+        )
+
+
+def mean_squared_distance(X: np.ndarray, labels: np.ndarray) -> float:
+    total = 0.0
+    for cluster in np.unique(labels):
+        members = X[labels == cluster]
+        total += ((members - members.mean(axis=0)) ** 2).sum()
+    return total / len(X)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--compare", type=int, default=20000, help="users for the full KMeans comparison")
+    parser.add_argument("--clusters", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    engine = MLEngine()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "user_clusters.npz")
+        for run in ("fresh", "resumed"):
+            labelled = 0
+
+            def count(chunk, labels):
+                nonlocal labelled
+                labelled += len(labels)
+            start = time.perf_counter()
+            summaries = engine.cluster_users_streaming(
+                profiles(args.users, seed=len(run)), args.clusters, args.chunk_size, centroids_path=path,
+                on_labels=count)
+            elapsed = time.perf_counter() - start
+            print(f"streaming ({run}): {args.users / elapsed:,.0f} users/s, {labelled} labels")
+        for summary in summaries:
+            print(f"  cluster {summary.cluster_id}: {summary.size} users, "
+                  f"income {summary.feature_means['income']:.2f}, "
+                  f"comfort {summary.feature_means['comfort_level']:.2f}, "
+                  f"msd {summary.mean_squared_distance:.3f}")
+        print(f"centroids on disk: {os.path.getsize(path)} bytes")
+
+        # Traced separately: tracemalloc slows the run several times over
+        tracemalloc.start()
+        engine.cluster_users_streaming(profiles(args.users, seed=2), args.clusters, args.chunk_size,
+                                       centroids_path=path)
+        print(f"peak traced memory while streaming: {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB")
+        tracemalloc.stop()
+
+        fresh_engine = MLEngine()
+        fresh_engine.load_user_clusters(path)
+
+    sample = list(profiles(args.compare, seed=99))
+    X = engine._user_feature_matrix(sample)
+    start = time.perf_counter()
+    groups = engine.cluster_user_behavior(sample, args.clusters)
+    full_seconds = time.perf_counter() - start
+    full_labels = np.empty(len(sample), dtype=np.int64)
+    position = {profile.name: i for i, profile in enumerate(sample)}
+    for cluster, names in groups.items():
+        full_labels[[position[name] for name in names]] = cluster
+
+    streaming = StreamingKMeans(args.clusters)
+    start = time.perf_counter()
+    streaming.fit_stream(X[i:i + args.chunk_size] for i in range(0, len(X), args.chunk_size))
+    stream_seconds = time.perf_counter() - start
+    streaming_labels = streaming.assign(X)
+    print(f"\n{args.compare} users   {'seconds':>8} {'msd':>8}")
+    print(f"full KMeans   {full_seconds:>8.2f} {mean_squared_distance(X, full_labels):>8.4f}")
+    print(f"mini-batch    {stream_seconds:>8.2f} {mean_squared_distance(X, streaming_labels):>8.4f}")
+
+    start = time.perf_counter()
+    for profile in sample[:2000]:
+        fresh_engine.assign_user_clusters([profile])
+    print(f"\nsingle-user assignment: {(time.perf_counter() - start) / 2000 * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Binary, memory-mapped charity catalogue
+
+Layout (little-endian)::
+
+    8 bytes   magic b"CHRCAT01"
+    8 bytes   header length H (uint64)
+    H bytes   UTF-8 JSON header: counts, vocabularies, posting keys and the
+              offset/dtype/shape of every section
+    ...       sections, each aligned to 64 bytes
+
+Sections hold fixed-width numeric columns (efficiency, retention, category and
+location codes, tag bitsets, ...), the float32 embedding matrix, the inverted
+index postings, the fitted embedder, and a string table with each charity's
+id, name, description and JSON-encoded list/dict fields.
+
+Build a catalogue from JSON, JSON Lines or CSV with::
+
+    python -m charity_catalogue charities.json charities.cat
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from models import Charity
+from charity_store import CharityColumns
+from embeddings import HashedTfidfEmbedder, charity_text
+
+MAGIC = b"CHRCAT01"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Per-charity strings, in string-table order
+STRING_FIELDS = ("id", "name", "description", "impact_metrics", "tags",
+                 "success_stories", "semantic_keywords")
+_JSON_FIELDS = {"impact_metrics", "tags", "success_stories", "semantic_keywords"}
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_catalogue(charities: List[Charity], path: str, embedding_dim: int = 50):
+    """Write charities to a catalogue file, embedding their descriptions"""
+    columns = CharityColumns(charities)
+    count = len(charities)
+
+    embedder = HashedTfidfEmbedder(dim=embedding_dim)
+    if count:
+        embeddings = embedder.fit_transform([charity_text(c) for c in charities])
+    else:
+        embeddings = np.zeros((0, embedding_dim), dtype=np.float32)
+
+    # String table: every field of every charity, concatenated
+    encoded = []
+    for charity in charities:
+        for field in STRING_FIELDS:
+            value = getattr(charity, field)
+            if field in _JSON_FIELDS:
+                value = json.dumps(value if value is None else
+                                   (dict(value) if field == "impact_metrics" else list(value)))
+            encoded.append(value.encode("utf-8"))
+    string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    string_offsets[1:] = np.cumsum([len(item) for item in encoded])
+    string_data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    ids = [charity.id for charity in charities]
+    id_order = np.array(sorted(range(count), key=ids.__getitem__), dtype=np.int64)
+
+    posting_keys, posting_offsets, posting_rows = columns.index.export()
+
+    sections: Dict[str, np.ndarray] = {
+        "efficiency": columns.efficiency[:count],
+        "retention": columns.retention[:count],
+        "token_counts": columns.token_counts[:count],
+        "min_donation": np.array([c.min_donation for c in charities], dtype=np.float64),
+        "predicted_impact": np.array([c.predicted_impact_score for c in charities], dtype=np.float64),
+        "category_codes": columns.category_codes[:count],
+        "location_codes": columns.location_codes[:count],
+        "tag_bits": columns.tag_bits[:count],
+        "embeddings": np.ascontiguousarray(embeddings, dtype=np.float32),
+        "string_offsets": string_offsets,
+        "string_data": string_data,
+        "id_order": id_order,
+        "posting_offsets": posting_offsets,
+        "posting_rows": posting_rows,
+    }
+    if embedder.components is not None:
+        sections["embedder_idf"] = embedder.idf
+        sections["embedder_components"] = np.ascontiguousarray(embedder.components)
+
+    def by_code(table: Dict[str, int]) -> List[str]:
+        return [name for name, _ in sorted(table.items(), key=lambda item: item[1])]
+
+    layout = {}
+    offset = 0
+    for name, array in sections.items():
+        offset = _aligned(offset)
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += array.nbytes
+
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "count": count,
+        "embedding_dim": embedding_dim,
+        "embedder": {"n_features": embedder.n_features, "random_state": embedder.random_state},
+        "tag_vocabulary": by_code(columns.tag_ids),
+        "categories": by_code(columns.category_ids),
+        "locations": by_code(columns.location_ids),
+        "posting_keys": [list(key) for key in posting_keys],
+        "max_efficiency": columns.max_efficiency,
+        "max_retention": columns.max_retention,
+        "sections": layout,
+    }).encode("utf-8")
+
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(np.uint64(len(header)).tobytes())
+        handle.write(header)
+        for name, array in sections.items():
+            handle.seek(data_start + layout[name]["offset"])
+            handle.write(np.ascontiguousarray(array).tobytes())
+        # Pad so even empty trailing sections lie inside the mapping
+        handle.truncate(data_start + _aligned(offset))
+    os.replace(tmp_path, path)
+
+
+class MappedCatalogue:
+    """Read-only view of a catalogue file through mmap
+
+    Opening reads only the header; columns are NumPy views into the mapping and
+    Charity objects are decoded one row at a time on request. Processes that
+    open the same file share its pages through the OS page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a charity catalogue")
+        header_length = int(np.frombuffer(self._mmap, dtype="<u8", count=1, offset=len(MAGIC))[0])
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode("utf-8"))
+        if header["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalogue version {header['version']}")
+
+        self._data_start = _aligned(header_start + header_length)
+        self._layout = header["sections"]
+        self._columns: Dict[str, np.ndarray] = {}
+
+        self.count: int = header["count"]
+        self.embedding_dim: int = header["embedding_dim"]
+        self.tag_vocabulary: List[str] = header["tag_vocabulary"]
+        self.categories: List[str] = header["categories"]
+        self.locations: List[str] = header["locations"]
+        self.posting_keys: List[Tuple[str, str]] = [tuple(key) for key in header["posting_keys"]]
+        self.max_efficiency: float = header["max_efficiency"]
+        self.max_retention: float = header["max_retention"]
+        self._embedder_config = header["embedder"]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy, read-only array for a section"""
+        array = self._columns.get(name)
+        if array is None:
+            spec = self._layout[name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            array = np.frombuffer(self._mmap, dtype=dtype, count=count,
+                                  offset=self._data_start + spec["offset"]).reshape(spec["shape"])
+            self._columns[name] = array
+        return array
+
+    def string(self, row: int, field: str) -> str:
+        """One string-table entry of a charity"""
+        offsets = self.column("string_offsets")
+        position = row * len(STRING_FIELDS) + STRING_FIELDS.index(field)
+        start, end = int(offsets[position]), int(offsets[position + 1])
+        base = self._data_start + self._layout["string_data"]["offset"]
+        return self._mmap[base + start:base + end].decode("utf-8")
+
+    def charity(self, row: int) -> Charity:
+        """Decode one row into a Charity"""
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        strings = {field: self.string(row, field) for field in STRING_FIELDS}
+        for field in _JSON_FIELDS:
+            strings[field] = json.loads(strings[field])
+
+        return Charity(
+            id=strings["id"],
+            name=strings["name"],
+            category=self.categories[int(self.column("category_codes")[row])],
+            description=strings["description"],
+            location=self.locations[int(self.column("location_codes")[row])],
+            efficiency_score=float(self.column("efficiency")[row]),
+            tags=strings["tags"],
+            min_donation=float(self.column("min_donation")[row]),
+            impact_metrics=strings["impact_metrics"],
+            description_embedding=self.column("embeddings")[row].tolist(),
+            success_stories=strings["success_stories"],
+            donor_retention_rate=float(self.column("retention")[row]),
+            predicted_impact_score=float(self.column("predicted_impact")[row]),
+            semantic_keywords=strings["semantic_keywords"]
+        )
+
+    def __getitem__(self, row: int) -> Charity:
+        return self.charity(row)
+
+    def __iter__(self) -> Iterator[Charity]:
+        for row in range(self.count):
+            yield self.charity(row)
+
+    def find_row(self, charity_id: str) -> Optional[int]:
+        """Row of a charity id, by binary search over the sorted id order"""
+        order = self.column("id_order")
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self.string(int(order[middle]), "id")
+            if candidate < charity_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order):
+            row = int(order[low])
+            if self.string(row, "id") == charity_id:
+                return row
+        return None
+
+    def embedder(self) -> Optional[HashedTfidfEmbedder]:
+        """The embedder fitted when the catalogue was built, if any"""
+        if "embedder_components" not in self._layout:
+            return None
+        embedder = HashedTfidfEmbedder(dim=self.embedding_dim, **self._embedder_config)
+        embedder.idf = self.column("embedder_idf")
+        embedder.components = self.column("embedder_components")
+        return embedder
+
+
+def charity_from_record(record: Dict) -> Charity:
+    """Build a Charity from a JSON object or CSV row
+
+    CSV cells for list and dict fields may hold JSON; plain ``tags`` and
+    ``success_stories`` cells are split on ``;``.
+    """
+    def as_list(value) -> List[str]:
+        if value is None or value == "":
+            return []
+        if isinstance(value, str):
+            value = value.strip()
+            if value.startswith("["):
+                return json.loads(value)
+            return [item.strip() for item in value.split(";") if item.strip()]
+        return list(value)
+
+    impact_metrics = record.get("impact_metrics") or {}
+    if isinstance(impact_metrics, str):
+        impact_metrics = json.loads(impact_metrics)
+
+    return Charity(
+        id=str(record["id"]),
+        name=record["name"],
+        category=record["category"],
+        description=record["description"],
+        location=record["location"],
+        efficiency_score=float(record["efficiency_score"]),
+        tags=as_list(record.get("tags")),
+        min_donation=float(record.get("min_donation") or 0.0),
+        impact_metrics=impact_metrics,
+        success_stories=as_list(record.get("success_stories")),
+        donor_retention_rate=float(record.get("donor_retention_rate") or 0.0),
+        predicted_impact_score=float(record.get("predicted_impact_score") or 0.0),
+        semantic_keywords=as_list(record.get("semantic_keywords"))
+    )
+
+
+def load_charity_records(path: str) -> Iterable[Charity]:
+    """Read charities from a .json (array), .jsonl or .csv file"""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as handle:
+            return [charity_from_record(row) for row in csv.DictReader(handle)]
+
+    with open(path, encoding="utf-8") as handle:
+        if path.endswith(".jsonl"):
+            return [charity_from_record(json.loads(line)) for line in handle if line.strip()]
+        return [charity_from_record(record) for record in json.load(handle)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a memory-mapped charity catalogue")
+    parser.add_argument("source", help="charities as .json, .jsonl or .csv")
+    parser.add_argument("output", help="catalogue file to write")
+    parser.add_argument("--embedding-dim", type=int, default=50)
+    args = parser.parse_args()
+
+    charities = list(load_charity_records(args.source))
+    write_catalogue(charities, args.output, embedding_dim=args.embedding_dim)
+    print(f"Wrote {len(charities)} charities to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
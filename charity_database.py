@@ -1,17 +1,54 @@
 import random
-from typing import List, Tuple
-from models import UserProfile, Charity
+import numpy as np
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+from models import UserProfile, Charity, MatchBreakdown
 from ml_engine import MLEngine
+from charity_store import CharityColumns, LiveCharities
+from embeddings import HashedTfidfEmbedder, charity_text
+from ann_index import IVFIndex
+from instrumentation import Instrumentation, default_instruments
+from match_cache import MatchCache, MAX_ENGAGEMENT, profile_key
+
+EMBEDDING_DIM = 50
 
 
 class CharityDatabase:
     """Simulated charity database with matching capabilities"""
 
-    def __init__(self):
-        self.charities = self._initialize_charities()
+    def __init__(self, catalogue_path: Optional[str] = None,
+                 instruments: Optional[Instrumentation] = None,
+                 match_cache: Optional[MatchCache] = None):
+        """Use the built-in sample charities, or a catalogue file written by charity_catalogue"""
         self.ml_engine = MLEngine()
+        self.instruments = instruments or default_instruments()
+        self.match_stats = {"queries": 0, "cache_hits": 0, "rows_scored": 0, "rows_considered": 0}
+        # Scores per canonical profile, dropped when the catalogue changes; set to None to disable
+        self.match_cache = match_cache if match_cache is not None else MatchCache()
+        self._semantic_index: Optional[IVFIndex] = None
+
+        if catalogue_path is None:
+            self.catalogue = None
+            self.columns = CharityColumns(self._initialize_charities(),
+                                          tokenizer=self.ml_engine.charity_tokens)
+            self.embedder = HashedTfidfEmbedder(dim=EMBEDDING_DIM)
+            self.rebuild_embeddings()
+        else:
+            from charity_catalogue import MappedCatalogue
+
+            # Columns, postings and embeddings stay in the mapped file; charities
+            # are decoded only when a match returns them
+            self.catalogue = MappedCatalogue(catalogue_path)
+            self.columns = CharityColumns.from_catalogue(self.catalogue,
+                                                         tokenizer=self.ml_engine.charity_tokens)
+            self.embedder = self.catalogue.embedder() or HashedTfidfEmbedder(dim=EMBEDDING_DIM)
+            if self.embedder.components is None:
+                self.rebuild_embeddings()
 
-    def _initialize_charities(self) -> List[Charity]:
+        # Live view over the store, so add/remove never need a second list
+        self.charities = LiveCharities(self.columns)
+
+    @staticmethod
+    def _initialize_charities() -> List[Charity]:
         """Initialize sample charity database"""
         charities = [
             Charity(
@@ -94,7 +131,7 @@ class CharityDatabase:
         # Initialize ML fields for each charity
         for charity in charities:
             charity.semantic_keywords = []
-            charity.description_embedding = [random.random() for _ in range(50)]
+            # description_embedding is filled by rebuild_embeddings()
             charity.donor_retention_rate = random.uniform(0.7, 0.95)
             charity.predicted_impact_score = random.uniform(0.8, 1.0)
             charity.success_stories = [
@@ -106,54 +143,199 @@ class CharityDatabase:
 
     def find_matches(self, user_profile: UserProfile) -> List[Tuple[Charity, float]]:
         """Enhanced charity matching using ML and NLP"""
-        matches = []
-
-        for charity in self.charities:
-            # Traditional compatibility score
-            base_score = self._calculate_compatibility(user_profile, charity)
-
-            # ML enhancement: semantic similarity
-            semantic_score = 0.0
-            if user_profile.extracted_keywords:
-                user_text = ' '.join(user_profile.extracted_keywords)
-                semantic_score = self.ml_engine.calculate_semantic_similarity(
-                    user_text, charity.description
-                )
+        with self.instruments.stage("find_matches"):
+            # Score the user against the candidate charities in one vectorized pass;
+            # weights are applied in CharityColumns.score_features
+            scores = self._score_candidates(user_profile)
+            final_scores = scores["final"]
+
+            passing = np.flatnonzero(final_scores > 0.3)  # Minimum threshold
+            # Stable sort keeps catalogue order for tied scores
+            ranked = passing[np.argsort(-final_scores[passing], kind="stable")]
+
+            rows = scores["rows"]
+            return [(self.columns.rows[row], score)
+                    for row, score in zip(rows[ranked].tolist(), final_scores[ranked].tolist())]
+
+    def find_top_k(self, user_profile: UserProfile, k: int,
+                   explain: bool = False) -> Union[List[Tuple[Charity, float]], List[MatchBreakdown]]:
+        """Return the k best matches, equal to find_matches(user_profile)[:k]
+
+        Uses a partial selection instead of sorting every passing charity, so
+        the cost is O(n + k log k). With ``explain=True`` each match comes back
+        as a MatchBreakdown carrying the parts of its score.
+        """
+        with self.instruments.stage("find_top_k"):
+            if k <= 0:
+                return []
+
+            scores = self._score_candidates(user_profile)
+            final_scores = scores["final"]
+
+            passing = np.flatnonzero(final_scores > 0.3)  # Minimum threshold
+            if len(passing) > k:
+                passing_scores = final_scores[passing]
+                kth_score = np.partition(passing_scores, len(passing) - k)[len(passing) - k]
+                # Fill remaining slots with the earliest ties, as the stable sort would
+                above = passing[passing_scores > kth_score]
+                tied = passing[passing_scores == kth_score][:k - len(above)]
+                passing = np.sort(np.concatenate([above, tied]))
+            ranked = passing[np.argsort(-final_scores[passing], kind="stable")]
+
+            rows = scores["rows"][ranked].tolist()
+            if not explain:
+                return [(self.columns.rows[row], score)
+                        for row, score in zip(rows, final_scores[ranked].tolist())]
 
-            # ML enhancement: predicted engagement
             engagement_bonus = user_profile.predicted_engagement_score * 0.1
+            components = {name: scores[name][ranked].tolist() for name in
+                          ("final", "interest", "cause", "location", "efficiency", "base", "semantic")}
+            return [
+                MatchBreakdown(
+                    charity=self.columns.rows[row],
+                    score=components["final"][i],
+                    interest_score=components["interest"][i],
+                    cause_score=components["cause"][i],
+                    location_score=components["location"][i],
+                    efficiency_score=components["efficiency"][i],
+                    compatibility_score=components["base"][i],
+                    semantic_score=components["semantic"][i],
+                    engagement_bonus=engagement_bonus,
+                    retention_bonus=float(self.columns.retention[row]) * 0.05
+                )
+                for i, row in enumerate(rows)
+            ]
+
+    @property
+    def semantic_index(self) -> IVFIndex:
+        """ANN index over description embeddings, built on first use for mapped catalogues"""
+        if self._semantic_index is None:
+            self._semantic_index = IVFIndex(dim=EMBEDDING_DIM)
+            if self.catalogue is not None:
+                self._semantic_index.build(self.catalogue.column("embeddings"),
+                                           np.arange(len(self.catalogue)))
+        return self._semantic_index
+
+    def rebuild_embeddings(self):
+        """Refit description embeddings on the current catalogue and rebuild the ANN index"""
+        live_rows = self.columns.live_rows()
+        charities = [self.columns.rows[row] for row in live_rows.tolist()]
+        if not charities:
+            self.semantic_index.build(np.zeros((0, EMBEDDING_DIM), dtype=np.float32), live_rows)
+            return
+
+        embeddings = self.embedder.fit_transform([charity_text(c) for c in charities])
+        for charity, embedding in zip(charities, embeddings):
+            charity.description_embedding = embedding.tolist()
+        self.semantic_index.build(embeddings, live_rows)
+
+    def semantic_search(self, text: str, k: int = 5) -> List[Tuple[Charity, float]]:
+        """Charities whose embeddings are closest (cosine) to free text"""
+        query = self.embedder.transform([text])[0]
+        return [(self.columns.rows[row], score)
+                for row, score in self.semantic_index.search(query, k)]
+
+    def add_charity(self, charity: Charity):
+        """Insert a charity, updating the columnar store, inverted index and ANN index"""
+        row = self.columns.append(charity)
+        if self.embedder.components is None:
+            # Nothing to embed with yet (empty catalogue); fit on what we have
+            self.rebuild_embeddings()
+            return
+
+        # Embedded with the current fit; call rebuild_embeddings() to refit
+        embedding = self.embedder.transform([charity_text(charity)])[0]
+        charity.description_embedding = embedding.tolist()
+        self.semantic_index.add(embedding, row)
+
+    def get_charity(self, charity_id: str) -> Charity:
+        """Look up a charity by id"""
+        row = self.columns.row_ids.get(charity_id)
+        if row is None:
+            raise KeyError(charity_id)
+        return self.columns.rows[row]
+
+    def remove_charity(self, charity_id: str) -> Charity:
+        """Remove a charity by id and return it"""
+        charity = self.get_charity(charity_id)
+        row = self.columns.row_ids[charity_id]
+        self.columns.remove(charity_id)
+        self.semantic_index.remove(row)
+        return charity
 
-            # ML enhancement: donor retention rate
-            retention_bonus = charity.donor_retention_rate * 0.05
+    def stats(self) -> Dict[str, float]:
+        """Catalogue and candidate-pruning statistics
 
-            # Combined ML-enhanced score
-            final_score = (base_score * 0.7 +  # Traditional matching (70%)
-                           semantic_score * 0.2 +  # Semantic similarity (20%)
-                           engagement_bonus +  # User engagement prediction
-                           retention_bonus)  # Charity retention rate
+        Queries answered from the match cache never reach the index, so they
+        count in ``cache_hits`` but not in the pruning figures.
+        """
+        considered = self.match_stats["rows_considered"]
+        scored = self.match_stats["rows_scored"]
+        return {
+            "charities": self.columns.live_count,
+            "index_keys": len(self.columns.index),
+            "queries": self.match_stats["queries"],
+            "cache_hits": self.match_stats["cache_hits"],
+            "rows_scored": scored,
+            "rows_considered": considered,
+            "pruning_rate": 1 - scored / considered if considered else 0.0,
+        }
 
-            if final_score > 0.3:  # Minimum threshold
-                matches.append((charity, final_score))
+    def match_cache_info(self) -> Dict[str, float]:
+        """MatchCache hit rate, evictions and bytes held; empty when caching is off"""
+        return self.match_cache.info() if self.match_cache is not None else {}
 
-        return sorted(matches, key=lambda x: x[1], reverse=True)
+    def _score_candidates(self, user_profile: UserProfile) -> Dict[str, np.ndarray]:
+        """Score only charities the inverted index says could pass the threshold
 
-    def _calculate_compatibility(self, profile: UserProfile, charity: Charity) -> float:
-        """Calculate compatibility score between user and charity"""
-        score = 0.0
+        Profiles with the same interests, causes, location and keyword tokens
+        share their match features through the match cache, so a hit skips
+        the index lookups and only redoes the arithmetic.
+        """
+        user_words = frozenset()
+        if user_profile.extracted_keywords:
+            user_words = self.ml_engine.user_keyword_tokens(user_profile.extracted_keywords)
 
-        # Interest matching (40% weight)
-        interest_overlap = len(set(profile.interests) & set(charity.tags)) / len(profile.interests)
-        score += interest_overlap * 0.4
+        engagement = user_profile.predicted_engagement_score
+        cache = self.match_cache
+        if cache is None or not 0.0 <= engagement <= MAX_ENGAGEMENT:
+            rows = self.columns.candidate_rows(user_profile, user_words)
+            scores = self.columns.score(user_profile, rows, user_words)
+            self._count_query(len(scores["rows"]))
+            return scores
 
-        # Cause alignment (30% weight)
-        if charity.category in [cause.lower().replace(" ", "_") for cause in profile.causes]:
-            score += 0.3
+        key = profile_key(user_profile, user_words)
+        catalogue, version = self.columns.uid, self.columns.version
+        features = cache.get(catalogue, key, version)
+        if features is None:
+            features = self._match_features(user_profile, user_words)
+            cache.put(catalogue, key, version, features)
+        else:
+            self.match_stats["queries"] += 1
+            self.match_stats["cache_hits"] += 1
+        return self.columns.score_features(features, len(user_profile.interests), len(user_words), engagement)
 
-        # Geographic preference (20% weight)
-        if profile.geographic_preference == charity.location or charity.location == "global":
-            score += 0.2
+    def _match_features(self, user_profile: UserProfile, user_words: FrozenSet[str]) -> Dict[str, np.ndarray]:
+        """Compact match features of every row that could pass at any engagement score"""
+        rows = self.columns.candidate_rows(user_profile, user_words, engagement=MAX_ENGAGEMENT)
+        if rows is None:
+            rows = self.columns.live_rows()
+        features = self.columns.match_features(user_profile, rows, user_words)
+        self._count_query(len(rows))
 
-        # Efficiency score (10% weight)
-        score += (charity.efficiency_score / 100) * 0.1
+        best = self.columns.score_features(features, len(user_profile.interests), len(user_words),
+                                           MAX_ENGAGEMENT)
+        keep = best["final"] > 0.3  # Minimum threshold
+        # Counts are small, so narrow dtypes keep entries to ~10 bytes per row
+        return {
+            "rows": features["rows"][keep].astype(np.int32),
+            "shared_tags": features["shared_tags"][keep].astype(np.uint16),
+            "cause_match": features["cause_match"][keep],
+            "location_match": features["location_match"][keep],
+            "shared_words": features["shared_words"][keep].astype(np.uint16),
+        }
 
-        return min(score, 1.0)
\ No newline at end of file
+    def _count_query(self, rows_scored: int):
+        self.match_stats["queries"] += 1
+        self.match_stats["rows_scored"] += rows_scored
+        self.match_stats["rows_considered"] += self.columns.live_count
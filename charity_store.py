@@ -0,0 +1,507 @@
+import uuid
+import numpy as np
+from collections.abc import MutableMapping, Sequence
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+from models import UserProfile, Charity
+
+# Bits set in every possible byte, used to popcount the tag bitsets
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _tokenize(text: str) -> FrozenSet[str]:
+    """Lowercased whitespace tokens, as used by the Jaccard similarity"""
+    return frozenset(text.lower().split())
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a 2-D uint64 array"""
+    if words.shape[1] == 0:
+        return np.zeros(words.shape[0], dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    return _POPCOUNT_TABLE[as_bytes].reshape(words.shape[0], -1).sum(axis=1, dtype=np.int64)
+
+
+class InvertedIndex:
+    """Postings from (field, value) pairs such as ("tag", "water") to catalogue rows"""
+
+    def __init__(self):
+        self._postings: Dict[Tuple[str, str], Set[int]] = {}
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+        # Read-only postings (e.g. memory-mapped), copied into _postings on write
+        self._frozen: Dict[Tuple[str, str], int] = {}
+        self._frozen_offsets = np.zeros(1, dtype=np.int64)
+        self._frozen_rows = np.zeros(0, dtype=np.int64)
+
+    def attach_frozen(self, keys: List[Tuple[str, str]], offsets: np.ndarray, rows: np.ndarray):
+        """Serve postings from CSR-style arrays without copying them
+
+        ``rows[offsets[i]:offsets[i + 1]]`` holds the sorted rows for ``keys[i]``.
+        """
+        self._frozen = {key: position for position, key in enumerate(keys)}
+        self._frozen_offsets = offsets
+        self._frozen_rows = rows
+
+    def export(self) -> Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray]:
+        """All postings as (keys, offsets, rows) in the attach_frozen layout"""
+        keys = sorted(set(self._postings) | set(self._frozen))
+        arrays = [self.rows(field, value) for field, value in keys]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(array) for array in arrays])
+        rows = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int64)
+        return keys, offsets, rows.astype(np.int64)
+
+    def add(self, field: str, value: str, row: int):
+        """Record that a row carries a value for a field"""
+        key = (field, value)
+        self._thaw(key)
+        self._postings.setdefault(key, set()).add(row)
+        self._arrays.pop(key, None)
+
+    def discard(self, field: str, value: str, row: int):
+        """Drop a row from a posting list, forgetting empty lists"""
+        key = (field, value)
+        self._thaw(key)
+        postings = self._postings.get(key)
+        if postings is None:
+            return
+        postings.discard(row)
+        if not postings:
+            del self._postings[key]
+        self._arrays.pop(key, None)
+
+    def rows(self, field: str, value: str) -> np.ndarray:
+        """Sorted rows carrying a value for a field"""
+        key = (field, value)
+        array = self._arrays.get(key)
+        if array is None:
+            position = self._frozen.get(key)
+            if position is not None:
+                start, end = self._frozen_offsets[position], self._frozen_offsets[position + 1]
+                return self._frozen_rows[start:end]
+            array = np.array(sorted(self._postings.get(key, ())), dtype=np.int64)
+            self._arrays[key] = array
+        return array
+
+    def union(self, keys: Iterable[Tuple[str, str]]) -> np.ndarray:
+        """Sorted, de-duplicated rows matching any of the given keys"""
+        arrays = [self.rows(field, value) for field, value in keys]
+        arrays = [array for array in arrays if len(array)]
+        if not arrays:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(arrays))
+
+    def __len__(self) -> int:
+        return len(self._postings) + len(self._frozen)
+
+    def _thaw(self, key: Tuple[str, str]):
+        """Move a frozen posting list into the mutable sets before changing it"""
+        position = self._frozen.pop(key, None)
+        if position is not None:
+            start, end = self._frozen_offsets[position], self._frozen_offsets[position + 1]
+            self._postings[key] = set(self._frozen_rows[start:end].tolist())
+
+
+class LazyRows(Sequence):
+    """Row -> Charity list that decodes catalogue rows on first access
+
+    Appended rows and tombstones are kept in memory on top of the read-only
+    catalogue, and decoded charities are cached so repeated lookups return the
+    same object.
+    """
+
+    def __init__(self, decode: Callable[[int], Charity], count: int):
+        self._decode = decode
+        self._count = count
+        self._decoded: Dict[int, Optional[Charity]] = {}
+        self._appended: List[Optional[Charity]] = []
+
+    def __len__(self) -> int:
+        return self._count + len(self._appended)
+
+    def __getitem__(self, row: int) -> Optional[Charity]:
+        if row < 0:
+            row += len(self)
+        if row >= self._count:
+            return self._appended[row - self._count]
+        if row not in self._decoded:
+            self._decoded[row] = self._decode(row)
+        return self._decoded[row]
+
+    def __setitem__(self, row: int, charity: Optional[Charity]):
+        if row >= self._count:
+            self._appended[row - self._count] = charity
+        else:
+            self._decoded[row] = charity
+
+    def append(self, charity: Charity):
+        self._appended.append(charity)
+
+
+class LazyRowIds(MutableMapping):
+    """Charity id -> row mapping backed by a catalogue lookup plus in-memory edits"""
+
+    def __init__(self, lookup: Callable[[str], Optional[int]], count: int):
+        self._lookup = lookup
+        self._count = count
+        self._added: Dict[str, int] = {}
+        self._removed: Set[str] = set()
+
+    def __getitem__(self, charity_id: str) -> int:
+        row = self._added.get(charity_id)
+        if row is not None:
+            return row
+        if charity_id not in self._removed:
+            row = self._lookup(charity_id)
+            if row is not None:
+                return row
+        raise KeyError(charity_id)
+
+    def __setitem__(self, charity_id: str, row: int):
+        self._removed.discard(charity_id)
+        self._added[charity_id] = row
+
+    def __delitem__(self, charity_id: str):
+        if charity_id in self._added:
+            del self._added[charity_id]
+        elif charity_id not in self._removed and self._lookup(charity_id) is not None:
+            self._removed.add(charity_id)
+        else:
+            raise KeyError(charity_id)
+
+    def __contains__(self, charity_id: object) -> bool:
+        try:
+            self[charity_id]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        raise TypeError("catalogue-backed id maps are not iterable")
+
+    def __len__(self) -> int:
+        return self._count - len(self._removed) + len(self._added)
+
+
+class LiveCharities(Sequence):
+    """Read-only sequence of the charities currently in a CharityColumns store"""
+
+    def __init__(self, columns: "CharityColumns"):
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return self._columns.live_count
+
+    def __getitem__(self, index):
+        rows = self._columns.live_rows()[index]
+        if isinstance(index, slice):
+            return [self._columns.rows[row] for row in rows.tolist()]
+        return self._columns.rows[int(rows)]
+
+    def __iter__(self) -> Iterator[Charity]:
+        for row in self._columns.live_rows().tolist():
+            yield self._columns.rows[row]
+
+    def __repr__(self) -> str:
+        return f"LiveCharities({len(self)} charities)"
+
+
+class CharityColumns:
+    """Column-oriented copy of the charity catalogue for vectorized scoring
+
+    Each charity occupies one row. Tags are stored as uint64 bitsets, category
+    and location as integer codes, and description words in an inverted index,
+    so one user can be scored against the whole catalogue with array operations.
+    The same index maps tags, categories and locations to rows, which lets
+    callers restrict scoring to charities that can pass the match threshold.
+    Rows keep insertion order; removed charities are tombstoned so the order
+    used to break score ties never changes.
+    """
+
+    def __init__(self, charities: Iterable[Charity] = (),
+                 tokenizer: Optional[Callable[[str], FrozenSet[str]]] = None):
+        self.tokenizer = tokenizer or _tokenize
+        self.tag_ids: Dict[str, int] = {}
+        self.category_ids: Dict[str, int] = {}
+        self.location_ids: Dict[str, int] = {}
+        self.row_ids: Dict[str, int] = {}
+        self.rows: List[Optional[Charity]] = []
+
+        capacity = 16
+        self.tag_bits = np.zeros((capacity, 0), dtype=np.uint64)
+        self.category_codes = np.zeros(capacity, dtype=np.int32)
+        self.location_codes = np.zeros(capacity, dtype=np.int32)
+        self.efficiency = np.zeros(capacity, dtype=np.float64)
+        self.retention = np.zeros(capacity, dtype=np.float64)
+        self.token_counts = np.zeros(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.index = InvertedIndex()
+
+        # Upper bounds used to prove a charity cannot reach the threshold
+        self.max_efficiency = 0.0
+        self.max_retention = 0.0
+
+        # Bumped on every insert and removal; versions of different stores are compared
+        # together with uid, which tells stores apart
+        self.version = 0
+        self.uid = uuid.uuid4().bytes
+        self._live_rows: Tuple[int, Optional[np.ndarray]] = (-1, None)
+
+        for charity in charities:
+            self.append(charity)
+
+    @classmethod
+    def from_catalogue(cls, catalogue: "MappedCatalogue",
+                       tokenizer: Optional[Callable[[str], FrozenSet[str]]] = None) -> "CharityColumns":
+        """Wrap a memory-mapped catalogue without copying or decoding its rows
+
+        Numeric columns and postings are read-only views into the mapping;
+        they are copied only when a charity is later appended.
+        """
+        columns = cls(tokenizer=tokenizer)
+        count = len(catalogue)
+
+        columns.tag_ids = {tag: i for i, tag in enumerate(catalogue.tag_vocabulary)}
+        columns.category_ids = {name: i for i, name in enumerate(catalogue.categories)}
+        columns.location_ids = {name: i for i, name in enumerate(catalogue.locations)}
+        columns.row_ids = LazyRowIds(catalogue.find_row, count)
+        columns.rows = LazyRows(catalogue.charity, count)
+
+        columns.tag_bits = catalogue.column("tag_bits")
+        columns.category_codes = catalogue.column("category_codes")
+        columns.location_codes = catalogue.column("location_codes")
+        columns.efficiency = catalogue.column("efficiency")
+        columns.retention = catalogue.column("retention")
+        columns.token_counts = catalogue.column("token_counts")
+        columns.alive = np.ones(count, dtype=bool)
+
+        columns.index.attach_frozen(catalogue.posting_keys, catalogue.column("posting_offsets"),
+                                    catalogue.column("posting_rows"))
+        columns.max_efficiency = catalogue.max_efficiency
+        columns.max_retention = catalogue.max_retention
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def live_count(self) -> int:
+        return len(self.row_ids)
+
+    def append(self, charity: Charity) -> int:
+        """Add a charity as a new row and return its row index"""
+        if charity.id in self.row_ids:
+            raise ValueError(f"Charity {charity.id} is already in the catalogue")
+
+        row = len(self.rows)
+        if row == len(self.alive):
+            self._grow()
+
+        self.rows.append(charity)
+        self.row_ids[charity.id] = row
+
+        for tag in set(charity.tags):
+            tag_id = self._intern(self.tag_ids, tag)
+            if tag_id // 64 >= self.tag_bits.shape[1]:
+                extra = np.zeros((self.tag_bits.shape[0], 1), dtype=np.uint64)
+                self.tag_bits = np.hstack([self.tag_bits, extra])
+            self.tag_bits[row, tag_id // 64] |= np.uint64(1 << (tag_id % 64))
+
+        self.category_codes[row] = self._intern(self.category_ids, charity.category)
+        self.location_codes[row] = self._intern(self.location_ids, charity.location)
+        self.efficiency[row] = charity.efficiency_score
+        self.retention[row] = charity.donor_retention_rate
+        self.max_efficiency = max(self.max_efficiency, charity.efficiency_score)
+        self.max_retention = max(self.max_retention, charity.donor_retention_rate)
+
+        tokens = self.tokenizer(charity.description)
+        self.token_counts[row] = len(tokens)
+        for field, value in self._index_keys(charity, tokens):
+            self.index.add(field, value, row)
+
+        self.alive[row] = True
+        self.version += 1
+        return row
+
+    def remove(self, charity_id: str) -> int:
+        """Tombstone a charity's row and return its row index"""
+        row = self.row_ids.pop(charity_id)
+        charity = self.rows[row]
+        for field, value in self._index_keys(charity, self.tokenizer(charity.description)):
+            self.index.discard(field, value, row)
+
+        self.rows[row] = None
+        self.alive[row] = False
+        self.version += 1
+        return row
+
+    def live_rows(self) -> np.ndarray:
+        """Row indices of all charities still in the catalogue"""
+        version, rows = self._live_rows
+        if version != self.version:
+            rows = np.flatnonzero(self.alive[:len(self.rows)])
+            self._live_rows = (self.version, rows)
+        return rows
+
+    def candidate_rows(self, profile: UserProfile, user_words: Optional[FrozenSet[str]] = None,
+                       engagement: Optional[float] = None) -> Optional[np.ndarray]:
+        """Rows that share a tag, cause, eligible location or description word with a user
+
+        Any other charity scores at most 0.7 * efficiency/1000 plus the
+        engagement and retention bonuses. When that bound is at or below the
+        0.3 match threshold those charities can be skipped; otherwise None is
+        returned and every live row has to be scored. ``engagement``
+        overrides the profile's predicted engagement score in the bound.
+        """
+        if engagement is None:
+            engagement = profile.predicted_engagement_score
+        bound = (self.max_efficiency / 100 * 0.1 * 0.7 +
+                 engagement * 0.1 +
+                 self.max_retention * 0.05)
+        if bound > 0.3:
+            return None
+
+        keys = [("tag", interest) for interest in set(profile.interests)]
+        keys += [("category", cause.lower().replace(" ", "_")) for cause in profile.causes]
+        keys += [("location", profile.geographic_preference), ("location", "global")]
+        if user_words is None:
+            user_words = self.user_words(profile)
+        keys += [("token", word) for word in user_words]
+        return self.index.union(keys)
+
+    def score(self, profile: UserProfile, rows: Optional[np.ndarray] = None,
+              user_words: Optional[FrozenSet[str]] = None) -> Dict[str, np.ndarray]:
+        """Score one user against the given rows (default: every live row)
+
+        Computes the interest, cause, location and efficiency terms and the
+        semantic and bonus terms of find_matches, returning each as an array
+        aligned with ``rows``. ``user_words`` may carry the user's keyword
+        tokens when the caller already has them.
+        """
+        if rows is None:
+            rows = self.live_rows()
+        if user_words is None:
+            user_words = self.user_words(profile)
+        features = self.match_features(profile, rows, user_words)
+        return self.score_features(features, len(profile.interests), len(user_words),
+                                   profile.predicted_engagement_score)
+
+    def match_features(self, profile: UserProfile, rows: np.ndarray,
+                       user_words: FrozenSet[str]) -> Dict[str, np.ndarray]:
+        """What a user shares with each row: tag and description-word counts, cause and location matches"""
+        user_bits = np.zeros(self.tag_bits.shape[1], dtype=np.uint64)
+        for interest in set(profile.interests):
+            tag_id = self.tag_ids.get(interest)
+            if tag_id is not None:
+                user_bits[tag_id // 64] |= np.uint64(1 << (tag_id % 64))
+
+        cause_codes = [self.category_ids[code] for code in
+                       (cause.lower().replace(" ", "_") for cause in profile.causes)
+                       if code in self.category_ids]
+
+        locations = self.location_codes[rows]
+        return {
+            "rows": rows,
+            "shared_tags": _popcount_rows(self.tag_bits[rows] & user_bits),
+            "cause_match": np.isin(self.category_codes[rows], cause_codes),
+            "location_match": ((locations == self.location_ids.get(profile.geographic_preference, -1)) |
+                               (locations == self.location_ids.get("global", -1))),
+            "shared_words": self.shared_words(user_words, rows),
+        }
+
+    def score_features(self, features: Dict[str, np.ndarray], interest_count: int,
+                       user_word_count: int, engagement: float) -> Dict[str, np.ndarray]:
+        """Score components from match_features, for a user with the given counts and engagement"""
+        rows = features["rows"]
+
+        # Interest matching (40% weight)
+        if interest_count:
+            interest_score = features["shared_tags"] / interest_count * 0.4
+        else:
+            interest_score = np.zeros(len(rows), dtype=np.float64)
+
+        # Cause alignment (30% weight)
+        cause_score = np.where(features["cause_match"], 0.3, 0.0)
+
+        # Geographic preference (20% weight)
+        location_score = np.where(features["location_match"], 0.2, 0.0)
+
+        # Efficiency score (10% weight)
+        efficiency_score = (self.efficiency[rows] / 100) * 0.1
+
+        # Summed in the same order as the scalar implementation
+        score = interest_score + cause_score + location_score + efficiency_score
+        base_score = np.minimum(score, 1.0)
+
+        semantic_score = self._jaccard(features["shared_words"], user_word_count, rows)
+
+        final_score = (base_score * 0.7 +
+                       semantic_score * 0.2 +
+                       engagement * 0.1 +
+                       self.retention[rows] * 0.05)
+
+        return {
+            "rows": rows,
+            "interest": interest_score,
+            "cause": cause_score,
+            "location": location_score,
+            "efficiency": efficiency_score,
+            "base": base_score,
+            "semantic": semantic_score,
+            "final": final_score,
+        }
+
+    def user_words(self, profile: UserProfile) -> FrozenSet[str]:
+        """Tokens of a user's extracted keywords, as used by the semantic term"""
+        if not profile.extracted_keywords:
+            return frozenset()
+        return self.tokenizer(' '.join(profile.extracted_keywords))
+
+    def shared_words(self, user_words: FrozenSet[str], rows: np.ndarray) -> np.ndarray:
+        """Number of user words in each row's description"""
+        if not user_words:
+            return np.zeros(len(rows), dtype=np.int64)
+        intersection = np.zeros(len(self.rows), dtype=np.int64)
+        for word in user_words:
+            intersection[self.index.rows("token", word)] += 1
+        return intersection[rows]
+
+    def _jaccard(self, intersection: np.ndarray, user_word_count: int, rows: np.ndarray) -> np.ndarray:
+        similarity = np.zeros(len(rows), dtype=np.float64)
+        if not user_word_count:
+            return similarity
+        union = user_word_count + self.token_counts[rows] - intersection
+        has_words = self.token_counts[rows] > 0
+        np.divide(intersection, union, out=similarity, where=has_words)
+        return similarity
+
+    def _grow(self):
+        """Double the capacity of every per-row array"""
+        for name in ("category_codes", "location_codes", "efficiency",
+                     "retention", "token_counts", "alive"):
+            column = getattr(self, name)
+            grown = np.zeros(max(16, len(column) * 2), dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+        grown_bits = np.zeros((max(16, self.tag_bits.shape[0] * 2), self.tag_bits.shape[1]), dtype=np.uint64)
+        grown_bits[:self.tag_bits.shape[0]] = self.tag_bits
+        self.tag_bits = grown_bits
+
+    @staticmethod
+    def _index_keys(charity: Charity, tokens: FrozenSet[str]) -> List[Tuple[str, str]]:
+        """Inverted index keys for one charity"""
+        keys = [("tag", tag) for tag in set(charity.tags)]
+        keys.append(("category", charity.category))
+        keys.append(("location", charity.location))
+        keys += [("token", token) for token in tokens]
+        return keys
+
+    @staticmethod
+    def _intern(table: Dict[str, int], value: str) -> int:
+        """Return the code for a value, assigning the next free one if new"""
+        code = table.get(value)
+        if code is None:
+            code = len(table)
+            table[value] = code
+        return code
@@ -0,0 +1,128 @@
+import io
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from models import ImpactReport
+from impact_timeline import ImpactTimeline
+from instrumentation import Instrumentation, default_instruments
+
+CHART_FORMATS = ("png", "svg")
+
+
+def draw_impact_charts(fig, axes, report: ImpactReport):
+    """Draw the four impact panels for a report onto an existing figure"""
+    (ax1, ax2), (ax3, ax4) = axes
+    fig.suptitle(f'Your Impact with {report.charity_name}', fontsize=16, fontweight='bold')
+
+    # Columnar timelines are plotted straight from their arrays
+    if isinstance(report.timeline, ImpactTimeline):
+        cumulative = report.timeline.cumulative
+        donation_amounts = report.timeline.amounts
+    else:
+        cumulative = [item['cumulative'] for item in report.timeline]
+        donation_amounts = [item['amount'] for item in report.timeline]
+    donation_numbers = range(len(report.timeline))
+
+    # 1. Cumulative donations over time
+    ax1.plot(donation_numbers, cumulative, 'b-', linewidth=3, marker='o', markersize=4)
+    ax1.set_title('Your Donations Over Time')
+    ax1.set_xlabel('Donation Number')
+    ax1.set_ylabel('Cumulative Amount ($)')
+    ax1.grid(True, alpha=0.3)
+    ax1.fill_between(donation_numbers, cumulative, alpha=0.3)
+
+    # 2. Impact metrics pie chart
+    if report.impact_metrics:
+        metrics_names = list(report.impact_metrics.keys())[:4]  # Top 4 metrics
+        metrics_values = [report.impact_metrics[name] for name in metrics_names]
+
+        # Clean up names for display
+        clean_names = [name.replace('_', ' ').title() for name in metrics_names]
+
+        ax2.pie(metrics_values, labels=clean_names, autopct='%1.0f', startangle=90)
+        ax2.set_title('Impact Breakdown')
+
+    # 3. Beneficiaries helped
+    ax3.bar(['People Helped'], [report.beneficiaries_helped],
+            color='green', alpha=0.7, width=0.5)
+    ax3.set_title('Lives Impacted')
+    ax3.set_ylabel('Number of Beneficiaries')
+
+    # Add value labels on bars
+    for i, v in enumerate([report.beneficiaries_helped]):
+        ax3.text(i, v + 0.1, str(int(v)), ha='center', va='bottom', fontweight='bold')
+
+    # 4. Donation frequency visualization
+    ax4.hist(donation_amounts, bins=10, color='purple', alpha=0.7, edgecolor='black')
+    ax4.set_title('Donation Amount Distribution')
+    ax4.set_xlabel('Donation Amount ($)')
+    ax4.set_ylabel('Frequency')
+
+    fig.tight_layout()
+
+
+class ImpactChartRenderer:
+    """Renders impact charts to PNG/SVG bytes on a background worker pool
+
+    Uses the Agg canvas directly rather than pyplot, so nothing touches a
+    display or the global figure registry. Each worker thread keeps one figure
+    template and clears it after every render, which bounds memory to one
+    figure per worker. Workers never share matplotlib objects, so raising
+    ``max_workers`` trades memory for throughput.
+    """
+
+    def __init__(self, max_workers: int = 1, fmt: str = "png", dpi: int = 100,
+                 instruments: Optional[Instrumentation] = None):
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Unsupported chart format {fmt!r}; expected one of {CHART_FORMATS}")
+        self.fmt = fmt
+        self.dpi = dpi
+        self.instruments = instruments or default_instruments()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="impact-chart")
+        self._local = threading.local()
+
+    def submit(self, report: ImpactReport, fmt: Optional[str] = None) -> "Future[bytes]":
+        """Queue a report for rendering and return a future for the chart bytes"""
+        return self._executor.submit(self.render, report, fmt)
+
+    def render(self, report: ImpactReport, fmt: Optional[str] = None) -> bytes:
+        """Render a report synchronously on the calling thread"""
+        fmt = fmt or self.fmt
+        fig, axes = self._template()
+        try:
+            with self.instruments.stage("render"):
+                draw_impact_charts(fig, axes, report)
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=fmt, dpi=self.dpi)
+            return buffer.getvalue()
+        finally:
+            # Reset the template so no artists outlive the render
+            for row in axes:
+                for ax in row:
+                    ax.clear()
+            fig.suptitle('')
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool and drop its figure templates"""
+        self._executor.shutdown(wait=wait)
+
+    def _template(self):
+        """Per-thread reusable 2x2 figure"""
+        template = getattr(self._local, "template", None)
+        if template is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+            fig = Figure(figsize=(15, 12))
+            FigureCanvasAgg(fig)
+            axes = fig.subplots(2, 2)
+            template = (fig, axes)
+            self._local.template = template
+        return template
+
+    def __enter__(self) -> "ImpactChartRenderer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,175 @@
+import itertools
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+from models import CohortResult
+
+# Per-process pipeline, built once by _init_worker
+_PIPELINE: Optional["CohortPipeline"] = None
+
+
+class CohortPipeline:
+    """Onboarding, matching and planning for batches of users, without console output"""
+
+    def __init__(self, catalogue_path: Optional[str]):
+        from charity_database import CharityDatabase
+        from agents import OnboardingAgent, DonationPlanningAgent
+
+        # Models come from the on-disk registry and the catalogue is mmapped,
+        # so every worker shares the same page-cached bytes
+        self.charity_db = CharityDatabase(catalogue_path)
+        self.onboarding_agent = OnboardingAgent()
+        self.planning_agent = DonationPlanningAgent()
+        self._freeze_keyword_model()
+
+    def _freeze_keyword_model(self):
+        """Fit keyword IDF on the catalogue once and stop learning from answers
+
+        A user's results then depend only on their answers and the catalogue,
+        not on which users this process saw before, so they are the same for
+        any chunk size, worker count or resumed run.
+        """
+        from embeddings import charity_text
+
+        nlp = self.onboarding_agent.nlp_processor
+        extractor = nlp.keyword_extractor
+        extractor.partial_fit([extractor.tokens(nlp._clean_text(charity_text(charity)))
+                               for charity in self.charity_db.charities])
+        nlp.learn_keywords = False
+
+    def run(self, responses_list: List[Dict[str, any]]) -> List[CohortResult]:
+        """Process one chunk of users, preserving their order"""
+        profiles = self.onboarding_agent.conduct_onboarding_batch(responses_list)
+
+        results = []
+        matched_profiles, matched_charities, matched_results = [], [], []
+        for profile in profiles:
+            result = CohortResult(user_name=profile.name,
+                                  engagement_score=profile.predicted_engagement_score)
+            matches = self.charity_db.find_top_k(profile, 1)
+            if matches:
+                charity, score = matches[0]
+                result.charity_id = charity.id
+                result.charity_name = charity.name
+                result.match_score = score
+                matched_profiles.append(profile)
+                matched_charities.append(charity)
+                matched_results.append(result)
+            results.append(result)
+
+        plans = self.planning_agent.create_plans(matched_profiles, matched_charities)
+        for result, plan in zip(matched_results, plans):
+            result.amount = plan.amount
+            result.frequency = plan.frequency
+            result.annual_total = plan.annual_total
+        return results
+
+
+def _init_worker(catalogue_path: Optional[str]):
+    """Build the pipeline once per worker process"""
+    global _PIPELINE
+    _PIPELINE = CohortPipeline(catalogue_path)
+
+
+def _run_chunk(responses_list: List[Dict[str, any]]) -> List[CohortResult]:
+    return _PIPELINE.run(responses_list)
+
+
+class CohortRunner:
+    """Runs the matching pipeline for large user cohorts on a process pool
+
+    Workers load the models and catalogue once, in their initializer; tasks
+    carry only the users' raw answers. Users are sent in chunks, and at most
+    ``max_in_flight`` chunks are queued at a time, so a slow consumer or a
+    huge (even unbounded) input never piles up results in memory. Results are
+    yielded in input order. ``workers=0`` runs everything in this process.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256,
+                 max_in_flight: Optional[int] = None, catalogue_path: Optional[str] = None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or max(2, 2 * self.workers)
+        self.catalogue_path = catalogue_path
+        self._temporary_catalogue: Optional[str] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._local_pipeline: Optional[CohortPipeline] = None
+
+    def run(self, responses: Iterable[Dict[str, any]]) -> Iterator[CohortResult]:
+        """Stream one result per user, in order"""
+        chunks = self._chunks(responses)
+
+        if self.workers == 0:
+            if self._local_pipeline is None:
+                self._local_pipeline = CohortPipeline(self._catalogue())
+            for chunk in chunks:
+                yield from self._local_pipeline.run(chunk)
+            return
+
+        executor = self._pool()
+        in_flight: Deque[Future] = deque()
+        try:
+            for chunk in itertools.islice(chunks, self.max_in_flight):
+                in_flight.append(executor.submit(_run_chunk, chunk))
+
+            while in_flight:
+                # Wait on the oldest chunk and refill the window as it drains
+                results = in_flight.popleft().result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    in_flight.append(executor.submit(_run_chunk, next_chunk))
+                yield from results
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        if self._temporary_catalogue is not None:
+            os.remove(self._temporary_catalogue)
+            self._temporary_catalogue = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 initializer=_init_worker,
+                                                 initargs=(self._catalogue(),))
+        return self._executor
+
+    def _catalogue(self) -> str:
+        """Catalogue file the workers map
+
+        Without one, the sample charities are written to a temporary file once,
+        so every worker sees the same catalogue (the sample data is randomized
+        per CharityDatabase instance).
+        """
+        if self.catalogue_path is not None:
+            return self.catalogue_path
+        if self._temporary_catalogue is None:
+            from charity_database import CharityDatabase
+            from charity_catalogue import write_catalogue
+
+            handle, path = tempfile.mkstemp(suffix=".cat", prefix="cohort-")
+            os.close(handle)
+            write_catalogue(list(CharityDatabase().charities), path)
+            self._temporary_catalogue = path
+        return self._temporary_catalogue
+
+    def _chunks(self, responses: Iterable[Dict[str, any]]) -> Iterator[List[Dict[str, any]]]:
+        iterator = iter(responses)
+        while True:
+            chunk = list(itertools.islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def __enter__(self) -> "CohortRunner":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
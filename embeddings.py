@@ -0,0 +1,120 @@
+import re
+import zlib
+import numpy as np
+from typing import Iterable, List, Optional
+
+# Small built-in stop list so embedding does not need a corpus download
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for
+from further had has have having he her here hers him his how i if in into is it its
+itself just me more most my no nor not now of off on once only or other our ours out
+over own same she should so some such than that the their them then there these they
+this those through to too under until up very was we were what when where which while
+who whom why will with would you your yours
+""".split())
+
+_WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphabetic tokens with stop words removed"""
+    return [token for token in _WORD_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def hash_token(token: str, n_features: int) -> int:
+    """Stable bucket for a token (unlike hash(), identical across processes)"""
+    return zlib.crc32(token.encode("utf-8")) % n_features
+
+
+def hashed_counts(texts: Iterable[str], n_features: int):
+    """Sparse document-by-bucket term count matrix for a batch of texts"""
+    from scipy.sparse import csr_matrix
+
+    indices: List[int] = []
+    indptr = [0]
+    for text in texts:
+        indices.extend(hash_token(token, n_features) for token in tokenize(text))
+        indptr.append(len(indices))
+
+    data = np.ones(len(indices), dtype=np.float64)
+    counts = csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, n_features))
+    counts.sum_duplicates()
+    return counts
+
+
+def charity_text(charity) -> str:
+    """Text a charity is embedded from: description, category and tags"""
+    return ' '.join([charity.description, charity.category.replace("_", " ")] + list(charity.tags))
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length, leaving all-zero rows untouched"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class HashedTfidfEmbedder:
+    """Local text embedding: hashed TF-IDF reduced with a truncated SVD
+
+    Nothing is downloaded. Tokens are hashed into a fixed number of buckets,
+    weighted by smoothed inverse document frequency, and projected onto the top
+    singular directions of the fitted corpus. Embeddings are unit length, so a
+    dot product is the cosine similarity.
+    """
+
+    def __init__(self, dim: int = 50, n_features: int = 2 ** 14, random_state: int = 42):
+        self.dim = dim
+        self.n_features = n_features
+        self.random_state = random_state
+        self.idf: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None  # (rank, n_features)
+
+    def fit(self, texts: List[str]) -> "HashedTfidfEmbedder":
+        """Learn IDF weights and the projection from a corpus"""
+        counts = hashed_counts(texts, self.n_features)
+        n_docs = counts.shape[0]
+
+        document_frequency = np.bincount(counts.indices, minlength=self.n_features)
+        self.idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+
+        tfidf = self._weight(counts)
+        if n_docs <= self.dim:
+            # Small corpora: an exact SVD of the dense matrix is cheap
+            _, _, vt = np.linalg.svd(tfidf.toarray(), full_matrices=False)
+            self.components = vt
+        else:
+            from sklearn.decomposition import TruncatedSVD
+            svd = TruncatedSVD(n_components=self.dim, random_state=self.random_state)
+            svd.fit(tfidf)
+            self.components = svd.components_
+        return self
+
+    def fit_transform(self, texts: List[str]) -> np.ndarray:
+        return self.fit(texts).transform(texts)
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """Unit-length float32 embeddings, shape (len(texts), dim)"""
+        if self.components is None:
+            raise RuntimeError("HashedTfidfEmbedder must be fitted before transform")
+
+        tfidf = self._weight(hashed_counts(texts, self.n_features))
+        projected = np.asarray(tfidf @ self.components.T)
+
+        # Corpora smaller than dim yield fewer components; pad with zeros
+        embeddings = np.zeros((projected.shape[0], self.dim), dtype=np.float32)
+        embeddings[:, :projected.shape[1]] = projected
+        return l2_normalize(embeddings)
+
+    def _weight(self, counts):
+        """Apply IDF weights and L2-normalize each document row, in place"""
+        # Works on the CSR arrays directly; the sparse-matrix helpers cost
+        # more than the arithmetic for the one-document case
+        row_of_entry = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        counts.data *= self.idf[counts.indices]
+        row_norms = np.sqrt(np.bincount(row_of_entry, weights=counts.data ** 2,
+                                        minlength=counts.shape[0]))
+        row_norms[row_norms == 0] = 1.0
+        counts.data /= row_norms[row_of_entry]
+        return counts
@@ -0,0 +1,193 @@
+import marshal
+import numpy as np
+from array import array
+from typing import List, Optional, Sequence
+
+# Up to this many rows, walking each tree in Python beats NumPy's per-call overhead
+PYTHON_ROWS = 4
+# Generated row functions nest one block per tree level, and Python's
+# tokenizer allows 100 indentation levels
+MAX_ROW_CODE_DEPTH = 90
+
+
+class CompiledForest:
+    """A fitted forest regressor flattened into NumPy node arrays
+
+    The nodes of every tree are concatenated: ``feature``, ``threshold``,
+    ``left``, ``right`` and ``value`` are indexed by global node id and
+    ``roots`` holds each tree's first node. Leaves point back to themselves
+    with feature -1 and an infinite threshold, so a traversal can keep
+    stepping once it reaches one. A row goes left when its float32 feature
+    value is <= the threshold, exactly like sklearn, and tree outputs are
+    summed in tree order before dividing, so predictions are identical to
+    ``forest.predict``. Nothing here needs sklearn once compiled.
+
+    Single rows are fastest through ``load_row_code``: the forest as one
+    generated Python function of nested comparisons against constants
+    (see ``row_code``), which skips every node-array lookup.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray, n_features: int,
+                 max_depth: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.n_features = n_features
+        self.max_depth = max_depth
+        self._lists: Optional[tuple] = None
+        self._row_function = None
+
+    def __getstate__(self):
+        # The list copies are rebuilt on demand and row code is persisted on its own
+        state = self.__dict__.copy()
+        state["_lists"] = None
+        state["_row_function"] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("_row_function", None)
+        self.__dict__.update(state)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    def predict(self, X) -> np.ndarray:
+        """Predictions for a batch of rows, identical to the source forest's"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got {X.shape[1]}")
+        if len(X) <= PYTHON_ROWS:
+            predict_row = self._row_function or self._predict_row
+            return np.array([predict_row(row) for row in X.tolist()], dtype=np.float64)
+        return self._predict_batch(X)
+
+    def predict_row(self, x: Sequence[float]) -> float:
+        """Prediction for a single row, without going through NumPy"""
+        row = array("f", x).tolist()  # the float32 rounding predict applies
+        if len(row) != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got {len(row)}")
+        return (self._row_function or self._predict_row)(row)
+
+    @property
+    def has_row_code(self) -> bool:
+        return self._row_function is not None
+
+    def load_row_code(self, code: Optional[bytes]):
+        """Evaluate single rows with code from ``row_code`` (None keeps the node walk)"""
+        if code is None:
+            self._row_function = None
+            return
+        namespace = {}
+        exec(marshal.loads(code), namespace)
+        self._row_function = namespace["predict_row"]
+
+    def _predict_row(self, x: List[float]) -> float:
+        """Walk every tree for one row over list copies of the node arrays"""
+        if self._lists is None:
+            self._lists = (self.feature.tolist(), self.threshold.tolist(), self.left.tolist(),
+                           self.right.tolist(), self.value.tolist(), self.roots.tolist())
+        feature, threshold, left, right, value, roots = self._lists
+
+        total = 0.0
+        for node in roots:
+            while True:
+                column = feature[node]
+                if column < 0:
+                    break
+                node = left[node] if x[column] <= threshold[node] else right[node]
+            total += value[node]
+        return total / len(roots)
+
+    def _predict_batch(self, X: np.ndarray) -> np.ndarray:
+        """Advance every (row, tree) pair one level per step, max_depth steps"""
+        nodes = np.repeat(self.roots[np.newaxis, :], len(X), axis=0)
+        rows = np.arange(len(X))[:, np.newaxis]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # Running sum keeps sklearn's tree-by-tree accumulation order
+        return np.cumsum(self.value[nodes], axis=1)[:, -1] / self.n_trees
+
+
+def row_source(forest: CompiledForest) -> str:
+    """Python source of ``predict_row(x)``: every tree as nested if/else on constants
+
+    Leaves add their value to a running total in tree order and the total
+    is divided by the tree count, as in ``_predict_row``. ``repr`` of a
+    float round-trips exactly, so thresholds and values are unchanged.
+    """
+    feature, threshold, left, right, value = (nodes.tolist() for nodes in (
+        forest.feature, forest.threshold, forest.left, forest.right, forest.value))
+    lines = ["def predict_row(x):",
+             "    " + ", ".join(f"x{column}" for column in range(forest.n_features)) + ", = x",
+             "    total = 0.0"]
+    for root in forest.roots.tolist():
+        # (node, depth), or (None, depth) for the "else:" between two subtrees
+        stack = [(root, 1)]
+        while stack:
+            node, depth = stack.pop()
+            indent = "    " * depth
+            if node is None:
+                lines.append(f"{indent[4:]}else:")
+            elif feature[node] < 0:
+                lines.append(f"{indent}total += {value[node]!r}")
+            else:
+                lines.append(f"{indent}if x{feature[node]} <= {threshold[node]!r}:")
+                stack += [(right[node], depth + 1), (None, depth + 1), (left[node], depth + 1)]
+    lines.append(f"    return total / {forest.n_trees}")
+    return "\n".join(lines)
+
+
+def row_code(forest: CompiledForest) -> Optional[bytes]:
+    """Marshalled code of ``row_source``, or None for trees too deep to nest
+
+    Compiling takes a second or two for a forest of ~60k nodes, so callers
+    should persist the result. Marshalled code only loads on the Python
+    version that wrote it.
+    """
+    if forest.max_depth > MAX_ROW_CODE_DEPTH:
+        return None
+    return marshal.dumps(compile(row_source(forest), "<compiled forest>", "exec"))
+
+
+def compile_forest(forest) -> CompiledForest:
+    """Flatten a fitted single-output sklearn forest regressor"""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("only single-output forests can be compiled")
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+
+        features.append(np.where(leaf, -1, tree.feature))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+        rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+        values.append(tree.value[:, 0, 0])
+        roots.append(offset)
+        offset += tree.node_count
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.concatenate(values).astype(np.float64),
+        roots=np.array(roots, dtype=np.int32),
+        n_features=forest.n_features_in_,
+        max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_)
+    )
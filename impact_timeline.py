@@ -0,0 +1,173 @@
+import numpy as np
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+FREQUENCY_DAYS = {"weekly": 7, "monthly": 30, "quarterly": 90}
+
+MILESTONES = {
+    "water_sanitation": [
+        "Milestone: Provided clean water for 10 people for a month!",
+        "Milestone: Supported maintenance of a water pump for a full month!",
+        "Milestone: Contributed to building a new well access point!"
+    ],
+    "education": [
+        "Milestone: Provided school supplies for an entire classroom!",
+        "Milestone: Sponsored a child's education for a full semester!",
+        "Milestone: Funded a week of teacher training!"
+    ],
+    "environment": [
+        "Milestone: Planted a small forest of 25 trees!",
+        "Milestone: Protected an acre of rainforest!",
+        "Milestone: Powered a village with solar for a month!"
+    ]
+}
+DEFAULT_MILESTONES = ["Milestone: Making a real difference!"]
+
+# Milestone tiers by cumulative amount; NO_MILESTONE marks ordinary donations
+NO_MILESTONE = -1
+MILESTONE_EVERY = 5
+
+
+def milestone_text(category: str, tier: int) -> str:
+    """Milestone description for a category at a cumulative-amount tier"""
+    charity_milestones = MILESTONES.get(category, DEFAULT_MILESTONES)
+
+    # Choose milestone based on amount
+    if tier == 2:
+        return charity_milestones[-1]
+    elif tier == 1:
+        return charity_milestones[-2] if len(charity_milestones) > 1 else charity_milestones[0]
+    else:
+        return charity_milestones[0]
+
+
+def milestone_tier(cumulative_amount: float) -> int:
+    """0 up to $100, 1 above $100, 2 above $200"""
+    if cumulative_amount > 200:
+        return 2
+    elif cumulative_amount > 100:
+        return 1
+    return 0
+
+
+class ImpactTimeline(Sequence):
+    """Columnar donation timeline that still reads like a list of dicts
+
+    Dates, amounts, cumulative totals and milestone tiers are NumPy columns.
+    Indexing or iterating builds the legacy ``{"date", "amount", "cumulative",
+    "milestone"}`` dict for one entry at a time, so existing callers keep
+    working while bulk consumers use the columns directly.
+    """
+
+    __slots__ = ("dates", "amounts", "cumulative", "milestone_tiers", "category")
+
+    def __init__(self, dates: np.ndarray, amounts: np.ndarray, cumulative: np.ndarray,
+                 milestone_tiers: np.ndarray, category: str):
+        self.dates = dates  # datetime64[D], chronological
+        self.amounts = amounts
+        self.cumulative = cumulative
+        self.milestone_tiers = milestone_tiers  # int8, NO_MILESTONE where none
+        self.category = category
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("timeline index out of range")
+        return self._entry(index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ImpactTimeline, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ImpactTimeline({len(self)} donations, category={self.category!r})"
+
+    def milestone_indices(self) -> np.ndarray:
+        """Positions of entries that carry a milestone"""
+        return np.flatnonzero(self.milestone_tiers != NO_MILESTONE)
+
+    def to_list(self) -> List[Dict[str, any]]:
+        """Materialize the legacy list-of-dicts form"""
+        dates = np.datetime_as_string(self.dates, unit="D").tolist()
+        amounts = self.amounts.tolist()
+        cumulative = self.cumulative.tolist()
+        tiers = self.milestone_tiers.tolist()
+        return [
+            {
+                "date": dates[i],
+                "amount": amounts[i],
+                "cumulative": cumulative[i],
+                "milestone": None if tiers[i] == NO_MILESTONE else milestone_text(self.category, tiers[i])
+            }
+            for i in range(len(dates))
+        ]
+
+    def _entry(self, i: int) -> Dict[str, any]:
+        tier = int(self.milestone_tiers[i])
+        return {
+            "date": str(self.dates[i]),
+            "amount": float(self.amounts[i]),
+            "cumulative": float(self.cumulative[i]),
+            "milestone": None if tier == NO_MILESTONE else milestone_text(self.category, tier)
+        }
+
+
+def _schedule(frequency: str, months: int, now: Optional[datetime]) -> np.ndarray:
+    """Chronological donation dates ending today"""
+    days_between = FREQUENCY_DAYS[frequency]
+    n_donations = months * (30 // days_between)
+    today = np.datetime64((now or datetime.now()).date(), "D")
+    # Entry j is (n - 1 - j) periods before today
+    offsets = np.arange(n_donations - 1, -1, -1, dtype=np.int64) * days_between
+    return today - offsets.astype("timedelta64[D]")
+
+
+def _milestone_tiers(cumulative: np.ndarray) -> np.ndarray:
+    """Tier per entry for a (..., n) cumulative array in chronological order"""
+    n_donations = cumulative.shape[-1]
+    tiers = np.full(cumulative.shape, NO_MILESTONE, dtype=np.int8)
+
+    # Counting back from today, every fifth donation is a milestone
+    steps_back = np.arange(n_donations - 1, -1, -1)
+    is_milestone = steps_back % MILESTONE_EVERY == MILESTONE_EVERY - 1
+    tiers[..., is_milestone] = np.select(
+        [cumulative[..., is_milestone] > 200, cumulative[..., is_milestone] > 100], [2, 1], 0
+    )
+    return tiers
+
+
+def build_timeline(amount: float, frequency: str, months: int, category: str,
+                   now: Optional[datetime] = None) -> ImpactTimeline:
+    """Timeline for one recurring donation, in closed form"""
+    return build_timelines(np.array([amount]), frequency, months, [category], now)[0]
+
+
+def build_timelines(amounts: np.ndarray, frequency: str, months: int, categories: List[str],
+                    now: Optional[datetime] = None) -> List[ImpactTimeline]:
+    """Timelines for many donors sharing a frequency, computed as one matrix
+
+    Every timeline shares one date column, and the cumulative totals come from
+    a single row-wise cumsum.
+    """
+    dates = _schedule(frequency, months, now)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    n_donations = len(dates)
+
+    # Same left-to-right accumulation as summing one donation at a time. The
+    # original list counts up from the most recent donation, so reverse after.
+    per_donation = np.broadcast_to(amounts[:, None], (len(amounts), n_donations))
+    cumulative = np.cumsum(per_donation, axis=1)[:, ::-1]
+    tiers = _milestone_tiers(cumulative)
+
+    return [
+        ImpactTimeline(dates, per_donation[row], cumulative[row], tiers[row], categories[row])
+        for row in range(len(amounts))
+    ]
@@ -0,0 +1,329 @@
+import io
+import json
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
+
+# Bucket upper bounds: four per doubling from 1us to ~2 minutes, so any
+# percentile read from the buckets is within ~19% of the true value
+BUCKET_BOUNDS: Tuple[float, ...] = tuple(1e-6 * 2 ** (i / 4) for i in range(108))
+QUANTILES = (0.5, 0.95, 0.99)
+
+# cProfile and tracemalloc are process-wide, so only one stage samples at a time
+_sampling = threading.Lock()
+
+
+class LatencyHistogram:
+    """Log-bucketed distribution of stage durations, in seconds
+
+    ``observe`` only appends to a pending list (atomic under the GIL, so no
+    lock on the request path); every ``fold_every`` observations, and before
+    any read, the pending values are binned in one vectorized pass. Memory
+    is fixed whatever the number of observations. Percentiles interpolate
+    within the bucket that holds them and are clamped to the observed min
+    and max.
+    """
+
+    def __init__(self, bounds: Tuple[float, ...] = BUCKET_BOUNDS, fold_every: int = 1024):
+        self.bounds = bounds
+        self.fold_every = fold_every
+        self._bounds = np.asarray(bounds)
+        self._counts = np.zeros(len(bounds) + 1, dtype=np.int64)  # last bucket is +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._min = float("inf")
+        self._max = 0.0
+        self._pending: List[float] = []
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        pending = self._pending
+        pending.append(seconds)
+        if len(pending) >= self.fold_every:
+            self._fold()
+
+    def _fold(self):
+        """Move pending observations into the buckets"""
+        with self._lock:
+            pending = self._pending
+            taken = len(pending)
+            if not taken:
+                return
+            # Appends racing with this land after ``taken`` and stay pending
+            values = np.array(pending[:taken])
+            del pending[:taken]
+            self._counts += np.bincount(np.searchsorted(self._bounds, values),
+                                        minlength=len(self._counts))
+            self._count += taken
+            self._sum += float(values.sum())
+            self._min = min(self._min, float(values.min()))
+            self._max = max(self._max, float(values.max()))
+
+    @property
+    def count(self) -> int:
+        self._fold()
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        self._fold()
+        return self._sum
+
+    def quantile(self, q: float) -> float:
+        """Estimated duration below which a fraction ``q`` of observations fall"""
+        self._fold()
+        with self._lock:
+            counts, count, low, high = self._counts.tolist(), self._count, self._min, self._max
+        if count == 0:
+            return 0.0
+
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else low
+                upper = self.bounds[index] if index < len(self.bounds) else high
+                lower, upper = max(lower, low), min(upper, high)
+                # Geometric interpolation, as the buckets are log-spaced
+                fraction = (rank - cumulative) / bucket_count
+                estimate = lower * (upper / lower) ** fraction if lower > 0 else upper * fraction
+                return min(max(estimate, low), high)
+            cumulative += bucket_count
+        return high
+
+    def snapshot(self) -> Dict[str, float]:
+        """Count, sum, mean, min, max and the standard percentiles"""
+        self._fold()
+        count = self._count
+        summary = {"count": count, "sum": self._sum,
+                   "mean": self._sum / count if count else 0.0,
+                   "min": self._min if count else 0.0, "max": self._max}
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.quantile(q)
+        return summary
+
+    def cumulative_counts(self, step: int = 1) -> List[Tuple[float, int]]:
+        """(upper bound, observations at or below it) for every ``step``-th bound, then +Inf"""
+        self._fold()
+        with self._lock:
+            cumulative = np.cumsum(self._counts).tolist()
+        buckets = [(bound, cumulative[index]) for index, bound in enumerate(self.bounds)
+                   if index % step == 0]
+        buckets.append((float("inf"), cumulative[-1]))
+        return buckets
+
+
+class StageProfiler:
+    """Runs every ``every``-th call of a stage under cProfile and/or tracemalloc
+
+    CPU samples accumulate into one pstats.Stats; memory samples record the
+    peak bytes traced during the call. Both tools are process-wide, so a
+    sample is skipped while another stage is being sampled. Memory is the
+    peak above what was traced when the stage began.
+    """
+
+    def __init__(self, name: str, every: int = 100, cpu: bool = True, memory: bool = False,
+                 max_samples: int = 1000):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.name = name
+        self.every = every
+        self.cpu = cpu
+        self.memory = memory
+        self.calls = 0
+        self.samples = 0
+        self.stats: Optional["pstats.Stats"] = None
+        self.peak_bytes: Deque[int] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def start(self) -> Optional[Tuple[Optional["cProfile.Profile"], bool, int]]:
+        """Begin a sample if this call is due one; returns what stop() needs"""
+        # Imported here so only profiled stages pay for pstats and friends
+        import cProfile
+        import tracemalloc
+
+        with self._lock:
+            self.calls += 1
+            due = (self.calls - 1) % self.every == 0
+        if not due or not _sampling.acquire(blocking=False):
+            return None
+
+        started_tracing, baseline = False, 0
+        if self.memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        profile = None
+        if self.cpu:
+            profile = cProfile.Profile()
+            profile.enable()
+        return profile, started_tracing, baseline
+
+    def stop(self, token: Tuple[Optional["cProfile.Profile"], bool, int]):
+        import pstats
+        import tracemalloc
+
+        profile, started_tracing, baseline = token
+        try:
+            if profile is not None:
+                profile.disable()
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                if started_tracing:
+                    tracemalloc.stop()
+        finally:
+            _sampling.release()
+
+        with self._lock:
+            self.samples += 1
+            if profile is not None:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profile)
+                else:
+                    self.stats.add(profile)
+            if self.memory:
+                self.peak_bytes.append(peak)
+
+    def report(self, limit: int = 20, sort: str = "cumulative") -> str:
+        """Top functions by ``sort`` and peak memory, as text"""
+        lines = [f"Stage {self.name!r}: {self.samples} samples of {self.calls} calls"]
+        if self.peak_bytes:
+            peaks = sorted(self.peak_bytes)
+            lines.append(f"Peak traced memory: median {peaks[len(peaks) // 2] / 1024:.1f} KiB, "
+                         f"max {peaks[-1] / 1024:.1f} KiB")
+        if self.stats is not None:
+            buffer = io.StringIO()
+            self.stats.stream = buffer
+            self.stats.sort_stats(sort).print_stats(limit)
+            lines.append(buffer.getvalue())
+        return "\n".join(lines)
+
+
+class _Stage:
+    """Times one run of a stage, sampling it if a profiler is attached"""
+
+    __slots__ = ("histogram", "start", "profiler", "profile_token")
+
+    def __init__(self, histogram: LatencyHistogram, profiler: Optional[StageProfiler]):
+        self.histogram = histogram
+        self.profiler = profiler
+        self.profile_token = None
+
+    def __enter__(self) -> "_Stage":
+        if self.profiler is not None:
+            self.profile_token = self.profiler.start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        if self.profile_token is not None:
+            self.profiler.stop(self.profile_token)
+        self.histogram.observe(elapsed)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Instrumentation:
+    """Per-stage latency histograms for the matching pipeline
+
+    Components wrap their work in ``with instruments.stage(name):``; each
+    stage gets a LatencyHistogram on first use. ``snapshot``/``to_json`` give
+    count, mean and p50/p95/p99 per stage, and ``to_prometheus`` renders the
+    histograms in the Prometheus text format. ``profile(name)`` attaches a
+    sampling StageProfiler to a stage. A disabled instance records nothing
+    and hands out a shared no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.profilers: Dict[str, StageProfiler] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        """Context manager timing one run of ``name``"""
+        if not self.enabled:
+            return _NULL_STAGE
+        histogram = self.histograms.get(name) or self.histogram(name)
+        profilers = self.profilers
+        return _Stage(histogram, profilers.get(name) if profilers else None)
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def observe(self, name: str, seconds: float):
+        self.histogram(name).observe(seconds)
+
+    def profile(self, name: str, every: int = 100, cpu: bool = True, memory: bool = False) -> StageProfiler:
+        """Sample every ``every``-th run of stage ``name`` with cProfile and/or tracemalloc"""
+        profiler = StageProfiler(name, every, cpu, memory)
+        self.profilers = {**self.profilers, name: profiler}
+        return profiler
+
+    def unprofile(self, name: str) -> Optional[StageProfiler]:
+        profiler = self.profilers.get(name)
+        self.profilers = {key: value for key, value in self.profilers.items() if key != name}
+        return profiler
+
+    def reset(self):
+        """Forget every recorded timing (profilers stay attached)"""
+        with self._lock:
+            self.histograms = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())}
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps({"stages": self.snapshot()}, indent=indent)
+
+    def to_prometheus(self, metric: str = "donation_stage_duration_seconds", bucket_step: int = 4) -> str:
+        """Prometheus text exposition: one histogram per stage plus percentile gauges
+
+        Only every ``bucket_step``-th bucket bound is exported (powers of two
+        microseconds by default) to keep scrapes small; the counts stay exact.
+        """
+        histograms = sorted(self.histograms.items())
+        lines = [f"# HELP {metric} Time spent in each pipeline stage.",
+                 f"# TYPE {metric} histogram"]
+        for name, histogram in histograms:
+            for bound, cumulative in histogram.cumulative_counts(bucket_step):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {histogram.sum!r}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {histogram.count}')
+
+        quantile_metric = f"{metric}_quantile"
+        lines += [f"# HELP {quantile_metric} Estimated stage duration percentiles.",
+                  f"# TYPE {quantile_metric} gauge"]
+        for name, histogram in histograms:
+            for q in QUANTILES:
+                lines.append(f'{quantile_metric}{{stage="{name}",quantile="{q}"}} {histogram.quantile(q)!r}')
+        return "\n".join(lines) + "\n"
+
+
+_default_instruments = Instrumentation()
+
+
+def default_instruments() -> Instrumentation:
+    """The process-wide instrumentation components use unless given one"""
+    return _default_instruments
@@ -0,0 +1,93 @@
+import threading
+import numpy as np
+from typing import List, Sequence
+from embeddings import STOP_WORDS, hash_token
+
+
+class KeywordExtractor:
+    """Ranked keywords from hashed TF-IDF with incrementally learned document frequencies
+
+    Words are hashed into ``n_features`` buckets, so the model is a fixed-size
+    document-frequency array that ``partial_fit`` keeps updating as new
+    answers arrive. Buckets are hashed per call, so memory does not grow with
+    the vocabulary. ``transform`` scores a whole
+    batch at once: term counts per (document, bucket) come from one
+    ``np.unique`` over the flattened batch, are weighted by smoothed IDF and
+    ranked per document by score, then first occurrence, so the top-k is
+    deterministic. Words sharing a bucket within one text are reported as the
+    first of them.
+    """
+
+    def __init__(self, top_k: int = 10, n_features: int = 2 ** 18, min_length: int = 4):
+        self.top_k = top_k
+        self.n_features = n_features
+        self.min_length = min_length
+        self.n_documents = 0
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def tokens(self, text: str) -> List[str]:
+        """Candidate keywords of cleaned, lowercased text, in order"""
+        return self.filter_words(text.split())
+
+    def filter_words(self, words: Sequence[str]) -> List[str]:
+        return [word for word in words if len(word) >= self.min_length and word not in STOP_WORDS]
+
+    def partial_fit(self, token_lists: Sequence[Sequence[str]]) -> "KeywordExtractor":
+        """Count each document's distinct buckets into the document frequencies"""
+        keys, _ = self._document_keys(token_lists)
+        # A bucket may repeat across documents, so add.at rather than fancy +=
+        distinct = np.unique(keys) % self.n_features
+        with self._lock:
+            np.add.at(self.document_frequency, distinct, 1)
+            self.n_documents += len(token_lists)
+        return self
+
+    @property
+    def idf(self) -> np.ndarray:
+        """Smoothed inverse document frequency of every bucket"""
+        return self.bucket_idf(np.arange(self.n_features))
+
+    def bucket_idf(self, buckets: np.ndarray) -> np.ndarray:
+        """Smoothed IDF of the given buckets only, so a batch never touches all of them"""
+        return np.log((1 + self.n_documents) / (1 + self.document_frequency[buckets])) + 1
+
+    def transform(self, token_lists: Sequence[Sequence[str]], top_k: int = None) -> List[List[str]]:
+        """Top-k keywords of each document, best first"""
+        top_k = self.top_k if top_k is None else top_k
+        keys, flat = self._document_keys(token_lists)
+        if not flat:
+            return [[] for _ in token_lists]
+
+        unique_keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        documents = unique_keys // self.n_features
+        scores = counts * self.bucket_idf(unique_keys % self.n_features)
+
+        # Per document: highest TF-IDF first, ties broken by first occurrence
+        order = np.lexsort((first, -scores, documents))
+        documents = documents[order]
+        first = first[order]
+        starts = np.searchsorted(documents, np.arange(len(token_lists) + 1))
+
+        keywords = []
+        for document in range(len(token_lists)):
+            start, end = starts[document], starts[document + 1]
+            keywords.append([flat[i] for i in first[start:min(end, start + top_k)].tolist()])
+        return keywords
+
+    def fit_transform(self, token_lists: Sequence[Sequence[str]], top_k: int = None) -> List[List[str]]:
+        """Learn from a batch of documents, then rank their keywords"""
+        return self.partial_fit(token_lists).transform(token_lists, top_k)
+
+    def _document_keys(self, token_lists: Sequence[Sequence[str]]):
+        """(document * n_features + bucket) for every token of the batch, plus the flat tokens"""
+        flat = [token for tokens in token_lists for token in tokens]
+
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64,
+                              count=len(token_lists))
+        documents = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+        # Hashed on every call rather than cached, so memory stays flat however many words arrive
+        n_features = self.n_features
+        bucket_ids = np.fromiter((hash_token(token, n_features) for token in flat), dtype=np.int64,
+                                 count=len(flat))
+        return documents * self.n_features + bucket_ids, flat
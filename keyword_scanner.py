@@ -0,0 +1,146 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+# Inflections accepted after a keyword: "animals", "helping", "loved".
+# Derivations are left out, as they can change the meaning: "-less" negates
+# ("careless", "hopeless") and agentive "-er" turns "care" into "career"
+DEFAULT_SUFFIXES = ("s", "es", "d", "ed", "ing", "ings", "ly")
+# Shortest remainder after a keyword at the start of a closed compound
+# ("heart|breaking", "health|care"), long enough that "care|ers" isn't one
+MIN_COMPOUND_PART = 4
+# Remainders that negate the keyword before them, so "heart|less" is no compound
+NEGATING_ENDINGS = ("less",)
+# Words found not to be compounds are remembered, up to this many
+MAX_REJECTED_WORDS = 1 << 16
+
+
+def inflections(keyword: str, suffixes: Sequence[str]) -> List[str]:
+    """``keyword`` followed by each suffix, with English spelling changes
+
+    A final silent "e" drops before a vowel ("care" -> "caring", "loved")
+    and a final consonant + "y" becomes "i" except before "i" ("study" ->
+    "studies", "studying").
+    """
+    forms = [keyword]
+    for suffix in suffixes:
+        if keyword.endswith("e") and suffix[0] in "aeiouy":
+            forms.append(keyword[:-1] + suffix)
+        elif keyword.endswith("y") and len(keyword) > 1 and keyword[-2] not in "aeiou" and suffix[0] != "i":
+            forms.append(keyword[:-1] + "i" + ("es" if suffix == "s" else suffix))
+        else:
+            forms.append(keyword + suffix)
+    return forms
+
+
+class KeywordMatches:
+    """Which keywords of each table/label a text contains"""
+
+    __slots__ = ("found",)
+
+    def __init__(self, found: Dict[str, Dict[str, FrozenSet[str]]]):
+        self.found = found  # table -> label -> matched keywords
+
+    def keywords(self, table: str, label: str) -> FrozenSet[str]:
+        return self.found.get(table, {}).get(label, frozenset())
+
+    def count(self, table: str, label: str) -> int:
+        """Number of distinct keywords of a label present in the text"""
+        return len(self.keywords(table, label))
+
+    def counts(self, table: str) -> Dict[str, int]:
+        return {label: len(words) for label, words in self.found.get(table, {}).items()}
+
+
+class KeywordScanner:
+    """Whole-word matcher for several keyword tables at once
+
+    Compiled once from ``{table: {label: [keyword, ...]}}``. Every keyword is
+    one or more whole words, so a text is matched on its word sequence: one
+    pass collects its distinct words (and word n-grams for multi-word
+    keywords), and a single hash lookup maps each to every (table, label) it
+    belongs to. That replaces one substring scan per keyword.
+
+    A keyword matches a whole word, optionally inflected with one of
+    ``suffixes`` ("caring"), or as the first part of a closed compound whose
+    remainder is at least MIN_COMPOUND_PART letters ("heartbreaking"); a
+    remainder that is itself a keyword matches too ("healthcare"). Negated
+    forms do not match: "care" is found in "caring" and "healthcare" but
+    not in "uncaring", "careless", "career" or "scare". Inflections are
+    expanded up front; compounds are looked for once per distinct word and
+    the answer remembered, so a scan over familiar words is two set
+    operations.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, Sequence[str]]],
+                 suffixes: Sequence[str] = DEFAULT_SUFFIXES):
+        self.tables = {table: {label: list(keywords) for label, keywords in labels.items()}
+                       for table, labels in tables.items()}
+        self.suffixes = tuple(suffixes)
+
+        self._targets: Dict[str, List[Tuple[str, str]]] = {}
+        for table, labels in self.tables.items():
+            for label, keywords in labels.items():
+                for keyword in keywords:
+                    self._targets.setdefault(keyword.lower(), []).append((table, label))
+        # Every accepted surface form ("animal", "animals", "helping") -> its keywords;
+        # compounds found later can stand for two ("healthcare")
+        self._forms: Dict[str, Tuple[str, ...]] = {}
+        for keyword in self._targets:
+            for form in inflections(keyword, self.suffixes):
+                keywords = self._forms.get(form, ())
+                if keyword not in keywords:
+                    self._forms[form] = keywords + (keyword,)
+        # Both grow with the compounds found in scanned text; _known also holds
+        # every word already found not to be one
+        self._form_set = set(self._forms)
+        self._known = set(self._forms)
+        # Compounds start with a bare keyword; its leading letters rule out most words in one lookup
+        self._heads = frozenset(keyword[:MIN_COMPOUND_PART] for keyword in self._targets)
+        self._head_lengths = sorted({len(keyword) for keyword in self._targets}, reverse=True)
+        self._max_words = max((len(keyword.split()) for keyword in self._targets), default=1)
+
+    def scan(self, text: Optional[str] = None, words: Optional[Sequence[str]] = None) -> KeywordMatches:
+        """Match cleaned, lowercased text (or its pre-split words) against every table"""
+        if words is None:
+            words = text.split()
+
+        candidates = set(words)
+        unseen = candidates - self._known
+        if unseen:
+            self._learn_compounds(unseen)
+        if self._max_words > 1:
+            for size in range(2, self._max_words + 1):
+                candidates.update(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+        present = set().union(*map(self._forms.__getitem__, candidates & self._form_set))
+
+        found: Dict[str, Dict[str, set]] = {table: {label: set() for label in labels}
+                                            for table, labels in self.tables.items()}
+        for keyword in present:
+            for table, label in self._targets[keyword]:
+                found[table][label].add(keyword)
+        return KeywordMatches({table: {label: frozenset(matched) for label, matched in labels.items()}
+                               for table, labels in found.items()})
+
+    def _learn_compounds(self, words: Iterable[str]):
+        """Add the compounds among ``words`` as forms and remember the rest"""
+        if len(self._known) - len(self._form_set) > MAX_REJECTED_WORDS:
+            self._known = set(self._form_set)
+        forms, targets, heads = self._forms, self._targets, self._heads
+        for word in words:
+            keywords = ()
+            if len(word) >= 2 * MIN_COMPOUND_PART and word[:MIN_COMPOUND_PART] in heads:
+                # The longest keyword the word starts with, and its remainder
+                for length in self._head_lengths:
+                    if len(word) - length >= MIN_COMPOUND_PART and word[:length] in targets:
+                        if word.startswith(NEGATING_ENDINGS, length):
+                            break
+                        keywords = (word[:length],) + tuple(keyword for keyword in forms.get(word[length:], ())
+                                                            if keyword != word[:length])
+                        break
+            if keywords:
+                forms[word] = keywords
+                self._form_set.add(word)
+            self._known.add(word)
+
+    def scan_many(self, texts: Iterable[str]) -> List[KeywordMatches]:
+        return [self.scan(text) for text in texts]
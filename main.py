@@ -1,56 +1,78 @@
+import argparse
 from typing import Dict, List, Optional, Tuple
 from models import ImpactReport
 from charity_database import CharityDatabase
 from agents import OnboardingAgent, CurationAgent, DonationPlanningAgent, ImpactVisualizationAgent
+from telemetry import EventBus, ConsoleSubscriber
+from instrumentation import Instrumentation
 
 
 class CharityMatchingAI:
     """Main orchestrating agent that coordinates all other agents"""
 
-    def __init__(self):
-        self.charity_db = CharityDatabase()
-        self.onboarding_agent = OnboardingAgent()
-        self.curation_agent = CurationAgent(self.charity_db)
-        self.planning_agent = DonationPlanningAgent()
-        self.impact_agent = ImpactVisualizationAgent()
+    def __init__(self, verbose: bool = True, events: Optional[EventBus] = None,
+                 instruments: Optional[Instrumentation] = None):
+        # Progress is reported as events; the console is just one subscriber
+        self.events = events or EventBus()
+        if verbose:
+            self.events.subscribe(ConsoleSubscriber())
+        # Per-stage latencies of every request, see instruments.snapshot()
+        self.instruments = instruments or Instrumentation()
+        self.charity_db = CharityDatabase(instruments=self.instruments)
+        self.onboarding_agent = OnboardingAgent(self.events, self.instruments)
+        self.curation_agent = CurationAgent(self.charity_db, self.events)
+        self.planning_agent = DonationPlanningAgent(self.events, self.instruments)
+        self.impact_agent = ImpactVisualizationAgent(events=self.events, instruments=self.instruments)
 
     def run_full_process(self, user_responses: Dict[str, any]) -> ImpactReport:
         """Run the complete charity matching and donation process"""
+        with self.instruments.stage("request"):
+            return self._run_stages(user_responses)
 
-        print("Welcome to AI-Powered Charity Matching!")
-        print("=" * 50)
+    def _run_stages(self, user_responses: Dict[str, any]) -> ImpactReport:
+        """Onboarding, matching, planning and the impact report for one user"""
+        events = self.events
+        if events.enabled:
+            events.emit("process.started")
 
         # Step 1: Analyze interests through onboarding
-        print("\nStep 1: Analyzing Your Interests...")
+        if events.enabled:
+            events.emit("process.step", number=1, title="Analyzing Your Interests")
         user_profile = self.onboarding_agent.conduct_onboarding(user_responses)
-        print(f"Profile created for {user_profile.name}!")
+        if events.enabled:
+            events.emit("process.profile_created", name=user_profile.name)
 
         # Step 2: Curate perfect match
-        print("\nStep 2: Finding Your Perfect Charity Match...")
+        if events.enabled:
+            events.emit("process.step", number=2, title="Finding Your Perfect Charity Match")
         perfect_match = self.curation_agent.find_perfect_match(user_profile)
 
         if not perfect_match:
-            print("No suitable matches found. Please try adjusting your preferences.")
+            if events.enabled:
+                events.emit("process.no_match", name=user_profile.name)
             return None
 
         # Step 3: Propose feel-good plan
-        print("\nStep 3: Creating Your Personalized Donation Plan...")
+        if events.enabled:
+            events.emit("process.step", number=3, title="Creating Your Personalized Donation Plan")
         donation_plan = self.planning_agent.create_plan(user_profile, perfect_match)
 
         # Step 4: Simulate donation and show impact
-        print("\nStep 4: Generating Your Impact Report...")
-        print("Simulating 6 months of donations...")
+        if events.enabled:
+            events.emit("process.step", number=4, title="Generating Your Impact Report")
+            events.emit("process.simulating", months=6)
 
         impact_report = self.impact_agent.generate_impact_report(donation_plan, months_donated=6)
 
-        print(f"\nProcess Complete! You're now connected with {perfect_match.name}")
-        print("Your donations are making a real difference in the world! 🌍")
+        if events.enabled:
+            events.emit("process.complete", name=user_profile.name, charity_id=perfect_match.id,
+                        charity_name=perfect_match.name)
 
         return impact_report
 
 
 # Example usage and testing
-def main():
+def main(instruments: Optional[Instrumentation] = None):
     """Demonstrate the complete AI charity matching system"""
 
     # Sample user responses (in a real system, this would come from a UI)
@@ -66,7 +88,7 @@ def main():
     }
 
     # Initialize and run the AI system
-    charity_ai = CharityMatchingAI()
+    charity_ai = CharityMatchingAI(instruments=instruments)
 
     print("Sample User Responses:")
     for key, value in sample_responses.items():
@@ -78,6 +100,47 @@ def main():
     return impact_report
 
 
+def cli(argv: Optional[List[str]] = None):
+    """Run the demonstration, or with --batch process a JSONL file of user responses"""
+    parser = argparse.ArgumentParser(description="AI-powered charity matching")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="JSONL file with one responses object (as in main()) per line")
+    parser.add_argument("--output", help="JSONL results file (default: INPUT.results.jsonl)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--catalogue", help="charity catalogue built with charity_catalogue")
+    parser.add_argument("--workers", type=int, help="worker processes, 0 runs in this process")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--checkpoint-every", type=int, default=10000, help="records between checkpoints")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--metrics", choices=("json", "prometheus"),
+                        help="print per-stage latencies of the demonstration afterwards")
+    parser.add_argument("--profile", metavar="STAGE", action="append", default=[],
+                        help="profile a stage (e.g. find_matches) with cProfile and tracemalloc")
+    args = parser.parse_args(argv)
+
+    if args.batch is None:
+        instruments = Instrumentation()
+        for stage in args.profile:
+            instruments.profile(stage, every=1, memory=True)
+        report = main(instruments)
+        for profiler in instruments.profilers.values():
+            print(profiler.report())
+        if args.metrics == "json":
+            print(instruments.to_json(indent=2))
+        elif args.metrics == "prometheus":
+            print(instruments.to_prometheus(), end="")
+        return report
+
+    from batch_runner import BatchRunner
+
+    output = args.output or args.batch + ".results.jsonl"
+    runner = BatchRunner(args.batch, output, checkpoint_path=args.checkpoint,
+                         catalogue_path=args.catalogue, workers=args.workers,
+                         chunk_size=args.chunk_size, checkpoint_every=args.checkpoint_every)
+    checkpoint = runner.run(resume=not args.restart)
+    print(f"{checkpoint['records']} records written to {output}")
+
+
 if __name__ == "__main__":
-    # Run the demonstration
-    report = main()
\ No newline at end of file
+    # Run the demonstration (or a batch, see --help)
+    report = cli()
\ No newline at end of file
@@ -0,0 +1,140 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+import numpy as np
+from models import UserProfile
+
+# Engagement scores come out of the model clipped to [0, 1]. Cached rows are
+# the candidates at the highest score, so they hold for any score up to it
+MAX_ENGAGEMENT = 1.0
+
+Features = Dict[str, np.ndarray]
+
+
+def profile_key(profile: UserProfile, user_words: FrozenSet[str]) -> bytes:
+    """16-byte digest of everything matching reads from a profile except engagement
+
+    Interests keep their duplicates (the interest score divides by their
+    count) but not their order; causes are normalized to categories and
+    de-duplicated; keywords count only through their description tokens.
+    Profiles that differ in anything else (name, income, free text) share
+    a key.
+    """
+    causes = sorted({cause.lower().replace(" ", "_") for cause in profile.causes})
+    parts = ("\x1f".join(sorted(profile.interests)), "\x1f".join(causes),
+             profile.geographic_preference, "\x1f".join(sorted(user_words)))
+    return hashlib.blake2b("\x1e".join(parts).encode("utf-8"), digest_size=16).digest()
+
+
+class MatchCache:
+    """TTL + LRU cache of per-profile match features, tied to a catalogue version
+
+    Values are CharityColumns.match_features (shared tags and words, cause
+    and location matches) for every row that could pass the match threshold
+    at any engagement score up to MAX_ENGAGEMENT. Callers score them with
+    the profile's own engagement, so a hit ranks exactly as scoring from
+    scratch would. Entries expire ``ttl`` seconds after they were stored,
+    and the least recently used go first once ``maxsize`` entries or
+    ``max_bytes`` of arrays are held. Entries are keyed by catalogue
+    identity as well as profile, so one cache can serve several catalogues;
+    looking up or storing under a new version of a catalogue drops that
+    catalogue's entries.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = 300.0, max_bytes: int = 64 << 20,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        # catalogue id -> the version its entries were computed under
+        self.versions: Dict[bytes, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bytes = 0
+        # (catalogue id, profile key) -> (expires at, features, bytes held)
+        self._data: "OrderedDict[Tuple[bytes, bytes], Tuple[float, Features, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, catalogue: bytes, key: bytes, version: int) -> Optional[Features]:
+        """Cached features for ``key`` under ``version`` of ``catalogue``, or None"""
+        key = (catalogue, key)
+        with self._lock:
+            self._check_version(catalogue, version)
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, features, size = entry
+            if expires_at <= self.clock():
+                del self._data[key]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return features
+
+    def put(self, catalogue: bytes, key: bytes, version: int, features: Features):
+        """Store features computed under ``version`` of ``catalogue``"""
+        for array in features.values():
+            array.setflags(write=False)
+        size = len(catalogue) + len(key) + sum(array.nbytes for array in features.values())
+        key = (catalogue, key)
+        expires_at = self.clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._check_version(catalogue, version)
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._data[key] = (expires_at, features, size)
+            self.bytes += size
+            while len(self._data) > self.maxsize or (self.bytes > self.max_bytes and len(self._data) > 1):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept"""
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _check_version(self, catalogue: bytes, version: int):
+        if self.versions.get(catalogue) != version:
+            stale = [key for key in self._data if key[0] == catalogue]
+            for key in stale:
+                self.bytes -= self._data.pop(key)[2]
+            if stale:
+                self.invalidations += 1
+            self.versions[catalogue] = version
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def info(self) -> Dict[str, float]:
+        """Hit/miss counters, evictions and memory held"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "catalogues": len(self.versions),
+        }
@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+
+class _Slot:
+    """One submitted item awaiting its result"""
+
+    __slots__ = ("item", "done", "result", "error")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into calls of a batch function
+
+    Callers ``submit`` one item and block until its result is ready. Whenever
+    no batch is running, a waiting caller becomes the leader: it optionally
+    waits ``max_wait`` seconds for company, runs ``batch_fn`` on up to
+    ``max_batch`` pending items in arrival order and hands every caller its
+    result. Items that arrive while a batch runs queue up and go out together
+    in the next one, so under load the per-call overhead of ``batch_fn`` is
+    shared, while a lone caller (with the default ``max_wait`` of 0) pays no
+    extra latency.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], Sequence[Any]], max_batch: int = 256,
+                 max_wait: float = 0.0):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._pending: List[_Slot] = []
+        self._leading = False
+        self._condition = threading.Condition()
+
+    def submit(self, item: Any) -> Any:
+        """Result of ``batch_fn`` for one item, computed in a shared batch"""
+        slot = _Slot(item)
+        with self._condition:
+            self._pending.append(slot)
+            while not slot.done:
+                if self._leading:
+                    self._condition.wait()
+                    continue
+                self._leading = True
+                try:
+                    self._run_batch()
+                finally:
+                    self._leading = False
+                    self._condition.notify_all()
+
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _run_batch(self):
+        """Take and run the next batch; called by the leader holding the lock"""
+        if self.max_wait > 0:
+            self._condition.release()
+            try:
+                time.sleep(self.max_wait)
+            finally:
+                self._condition.acquire()
+
+        batch = self._pending[:self.max_batch]
+        del self._pending[:self.max_batch]
+        self.batches += 1
+        self.items += len(batch)
+
+        self._condition.release()
+        results, error = None, None
+        try:
+            results = self.batch_fn([slot.item for slot in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+        except Exception as exc:
+            error = exc
+        finally:
+            self._condition.acquire()
+            if results is None and error is None:
+                # Interrupted by a BaseException, which the leader re-raises
+                error = RuntimeError("batch_fn was interrupted before returning")
+            # Resolve every slot, so no caller waits on an item that will never run
+            for index, slot in enumerate(batch):
+                slot.result = None if error is not None else results[index]
+                slot.error, slot.done = error, True
+
+    def stats(self) -> Dict[str, float]:
+        """Batch count and mean batch size so far"""
+        with self._condition:
+            return {"batches": self.batches, "items": self.items,
+                    "mean_batch": self.items / self.batches if self.batches else 0.0}
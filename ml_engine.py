@@ -1,66 +1,183 @@
+import os
+import sys
 import numpy as np
-from typing import Dict, List
-from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestRegressor
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence
 from collections import defaultdict
-from models import UserProfile
+from models import UserProfile, ClusterSummary
+from model_registry import get_registry
+from lru_cache import LRUCache
+from micro_batcher import MicroBatcher
+from forest_compiler import CompiledForest, compile_forest, row_code
+from user_clustering import StreamingKMeans
+
+if TYPE_CHECKING:
+    # Annotations only; sklearn is imported when a model is trained or loaded
+    from sklearn.ensemble import RandomForestRegressor
+
+# Bump when training data or hyperparameters change to invalidate saved models
+ENGAGEMENT_MODEL_VERSION = 1
+DONATION_MODEL_VERSION = 1
+# Bump when the compiled forest layout changes
+COMPILED_FOREST_VERSION = 1
+
+# Larger batches go to sklearn, whose per-row cost is lower once its call overhead is amortized
+COMPILED_FOREST_MAX_ROWS = 64
+# Generated single-row forest code is bytecode, so it is cached per interpreter version
+ROW_CODE_TAG = sys.implementation.cache_tag
+
+# Categorical profile fields as model features
+COMFORT_LEVEL_FEATURE = {'high': 1.0, 'medium': 0.5}
+FREQUENCY_FEATURE = {'weekly': 1.0, 'monthly': 0.5}
+GEOGRAPHIC_FEATURE = {'global': 1.0, 'national': 0.5}
+
+# Columns of _extract_user_features / _user_feature_matrix
+USER_FEATURE_NAMES = ('income', 'interest_diversity', 'cause_diversity', 'comfort_level',
+                      'frequency', 'geographic_reach', 'sentiment', 'mean_trait_score')
+
+
+def _train_engagement_model() -> "RandomForestRegressor":
+    """Train the engagement prediction model on synthetic data"""
+    from sklearn.ensemble import RandomForestRegressor
+
+    # Generate synthetic training data for demo
+    # In production, this would use real historical data
+    X_engagement = np.random.rand(1000, 8)  # 8 features
+    y_engagement = np.random.rand(1000)  # Engagement scores
+
+    model = RandomForestRegressor(n_estimators=50, random_state=42)
+    model.fit(X_engagement, y_engagement)
+    return model
+
+
+def _train_donation_amount_model() -> "RandomForestRegressor":
+    """Train the donation amount model on synthetic data"""
+    from sklearn.ensemble import RandomForestRegressor
+
+    X_donation = np.random.rand(1000, 6)  # 6 features
+    y_donation = np.random.rand(1000) * 100  # Donation amounts
+
+    model = RandomForestRegressor(n_estimators=50, random_state=42)
+    model.fit(X_donation, y_donation)
+    return model
 
 
 class MLEngine:
     """Machine Learning engine for predictions and optimization"""
 
-    def __init__(self):
-        self.engagement_model = None
-        self.donation_amount_model = None
+    def __init__(self, user_token_cache_size: int = 4096):
+        self._engagement_model = None
+        self._donation_amount_model = None
+        self.engagement_forest: Optional[CompiledForest] = None
+        self.donation_amount_forest: Optional[CompiledForest] = None
         self.user_embeddings = {}
         self.charity_embeddings = {}
+        # Charity descriptions are static, so their token sets are computed once
+        self.charity_token_sets: Dict[str, FrozenSet[str]] = {}
+        # User keyword sets repeat across requests; keep the recent ones
+        self.user_token_cache = LRUCache(maxsize=user_token_cache_size)
+        # Centroids from the last streaming clustering run
+        self.user_clusters: Optional[StreamingKMeans] = None
         self._initialize_models()
+        # Concurrent single-user predictions share one model call
+        self.engagement_batcher = MicroBatcher(self.predict_engagement_scores)
+        self.donation_batcher = MicroBatcher(
+            lambda requests: self.optimize_donation_amounts(*zip(*requests))
+        )
 
     def _initialize_models(self):
-        """Initialize ML models with synthetic training data"""
-        # Generate synthetic training data for demo
-        # In production, this would use real historical data
-
-        # Engagement prediction model
-        X_engagement = np.random.rand(1000, 8)  # 8 features
-        y_engagement = np.random.rand(1000)  # Engagement scores
-
-        self.engagement_model = RandomForestRegressor(n_estimators=50, random_state=42)
-        self.engagement_model.fit(X_engagement, y_engagement)
-
-        # Donation amount prediction model
-        X_donation = np.random.rand(1000, 6)  # 6 features
-        y_donation = np.random.rand(1000) * 100  # Donation amounts
-
-        self.donation_amount_model = RandomForestRegressor(n_estimators=50, random_state=42)
-        self.donation_amount_model.fit(X_donation, y_donation)
+        """Load shared ML models, training them only on first use"""
+        # Models are shared across every engine in the process and persisted
+        # to disk, so only the very first start pays for training. Predictions
+        # use the compiled forests; sklearn loads only for large batches.
+        registry = get_registry()
+        self.engagement_forest = registry.get(
+            f"engagement_forest_c{COMPILED_FOREST_VERSION}", ENGAGEMENT_MODEL_VERSION,
+            lambda: compile_forest(self.engagement_model)
+        )
+        self.donation_amount_forest = registry.get(
+            f"donation_amount_forest_c{COMPILED_FOREST_VERSION}", DONATION_MODEL_VERSION,
+            lambda: compile_forest(self.donation_amount_model)
+        )
+        # Single rows run through each forest as generated Python; compiling it
+        # takes seconds, so it is persisted like the models. Forests come from
+        # the registry's shared cache, so this runs once per process
+        if ROW_CODE_TAG is not None:
+            for name, version, forest in (("engagement", ENGAGEMENT_MODEL_VERSION, self.engagement_forest),
+                                          ("donation_amount", DONATION_MODEL_VERSION,
+                                           self.donation_amount_forest)):
+                if not forest.has_row_code:
+                    forest.load_row_code(registry.get(
+                        f"{name}_forest_rows_c{COMPILED_FOREST_VERSION}_{ROW_CODE_TAG}", version,
+                        lambda: row_code(forest)
+                    ))
+
+    @property
+    def engagement_model(self) -> "RandomForestRegressor":
+        """The sklearn engagement forest, loaded on first use"""
+        if self._engagement_model is None:
+            self._engagement_model = get_registry().get(
+                "engagement", ENGAGEMENT_MODEL_VERSION, _train_engagement_model
+            )
+        return self._engagement_model
+
+    @property
+    def donation_amount_model(self) -> "RandomForestRegressor":
+        """The sklearn donation amount forest, loaded on first use"""
+        if self._donation_amount_model is None:
+            self._donation_amount_model = get_registry().get(
+                "donation_amount", DONATION_MODEL_VERSION, _train_donation_amount_model
+            )
+        return self._donation_amount_model
 
     def predict_engagement_score(self, user_profile: UserProfile) -> float:
         """Predict how likely user is to continue donating using ML"""
+        return self.engagement_batcher.submit(user_profile)
 
-        # Extract features from user profile
-        features = self._extract_user_features(user_profile)
+    def predict_engagement_scores(self, user_profiles: List[UserProfile]) -> List[float]:
+        """Predict engagement for many users with a single model call"""
 
-        # Predict engagement score
-        predicted_score = self.engagement_model.predict([features])[0]
+        if not user_profiles:
+            return []
+        if len(user_profiles) == 1:
+            # A lone row skips the feature matrix, whose NumPy overhead exceeds the prediction
+            score = self.engagement_forest.predict_row(self._extract_user_features(user_profiles[0]))
+            return [min(max(score, 0.0), 1.0)]
+
+        features = self._user_feature_matrix(user_profiles)
+        model = self.engagement_forest if len(features) <= COMPILED_FOREST_MAX_ROWS else self.engagement_model
+        predicted_scores = model.predict(features)
 
         # Normalize to 0-1 range
-        return max(0, min(1, predicted_score))
+        return np.clip(predicted_scores, 0.0, 1.0).tolist()
 
     def optimize_donation_amount(self, user_profile: UserProfile, base_amount: float) -> float:
         """Use ML to optimize donation amount for maximum engagement"""
+        return self.donation_batcher.submit((user_profile, base_amount))
+
+    def optimize_donation_amounts(self, user_profiles: Sequence[UserProfile],
+                                  base_amounts: Sequence[float]) -> List[float]:
+        """Optimize donation amounts for many users with a single model call"""
 
-        # Extract features
-        features = self._extract_donation_features(user_profile, base_amount)
+        if not user_profiles:
+            return []
+        if len(user_profiles) == 1:
+            base_amount = float(base_amounts[0])
+            amount = self.donation_amount_forest.predict_row(
+                self._extract_donation_features(user_profiles[0], base_amount))
+            return [max(max(3.0, base_amount * 0.5), min(base_amount * 2.0, amount))]
 
-        # Predict optimal amount
-        predicted_amount = self.donation_amount_model.predict([features])[0]
+        base_amounts = np.asarray(base_amounts, dtype=np.float64)
+        features = self._donation_feature_matrix(user_profiles, base_amounts)
+        model = (self.donation_amount_forest if len(features) <= COMPILED_FOREST_MAX_ROWS
+                 else self.donation_amount_model)
+        predicted_amounts = model.predict(features)
 
-        # Ensure reasonable bounds
-        min_amount = max(3.0, base_amount * 0.5)
-        max_amount = base_amount * 2.0
+        # Ensure reasonable bounds (the floor wins when they cross)
+        min_amounts = np.maximum(3.0, base_amounts * 0.5)
+        max_amounts = base_amounts * 2.0
 
-        return max(min_amount, min(max_amount, predicted_amount))
+        return np.maximum(min_amounts, np.minimum(max_amounts, predicted_amounts)).tolist()
 
     def calculate_semantic_similarity(self, user_text: str, charity_description: str) -> float:
         """Calculate semantic similarity between user interests and charity"""
@@ -68,34 +185,61 @@ class MLEngine:
         # Simple implementation using word overlap
         # In production, would use word embeddings or transformer models
 
-        user_words = set(user_text.lower().split())
-        charity_words = set(charity_description.lower().split())
+        user_words = self.user_tokens(user_text)
+        charity_words = self.charity_tokens(charity_description)
 
         if len(user_words) == 0 or len(charity_words) == 0:
             return 0.0
 
         intersection = len(user_words & charity_words)
-        union = len(user_words | charity_words)
+        union = len(user_words) + len(charity_words) - intersection
 
         return intersection / union if union > 0 else 0.0
 
-    def cluster_user_behavior(self, user_profiles: List[UserProfile]) -> Dict[int, List[str]]:
+    def charity_tokens(self, charity_description: str) -> FrozenSet[str]:
+        """Word set of a charity description, computed once per description"""
+        tokens = self.charity_token_sets.get(charity_description)
+        if tokens is None:
+            tokens = frozenset(charity_description.lower().split())
+            self.charity_token_sets[charity_description] = tokens
+        return tokens
+
+    def user_tokens(self, user_text: str) -> FrozenSet[str]:
+        """Word set of free user text, served from the LRU cache when repeated"""
+        return self.user_token_cache.get_or_compute(
+            user_text, lambda: frozenset(user_text.lower().split())
+        )
+
+    def user_keyword_tokens(self, keywords: List[str]) -> FrozenSet[str]:
+        """Word set of extracted keywords, cached on the keyword set itself
+
+        Keying on the set rather than the joined text lets queries with the same
+        keywords in a different order or with repeats share one entry.
+        """
+        key = frozenset(keywords)
+        return self.user_token_cache.get_or_compute(
+            key, lambda: frozenset(' '.join(keywords).lower().split())
+        )
+
+    def similarity_cache_info(self) -> Dict[str, float]:
+        """Hit/miss counters for the user token cache"""
+        info = self.user_token_cache.info()
+        info["charity_token_sets"] = len(self.charity_token_sets)
+        return info
+
+    def cluster_user_behavior(self, user_profiles: List[UserProfile],
+                              n_clusters: int = 3) -> Dict[int, List[str]]:
         """Cluster users by behavior patterns for personalized recommendations"""
 
-        if len(user_profiles) < 3:
+        if len(user_profiles) < n_clusters:
             return {0: [profile.name for profile in user_profiles]}
 
         # Extract features for clustering
-        features = []
-        names = []
-
-        for profile in user_profiles:
-            feature_vector = self._extract_user_features(profile)
-            features.append(feature_vector)
-            names.append(profile.name)
+        features = self._user_feature_matrix(user_profiles)
+        names = [profile.name for profile in user_profiles]
 
         # Perform K-means clustering
-        n_clusters = min(3, len(user_profiles))
+        from sklearn.cluster import KMeans
         kmeans = KMeans(n_clusters=n_clusters, random_state=42)
         clusters = kmeans.fit_predict(features)
 
@@ -106,6 +250,50 @@ class MLEngine:
 
         return dict(cluster_groups)
 
+    def cluster_users_streaming(self, user_profiles: Iterable[UserProfile], n_clusters: int = 3,
+                                chunk_size: int = 4096, centroids_path: Optional[str] = None,
+                                on_labels: Optional[Callable[[List[UserProfile], np.ndarray], None]] = None
+                                ) -> List[ClusterSummary]:
+        """Cluster a stream of users chunk by chunk with mini-batch k-means
+
+        Profiles are consumed lazily and each chunk's cluster ids (as
+        assigned when the chunk was seen) go to ``on_labels`` with its
+        profiles, so memory stays bounded by the chunk size. Saved centroids
+        at ``centroids_path`` are resumed from and updated afterwards.
+        Returns per-cluster statistics.
+        """
+        if centroids_path and os.path.exists(centroids_path):
+            clusters = StreamingKMeans.load(centroids_path)
+            if clusters.n_clusters != n_clusters:
+                raise ValueError(f"{centroids_path} holds {clusters.n_clusters} clusters, "
+                                 f"not n_clusters={n_clusters}")
+        else:
+            clusters = StreamingKMeans(n_clusters, feature_names=USER_FEATURE_NAMES)
+
+        profiles = iter(user_profiles)
+        for chunk in iter(lambda: list(islice(profiles, chunk_size)), []):
+            labels = clusters.partial_fit(self._user_feature_matrix(chunk))
+            if on_labels is not None:
+                on_labels(chunk, labels)
+
+        if centroids_path and clusters.fitted:
+            clusters.save(centroids_path)
+        self.user_clusters = clusters
+        return clusters.summaries()
+
+    def load_user_clusters(self, centroids_path: str) -> StreamingKMeans:
+        """Use centroids saved by cluster_users_streaming for assign_user_clusters"""
+        self.user_clusters = StreamingKMeans.load(centroids_path)
+        return self.user_clusters
+
+    def assign_user_clusters(self, user_profiles: Sequence[UserProfile]) -> List[int]:
+        """Nearest cluster of each user under the streaming centroids, without refitting"""
+        if self.user_clusters is None:
+            raise RuntimeError("run cluster_users_streaming or load_user_clusters first")
+        if not user_profiles:
+            return []
+        return self.user_clusters.assign(self._user_feature_matrix(user_profiles)).tolist()
+
     def _extract_user_features(self, profile: UserProfile) -> List[float]:
         """Extract numerical features from user profile for ML"""
 
@@ -135,4 +323,44 @@ class MLEngine:
             profile.predicted_engagement_score
         ]
 
-        return features
\ No newline at end of file
+        return features
+
+    def _user_feature_matrix(self, profiles: Sequence[UserProfile]) -> np.ndarray:
+        """Features of _extract_user_features for many profiles, one row each"""
+        count = len(profiles)
+        features = np.empty((count, 8), dtype=np.float64)
+
+        def column(values):
+            return np.fromiter(values, dtype=np.float64, count=count)
+
+        features[:, 0] = column(profile.monthly_income for profile in profiles) / 10000
+        features[:, 1] = column(len(profile.interests) for profile in profiles) / 10
+        features[:, 2] = column(len(profile.causes) for profile in profiles) / 8
+        features[:, 3] = column(COMFORT_LEVEL_FEATURE.get(profile.donation_comfort_level, 0.0)
+                                for profile in profiles)
+        features[:, 4] = column(FREQUENCY_FEATURE.get(profile.preferred_frequency, 0.0)
+                                for profile in profiles)
+        features[:, 5] = column(GEOGRAPHIC_FEATURE.get(profile.geographic_preference, 0.0)
+                                for profile in profiles)
+        features[:, 6] = column(profile.giving_history_sentiment for profile in profiles)
+        features[:, 7] = column(sum(profile.personality_traits.values()) / len(profile.personality_traits)
+                                if profile.personality_traits else 0.0 for profile in profiles)
+        return features
+
+    def _donation_feature_matrix(self, profiles: Sequence[UserProfile],
+                                 base_amounts: np.ndarray) -> np.ndarray:
+        """Features of _extract_donation_features for many profiles, one row each"""
+        count = len(profiles)
+        features = np.empty((count, 6), dtype=np.float64)
+
+        def column(values):
+            return np.fromiter(values, dtype=np.float64, count=count)
+
+        features[:, 0] = column(profile.monthly_income for profile in profiles) / 10000
+        features[:, 1] = base_amounts / 100
+        features[:, 2] = column(len(profile.interests) for profile in profiles) / 10
+        features[:, 3] = column(COMFORT_LEVEL_FEATURE.get(profile.donation_comfort_level, 0.0)
+                                for profile in profiles)
+        features[:, 4] = column(profile.giving_history_sentiment for profile in profiles)
+        features[:, 5] = column(profile.predicted_engagement_score for profile in profiles)
+        return features
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _default_cache_dir() -> str:
+    """Resolve the on-disk location for persisted models"""
+    return os.environ.get(
+        "DONATION_MODEL_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "donation_ai", "models")
+    )
+
+
+def _file_checksum(path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Process-wide store of trained models, persisted to disk between runs
+
+    Each model is identified by a name and a version. The first request for a
+    (name, version) pair trains the model once, writes it to disk next to a
+    manifest holding its checksum, and keeps it in memory. Later requests in the
+    same process are served from memory, and later processes memory-map the
+    saved file instead of training again.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, persist: bool = True):
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.persist = persist
+        self._models: Dict[Tuple[str, int], Any] = {}
+        self._locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_loads": 0, "trained": 0, "checksum_failures": 0}
+
+    def get(self, name: str, version: int, trainer: Callable[[], Any]) -> Any:
+        """Return the model for (name, version), training it only if nothing usable exists"""
+        key = (name, version)
+
+        with self._registry_lock:
+            if key in self._models:
+                self.stats["memory_hits"] += 1
+                return self._models[key]
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        # Per-model lock so concurrent callers wait for one training run
+        with lock:
+            if key in self._models:
+                self.stats["memory_hits"] += 1
+                return self._models[key]
+
+            model = self._load(name, version) if self.persist else None
+            if model is None:
+                model = trainer()
+                self.stats["trained"] += 1
+                if self.persist:
+                    self._save(name, version, model)
+
+            self._models[key] = model
+            return model
+
+    def clear(self, remove_files: bool = False):
+        """Forget in-memory models, optionally deleting persisted copies"""
+        with self._registry_lock:
+            keys = list(self._models.keys())
+            self._models.clear()
+
+        if remove_files:
+            for name, version in keys:
+                for path in self._paths(name, version):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def _paths(self, name: str, version: int) -> Tuple[str, str]:
+        """Model file and manifest file for a (name, version) pair"""
+        base = os.path.join(self.cache_dir, f"{name}-v{version}")
+        return base + ".joblib", base + ".json"
+
+    def _load(self, name: str, version: int) -> Optional[Any]:
+        """Memory-map a persisted model if its manifest and checksum agree"""
+        model_path, manifest_path = self._paths(name, version)
+        if not (os.path.exists(model_path) and os.path.exists(manifest_path)):
+            return None
+
+        try:
+            with open(manifest_path) as handle:
+                manifest = json.load(handle)
+            if manifest.get("name") != name or manifest.get("version") != version:
+                return None
+            if _file_checksum(model_path) != manifest.get("checksum"):
+                self.stats["checksum_failures"] += 1
+                return None
+
+            import joblib
+            model = joblib.load(model_path, mmap_mode="r")
+        except (OSError, ValueError, EOFError):
+            return None
+
+        self.stats["disk_loads"] += 1
+        return model
+
+    def _save(self, name: str, version: int, model: Any):
+        """Persist a model and its manifest, replacing files atomically"""
+        model_path, manifest_path = self._paths(name, version)
+        try:
+            import joblib
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            # Uncompressed dump so numpy arrays can be memory-mapped on load
+            tmp_model = f"{model_path}.{os.getpid()}.tmp"
+            joblib.dump(model, tmp_model)
+            manifest = {
+                "name": name,
+                "version": version,
+                "checksum": _file_checksum(tmp_model),
+                "created": time.time(),
+            }
+            os.replace(tmp_model, model_path)
+
+            tmp_manifest = f"{manifest_path}.{os.getpid()}.tmp"
+            with open(tmp_manifest, "w") as handle:
+                json.dump(manifest, handle)
+            os.replace(tmp_manifest, manifest_path)
+        except OSError:
+            # A read-only cache directory only costs us the warm start
+            pass
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_init_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the shared process-wide model registry"""
+    global _registry
+    if _registry is None:
+        with _registry_init_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -1,5 +1,11 @@
+import sys
+import threading
+from array import array
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from impact_timeline import ImpactTimeline
 
 
 @dataclass
@@ -57,4 +63,296 @@ class ImpactReport:
     total_donated: float
     impact_metrics: Dict[str, float]
     beneficiaries_helped: int
-    timeline: List[Dict[str, any]]
\ No newline at end of file
+    timeline: "ImpactTimeline"
+    chart: Optional[Any] = None  # Future[bytes] of the rendered chart in headless mode
+
+
+@dataclass
+class MatchBreakdown:
+    """A ranked charity match with the components of its score"""
+    charity: Charity
+    score: float
+    interest_score: float  # tag overlap, 40% of compatibility
+    cause_score: float  # category alignment, 30% of compatibility
+    location_score: float  # geographic preference, 20% of compatibility
+    efficiency_score: float  # charity efficiency, 10% of compatibility
+    compatibility_score: float  # capped sum of the four above
+    semantic_score: float  # keyword/description similarity
+    engagement_bonus: float
+    retention_bonus: float
+
+
+@dataclass
+class CohortResult:
+    """Outcome of the matching pipeline for one user in a cohort run"""
+    user_name: str
+    engagement_score: float
+    charity_id: Optional[str] = None  # None when no charity passed the threshold
+    charity_name: Optional[str] = None
+    match_score: float = 0.0
+    amount: float = 0.0
+    frequency: Optional[str] = None
+    annual_total: float = 0.0
+
+
+@dataclass
+class ClusterSummary:
+    """Compact statistics of one user cluster"""
+    cluster_id: int
+    size: int
+    centroid: Dict[str, float]  # feature name -> centroid coordinate
+    feature_means: Dict[str, float]  # feature name -> mean over assigned users
+    mean_squared_distance: float  # to the centroid at assignment time
+
+
+class TagVocabulary:
+    """Interns tag strings as small integer ids shared by compact models"""
+
+    __slots__ = ("ids", "names", "_lock")
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"ids": self.ids, "names": self.names}
+
+    def __setstate__(self, state):
+        self.ids = state["ids"]
+        self.names = state["names"]
+        self._lock = threading.Lock()
+
+    def intern(self, tag: str) -> int:
+        tag_id = self.ids.get(tag)
+        if tag_id is None:
+            # Two threads adding the same new tag must not both append it
+            with self._lock:
+                tag_id = self.ids.get(tag)
+                if tag_id is None:
+                    tag_id = len(self.names)
+                    self.names.append(sys.intern(tag))
+                    self.ids[tag] = tag_id
+        return tag_id
+
+    def encode(self, tags: Optional[List[str]]) -> array:
+        # 'I' is 4 bytes on supported platforms; 'H' overflowed past 65,535 tags
+        return array('I', [self.intern(tag) for tag in tags or ()])
+
+    def decode(self, tag_ids: array) -> List[str]:
+        return [self.names[tag_id] for tag_id in tag_ids]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# Process-wide vocabulary used unless a caller supplies its own
+TAG_VOCABULARY = TagVocabulary()
+
+
+def _interned(values: Optional[List[str]]) -> tuple:
+    return tuple(sys.intern(value) for value in values or ())
+
+
+class CompactCharity:
+    """Slotted, array-backed Charity for large catalogues
+
+    Tags and semantic keywords are stored as uint32 ids into a TagVocabulary and
+    the description embedding as a float32 array. Attribute names match Charity,
+    so code reading a Charity can read a CompactCharity; list-valued fields are
+    decoded on access.
+    """
+
+    __slots__ = ("id", "name", "category", "description", "location", "efficiency_score",
+                 "tag_ids", "min_donation", "impact_metrics", "_embedding", "_success_stories",
+                 "donor_retention_rate", "predicted_impact_score", "semantic_keyword_ids",
+                 "vocabulary")
+
+    def __init__(self, id: str, name: str, category: str, description: str, location: str,
+                 efficiency_score: float, tags: List[str], min_donation: float,
+                 impact_metrics: Dict[str, str], description_embedding: Optional[List[float]] = None,
+                 success_stories: Optional[List[str]] = None, donor_retention_rate: float = 0.0,
+                 predicted_impact_score: float = 0.0, semantic_keywords: Optional[List[str]] = None,
+                 vocabulary: TagVocabulary = TAG_VOCABULARY):
+        self.vocabulary = vocabulary
+        self.id = id
+        self.name = name
+        self.category = sys.intern(category)
+        self.description = description
+        self.location = sys.intern(location)
+        self.efficiency_score = efficiency_score
+        self.tag_ids = vocabulary.encode(tags)
+        self.min_donation = min_donation
+        self.impact_metrics = impact_metrics
+        self.description_embedding = description_embedding
+        self.success_stories = success_stories
+        self.donor_retention_rate = donor_retention_rate
+        self.predicted_impact_score = predicted_impact_score
+        self.semantic_keyword_ids = vocabulary.encode(semantic_keywords)
+
+    @property
+    def tags(self) -> List[str]:
+        return self.vocabulary.decode(self.tag_ids)
+
+    @tags.setter
+    def tags(self, tags: List[str]):
+        self.tag_ids = self.vocabulary.encode(tags)
+
+    @property
+    def semantic_keywords(self) -> List[str]:
+        return self.vocabulary.decode(self.semantic_keyword_ids)
+
+    @semantic_keywords.setter
+    def semantic_keywords(self, keywords: Optional[List[str]]):
+        self.semantic_keyword_ids = self.vocabulary.encode(keywords)
+
+    @property
+    def description_embedding(self) -> Optional[array]:
+        return self._embedding
+
+    @description_embedding.setter
+    def description_embedding(self, embedding: Optional[List[float]]):
+        self._embedding = None if embedding is None else array('f', embedding)
+
+    @property
+    def embedding_array(self) -> Optional["numpy.ndarray"]:
+        """Zero-copy float32 NumPy view of the embedding"""
+        if self._embedding is None:
+            return None
+        import numpy
+        return numpy.frombuffer(self._embedding, dtype=numpy.float32)
+
+    @property
+    def success_stories(self) -> Optional[List[str]]:
+        return None if self._success_stories is None else list(self._success_stories)
+
+    @success_stories.setter
+    def success_stories(self, stories: Optional[List[str]]):
+        self._success_stories = None if stories is None else tuple(stories)
+
+    @classmethod
+    def from_charity(cls, charity: Charity, vocabulary: TagVocabulary = TAG_VOCABULARY) -> "CompactCharity":
+        return cls(
+            id=charity.id, name=charity.name, category=charity.category,
+            description=charity.description, location=charity.location,
+            efficiency_score=charity.efficiency_score, tags=charity.tags,
+            min_donation=charity.min_donation, impact_metrics=charity.impact_metrics,
+            description_embedding=charity.description_embedding,
+            success_stories=charity.success_stories,
+            donor_retention_rate=charity.donor_retention_rate,
+            predicted_impact_score=charity.predicted_impact_score,
+            semantic_keywords=charity.semantic_keywords, vocabulary=vocabulary
+        )
+
+    def to_charity(self) -> Charity:
+        return Charity(
+            id=self.id, name=self.name, category=self.category, description=self.description,
+            location=self.location, efficiency_score=self.efficiency_score, tags=self.tags,
+            min_donation=self.min_donation, impact_metrics=dict(self.impact_metrics),
+            description_embedding=None if self._embedding is None else self._embedding.tolist(),
+            success_stories=self.success_stories, donor_retention_rate=self.donor_retention_rate,
+            predicted_impact_score=self.predicted_impact_score,
+            semantic_keywords=self.semantic_keywords
+        )
+
+    def __repr__(self) -> str:
+        return f"CompactCharity(id={self.id!r}, name={self.name!r}, category={self.category!r})"
+
+
+class CompactUserProfile:
+    """Slotted UserProfile with interned strings and array-backed traits"""
+
+    __slots__ = ("name", "interest_ids", "causes", "monthly_income", "donation_comfort_level",
+                 "preferred_frequency", "geographic_preference", "_trait_names", "_trait_values",
+                 "_emotional_drivers", "giving_history_sentiment", "_extracted_keywords",
+                 "predicted_engagement_score", "vocabulary")
+
+    def __init__(self, name: str, interests: List[str], causes: List[str], monthly_income: float,
+                 donation_comfort_level: str, preferred_frequency: str, geographic_preference: str,
+                 personality_traits: Optional[Dict[str, float]] = None,
+                 emotional_drivers: Optional[List[str]] = None, giving_history_sentiment: float = 0.0,
+                 extracted_keywords: Optional[List[str]] = None, predicted_engagement_score: float = 0.0,
+                 vocabulary: TagVocabulary = TAG_VOCABULARY):
+        self.vocabulary = vocabulary
+        self.name = name
+        self.interest_ids = vocabulary.encode(interests)
+        self.causes = _interned(causes)
+        self.monthly_income = monthly_income
+        self.donation_comfort_level = sys.intern(donation_comfort_level)
+        self.preferred_frequency = sys.intern(preferred_frequency)
+        self.geographic_preference = sys.intern(geographic_preference)
+        self.personality_traits = personality_traits
+        self.emotional_drivers = emotional_drivers
+        self.giving_history_sentiment = giving_history_sentiment
+        self.extracted_keywords = extracted_keywords
+        self.predicted_engagement_score = predicted_engagement_score
+
+    @property
+    def interests(self) -> List[str]:
+        return self.vocabulary.decode(self.interest_ids)
+
+    @interests.setter
+    def interests(self, interests: List[str]):
+        self.interest_ids = self.vocabulary.encode(interests)
+
+    @property
+    def personality_traits(self) -> Optional[Dict[str, float]]:
+        if self._trait_names is None:
+            return None
+        return dict(zip(self._trait_names, self._trait_values))
+
+    @personality_traits.setter
+    def personality_traits(self, traits: Optional[Dict[str, float]]):
+        if traits is None:
+            self._trait_names, self._trait_values = None, None
+        else:
+            self._trait_names = _interned(list(traits.keys()))
+            # float64, so a round trip leaves the engagement features unchanged
+            self._trait_values = array('d', traits.values())
+
+    @property
+    def emotional_drivers(self) -> Optional[List[str]]:
+        return None if self._emotional_drivers is None else list(self._emotional_drivers)
+
+    @emotional_drivers.setter
+    def emotional_drivers(self, drivers: Optional[List[str]]):
+        self._emotional_drivers = None if drivers is None else _interned(drivers)
+
+    @property
+    def extracted_keywords(self) -> Optional[List[str]]:
+        return None if self._extracted_keywords is None else list(self._extracted_keywords)
+
+    @extracted_keywords.setter
+    def extracted_keywords(self, keywords: Optional[List[str]]):
+        self._extracted_keywords = None if keywords is None else _interned(keywords)
+
+    @classmethod
+    def from_profile(cls, profile: UserProfile,
+                     vocabulary: TagVocabulary = TAG_VOCABULARY) -> "CompactUserProfile":
+        return cls(
+            name=profile.name, interests=profile.interests, causes=profile.causes,
+            monthly_income=profile.monthly_income,
+            donation_comfort_level=profile.donation_comfort_level,
+            preferred_frequency=profile.preferred_frequency,
+            geographic_preference=profile.geographic_preference,
+            personality_traits=profile.personality_traits,
+            emotional_drivers=profile.emotional_drivers,
+            giving_history_sentiment=profile.giving_history_sentiment,
+            extracted_keywords=profile.extracted_keywords,
+            predicted_engagement_score=profile.predicted_engagement_score, vocabulary=vocabulary
+        )
+
+    def to_profile(self) -> UserProfile:
+        return UserProfile(
+            name=self.name, interests=self.interests, causes=list(self.causes),
+            monthly_income=self.monthly_income, donation_comfort_level=self.donation_comfort_level,
+            preferred_frequency=self.preferred_frequency,
+            geographic_preference=self.geographic_preference,
+            personality_traits=self.personality_traits, emotional_drivers=self.emotional_drivers,
+            giving_history_sentiment=self.giving_history_sentiment,
+            extracted_keywords=self.extracted_keywords,
+            predicted_engagement_score=self.predicted_engagement_score
+        )
+
+    def __repr__(self) -> str:
+        return f"CompactUserProfile(name={self.name!r})"
@@ -1,14 +1,24 @@
 import re
-from typing import Dict, List
-from sklearn.feature_extraction.text import TfidfVectorizer
-from textblob import TextBlob
+from typing import Dict, List, Optional
+from sentiment import SentimentBackend, CachedSentiment, LexiconSentiment
+from keyword_scanner import KeywordScanner, KeywordMatches
+from keyword_extractor import KeywordExtractor
+from instrumentation import Instrumentation, default_instruments
 
 
 class NLPProcessor:
     """Handles all NLP operations for text understanding"""
 
-    def __init__(self):
-        self.tfidf = TfidfVectorizer(max_features=100, stop_words='english')
+    def __init__(self, sentiment_backend: Optional[SentimentBackend] = None,
+                 keyword_extractor: Optional[KeywordExtractor] = None, learn_keywords: bool = False,
+                 instruments: Optional[Instrumentation] = None):
+        # Compiled-lexicon polarity with an LRU; pass TextBlobSentiment() for the reference scorer
+        self.sentiment = sentiment_backend or CachedSentiment(LexiconSentiment())
+        # Hashed TF-IDF. Its document frequencies stay fixed unless learn_keywords is set, so an
+        # answer's keywords do not depend on the answers analyzed before it
+        self.keyword_extractor = keyword_extractor or KeywordExtractor(top_k=10)
+        self.learn_keywords = learn_keywords
+        self.instruments = instruments or default_instruments()
         self.personality_keywords = {
             'empathetic': ['care', 'help', 'compassion', 'support', 'kindness', 'love'],
             'analytical': ['data', 'research', 'evidence', 'facts', 'analysis', 'study'],
@@ -16,28 +26,79 @@ class NLPProcessor:
             'community-oriented': ['together', 'community', 'local', 'neighborhood', 'family'],
             'global-minded': ['world', 'global', 'international', 'humanity', 'planet']
         }
+        self.emotional_patterns = {
+            'injustice': ['unfair', 'wrong', 'injustice', 'inequality'],
+            'empathy': ['feel', 'heart', 'compassion', 'care'],
+            'hope': ['future', 'better', 'hope', 'change'],
+            'responsibility': ['duty', 'should', 'must', 'responsibility']
+        }
+        self.category_themes = {
+            'education': ['school', 'learn', 'student', 'teacher', 'education', 'literacy'],
+            'health': ['health', 'medical', 'disease', 'treatment', 'wellness', 'care'],
+            'environment': ['environment', 'climate', 'nature', 'green', 'planet', 'earth'],
+            'poverty': ['poor', 'poverty', 'hunger', 'homeless', 'food', 'basic'],
+            'animals': ['animal', 'wildlife', 'species', 'conservation', 'pets'],
+            'water': ['water', 'clean', 'sanitation', 'wells', 'drinking']
+        }
+        # One whole-word pass finds every trait, driver and category keyword
+        self.keyword_scanner = KeywordScanner({
+            'personality': self.personality_keywords,
+            'emotion': self.emotional_patterns,
+            'category': self.category_themes
+        })
 
     def extract_interests_from_text(self, text: str) -> Dict[str, any]:
         """Extract interests and personality from free text using NLP"""
 
+        stage = self.instruments.stage
+
         # Clean and process text
-        cleaned_text = self._clean_text(text)
-        blob = TextBlob(cleaned_text)
+        with stage("nlp.clean"):
+            cleaned_text = self._clean_text(text)
 
         # Sentiment analysis
-        sentiment = blob.sentiment.polarity
+        with stage("nlp.sentiment"):
+            sentiment = self.sentiment.polarity(cleaned_text)
+
+        with stage("nlp.keywords"):
+            words = cleaned_text.split()
+            keywords = self._extract_keyword_lists([words])[0]
+
+        with stage("nlp.analyze"):
+            return self._analyze(cleaned_text, sentiment, words, keywords)
+
+    def extract_interests_from_texts(self, texts: List[str]) -> List[Dict[str, any]]:
+        """Run interest extraction over a batch of texts, scoring sentiment in one pass"""
+        cleaned_texts = [self._clean_text(text) for text in texts]
+        sentiments = self.sentiment.polarities(cleaned_texts)
+        # Tokenize once for keyword extraction and the keyword scanner
+        word_lists = [cleaned_text.split() for cleaned_text in cleaned_texts]
+        keyword_lists = self._extract_keyword_lists(word_lists)
+        return [self._analyze(cleaned_text, sentiment, words, keywords)
+                for cleaned_text, sentiment, words, keywords
+                in zip(cleaned_texts, sentiments, word_lists, keyword_lists)]
+
+    def _analyze(self, cleaned_text: str, sentiment: float, words: Optional[List[str]] = None,
+                 keywords: Optional[List[str]] = None) -> Dict[str, any]:
+        """Keyword, personality, emotion and category analysis of cleaned text"""
+        if words is None:
+            words = cleaned_text.split()
 
         # Extract keywords using TF-IDF
-        keywords = self._extract_keywords(cleaned_text)
+        if keywords is None:
+            keywords = self._extract_keywords(cleaned_text, words)
+
+        # Scan once for all trait, driver and category keywords
+        keyword_matches = self.keyword_scanner.scan(words=words)
 
         # Personality trait analysis
-        personality_traits = self._analyze_personality(cleaned_text)
+        personality_traits = self._analyze_personality(cleaned_text, keyword_matches)
 
         # Emotional drivers
-        emotional_drivers = self._extract_emotional_drivers(cleaned_text)
+        emotional_drivers = self._extract_emotional_drivers(cleaned_text, keyword_matches)
 
         # Map to charity categories using semantic similarity
-        category_matches = self._map_to_charity_categories(keywords, cleaned_text)
+        category_matches = self._map_to_charity_categories(keywords, cleaned_text, keyword_matches)
 
         return {
             'keywords': keywords,
@@ -54,64 +115,55 @@ class NLPProcessor:
         text = re.sub(r'[^a-zA-Z\s]', '', text)
         return text.lower().strip()
 
-    def _extract_keywords(self, text: str) -> List[str]:
+    def _extract_keywords(self, text: str, words: Optional[List[str]] = None) -> List[str]:
         """Extract important keywords using TF-IDF"""
-        try:
-            # Simple keyword extraction for demo
-            words = text.split()
-            # Remove common words and get meaningful terms
-            meaningful_words = [w for w in words if len(w) > 3 and w not in
-                                ['that', 'this', 'have', 'been', 'will', 'they', 'there']]
-            return list(set(meaningful_words))[:10]  # Top 10 keywords
-        except:
-            return []
-
-    def _analyze_personality(self, text: str) -> Dict[str, float]:
+        return self._extract_keyword_lists([text.split() if words is None else words])[0]
+
+    def _extract_keyword_lists(self, word_lists: List[List[str]]) -> List[List[str]]:
+        """Top keywords of each text, ranked by TF-IDF against the fitted document frequencies
+
+        With ``learn_keywords`` the texts are counted in only after being ranked,
+        so no text is ranked against itself or later texts of its own batch.
+        """
+        # Remove common words and get meaningful terms
+        token_lists = [self.keyword_extractor.filter_words(words) for words in word_lists]
+        keyword_lists = self.keyword_extractor.transform(token_lists)
+        if self.learn_keywords:
+            self.keyword_extractor.partial_fit(token_lists)
+        return keyword_lists
+
+    def _analyze_personality(self, text: str,
+                             keyword_matches: Optional[KeywordMatches] = None) -> Dict[str, float]:
         """Analyze personality traits from text"""
+        keyword_matches = keyword_matches or self.keyword_scanner.scan(text)
         traits = {}
 
         for trait, keywords in self.personality_keywords.items():
             # Count keyword matches (normalized)
-            matches = sum(1 for keyword in keywords if keyword in text)
+            matches = keyword_matches.count('personality', trait)
             traits[trait] = matches / len(keywords)  # Normalize by total keywords
 
         return traits
 
-    def _extract_emotional_drivers(self, text: str) -> List[str]:
+    def _extract_emotional_drivers(self, text: str,
+                                   keyword_matches: Optional[KeywordMatches] = None) -> List[str]:
         """Extract what emotionally motivates the user"""
-        drivers = []
-
-        emotional_patterns = {
-            'injustice': ['unfair', 'wrong', 'injustice', 'inequality'],
-            'empathy': ['feel', 'heart', 'compassion', 'care'],
-            'hope': ['future', 'better', 'hope', 'change'],
-            'responsibility': ['duty', 'should', 'must', 'responsibility']
-        }
-
-        for driver, patterns in emotional_patterns.items():
-            if any(pattern in text for pattern in patterns):
-                drivers.append(driver)
+        keyword_matches = keyword_matches or self.keyword_scanner.scan(text)
+        return [driver for driver in self.emotional_patterns
+                if keyword_matches.count('emotion', driver) > 0]
 
-        return drivers
-
-    def _map_to_charity_categories(self, keywords: List[str], text: str) -> Dict[str, float]:
+    def _map_to_charity_categories(self, keywords: List[str], text: str,
+                                   keyword_matches: Optional[KeywordMatches] = None) -> Dict[str, float]:
         """Map extracted content to charity categories using semantic similarity"""
-
-        category_themes = {
-            'education': ['school', 'learn', 'student', 'teacher', 'education', 'literacy'],
-            'health': ['health', 'medical', 'disease', 'treatment', 'wellness', 'care'],
-            'environment': ['environment', 'climate', 'nature', 'green', 'planet', 'earth'],
-            'poverty': ['poor', 'poverty', 'hunger', 'homeless', 'food', 'basic'],
-            'animals': ['animal', 'wildlife', 'species', 'conservation', 'pets'],
-            'water': ['water', 'clean', 'sanitation', 'wells', 'drinking']
-        }
+        keyword_matches = keyword_matches or self.keyword_scanner.scan(text)
+        keyword_set = set(keywords)
 
         matches = {}
-        for category, themes in category_themes.items():
+        for category, themes in self.category_themes.items():
             # Calculate semantic overlap
-            overlap = len(set(keywords) & set(themes))
+            overlap = len(keyword_set.intersection(themes))
             # Also check direct text mentions
-            text_mentions = sum(1 for theme in themes if theme in text)
+            text_mentions = keyword_matches.count('category', category)
             matches[category] = (overlap + text_mentions) / len(themes)
 
         return matches
\ No newline at end of file
@@ -0,0 +1,243 @@
+import hashlib
+import re
+from abc import ABC, abstractmethod
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from lru_cache import LRUCache
+from model_registry import get_registry
+
+SENTIMENT_LEXICON_VERSION = 1
+
+# Same negations as TextBlob's English sentiment analyzer
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+# Words that send a text through the rule-by-rule scorer; "!" boosts the word before it
+RULE_WORDS = NEGATIONS | {"!"}
+
+# Split off the start and end of words by TextBlob's tokenizer (pattern's find_tokens)
+PUNCTUATION = ".,;:!?()[]{}`'\"@#$^&*+-|=~_"
+_LEADING = tuple(PUNCTUATION.replace(".", ""))
+_TRAILING = _LEADING + (".",)
+_CONTRACTION = re.compile(r"('d|'m|'s|'ll|'re|'ve|n't)")
+_QUOTE = re.compile("([\u201c\u201d\u2018\u2019'\"])")
+_ABBREVIATION = re.compile(r"^([a-z]\.)+$")  # "e.g.", "u.s."
+_NOT_PLAIN = re.compile(r"[^A-Za-z\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased tokens of ``text`` as TextBlob's sentiment analyzer sees them
+
+    Letters-and-spaces text (what NLPProcessor produces) is just split. Other
+    text has contractions and quotes separated and punctuation split off the
+    start and end of each word, as pattern's find_tokens does, so "good," is
+    "good" followed by ",". Single-letter abbreviations keep their periods;
+    find_tokens' list of other abbreviations, emoticons and the "(!)"
+    sarcasm marker are not modelled.
+    """
+    if _NOT_PLAIN.search(text) is None:
+        return text.lower().split()
+    text = _QUOTE.sub(r" \1 ", _CONTRACTION.sub(r" \1", text.lower()))
+    tokens: List[str] = []
+    for word in text.split():
+        while word.startswith(_LEADING):
+            tokens.append(word[0])
+            word = word[1:]
+        tail: List[str] = []
+        while word.endswith(_TRAILING):
+            if word.endswith(_LEADING):
+                tail.append(word[-1])
+                word = word[:-1]
+            if word.endswith("..."):
+                tail.append("...")
+                word = word[:-3].rstrip(".")
+            if word.endswith("."):
+                if _ABBREVIATION.match(word):
+                    break
+                tail.append(".")
+                word = word[:-1]
+        if word:
+            tokens.append(word)
+        tokens.extend(reversed(tail))
+    return tokens
+
+
+class SentimentBackend(ABC):
+    """Scores the polarity of text in [-1.0, 1.0]"""
+
+    def polarity(self, text: str) -> float:
+        return self.polarities([text])[0]
+
+    @abstractmethod
+    def polarities(self, texts: Sequence[str]) -> List[float]:
+        """Polarity of each text, in order"""
+
+
+class TextBlobSentiment(SentimentBackend):
+    """Reference backend: one TextBlob per text"""
+
+    def polarities(self, texts: Sequence[str]) -> List[float]:
+        from textblob import TextBlob
+        return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+class SentimentLexicon:
+    """TextBlob's English sentiment lexicon compiled to flat arrays
+
+    Each word gets an integer id; polarity, intensity and whether the word can
+    modify the next one (it has an adverb sense) are columns indexed by id.
+    """
+
+    def __init__(self, words: List[str], polarity: np.ndarray, intensity: np.ndarray,
+                 is_modifier: np.ndarray):
+        self.word_ids: Dict[str, int] = {word: i for i, word in enumerate(words)}
+        self.polarity = polarity
+        self.intensity = intensity
+        self.is_modifier = is_modifier
+
+
+def compile_lexicon() -> SentimentLexicon:
+    """Flatten the lexicon TextBlob loads from en-sentiment.xml"""
+    from textblob.en import sentiment as pattern_sentiment
+
+    if dict.__len__(pattern_sentiment) == 0:
+        pattern_sentiment.load()
+
+    words = sorted(dict.keys(pattern_sentiment))
+    entries = [dict.__getitem__(pattern_sentiment, word) for word in words]
+    # Scores averaged over every part of speech, as used for untagged text
+    return SentimentLexicon(
+        words,
+        polarity=np.array([entry[None][0] for entry in entries], dtype=np.float64),
+        intensity=np.array([entry[None][2] for entry in entries], dtype=np.float64),
+        is_modifier=np.array(["RB" in entry for entry in entries], dtype=bool)
+    )
+
+
+class LexiconSentiment(SentimentBackend):
+    """Batch polarity scorer over the compiled TextBlob lexicon
+
+    Texts are split by ``tokenize``, which is exactly TextBlob's tokenization
+    for the letters-and-spaces text NLPProcessor produces and follows its
+    punctuation handling otherwise. Texts without modifiers, negations or "!",
+    the common case, are scored together with one bincount; the rest replay
+    TextBlob's modifier, negation and exclamation rules word by word and give
+    the same polarity. Raw text can still differ where ``tokenize`` does:
+    emoticons and "(!)" score nothing here, and a period after a
+    multi-letter abbreviation is split off.
+    """
+
+    def __init__(self, lexicon: Optional[SentimentLexicon] = None):
+        self._lexicon = lexicon
+
+    @property
+    def lexicon(self) -> SentimentLexicon:
+        if self._lexicon is None:
+            self._lexicon = get_registry().get("sentiment_lexicon", SENTIMENT_LEXICON_VERSION,
+                                               compile_lexicon)
+        return self._lexicon
+
+    def polarities(self, texts: Sequence[str]) -> List[float]:
+        if not texts:
+            return []
+        lexicon = self.lexicon
+        word_ids = lexicon.word_ids
+
+        tokens = [tokenize(text) for text in texts]
+        lengths = np.array([len(words) for words in tokens], dtype=np.int64)
+        flat = [word for words in tokens for word in words]
+        ids = np.array([word_ids.get(word, -1) for word in flat], dtype=np.int64)
+        text_of_token = np.repeat(np.arange(len(texts)), lengths)
+
+        known = ids >= 0
+        special = np.zeros(len(flat), dtype=bool)
+        special[known] = lexicon.is_modifier[ids[known]]
+        special |= np.fromiter((word in RULE_WORDS for word in flat), dtype=bool, count=len(flat))
+        needs_rules = np.bincount(text_of_token[special], minlength=len(texts)) > 0
+
+        # Plain texts: polarity is the mean over known words
+        plain = known & ~needs_rules[text_of_token]
+        sums = np.bincount(text_of_token[plain], weights=lexicon.polarity[ids[plain]],
+                           minlength=len(texts))
+        counts = np.bincount(text_of_token[plain], minlength=len(texts))
+        scores = sums / np.maximum(counts, 1)
+
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        for position in np.flatnonzero(needs_rules).tolist():
+            start = starts[position]
+            scores[position] = self._score_with_rules(tokens[position],
+                                                      ids[start:start + lengths[position]].tolist())
+        return scores.tolist()
+
+    def _score_with_rules(self, words: List[str], ids: List[int]) -> float:
+        """TextBlob's assessment rules for modifiers ("very good"), negation ("not good") and "!" boosts"""
+        lexicon = self.lexicon
+        # Each assessment is [polarity, intensity, negated]
+        assessments: List[List] = []
+        modifier: Optional[str] = None
+        negation: Optional[str] = None
+
+        for word, word_id in zip(words, ids):
+            if word_id >= 0:
+                polarity = float(lexicon.polarity[word_id])
+                intensity = float(lexicon.intensity[word_id])
+                if modifier is None:
+                    assessments.append([polarity, intensity, False])
+                else:
+                    # "really good": scale by the modifier's intensity
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(polarity * last[1], 1.0))
+                    last[1] = intensity
+                if negation is not None:
+                    last = assessments[-1]
+                    last[1] = 1.0 / last[1]
+                    last[2] = True
+                modifier = word if lexicon.is_modifier[word_id] else None
+                negation = word if word in NEGATIONS else None
+            else:
+                if word in NEGATIONS:
+                    negation = word
+                elif negation and len(word.strip("'")) > 1:
+                    negation = None
+                if negation is not None and modifier is not None and modifier.endswith("ly"):
+                    # "really not good"
+                    assessments[-1][2] = True
+                    negation = None
+                elif modifier and len(word) > 2:
+                    modifier = None
+                if word == "!" and assessments:
+                    # "good!": exclamation boosts the previous assessment
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(last[0] * 1.25, 1.0))
+
+        if not assessments:
+            return 0.0
+        # "not good" is slightly bad, "not bad" slightly good
+        return sum(polarity * -0.5 if negated else polarity
+                   for polarity, _, negated in assessments) / len(assessments)
+
+
+class CachedSentiment(SentimentBackend):
+    """LRU in front of a backend, keyed on a digest of the text
+
+    Keys are 16-byte BLAKE2b digests, so long answers are not kept alive by
+    the cache. Only texts missing from the cache reach the backend, in one
+    batch.
+    """
+
+    def __init__(self, backend: SentimentBackend, maxsize: int = 8192):
+        self.backend = backend
+        self.cache = LRUCache(maxsize)
+
+    def polarities(self, texts: Sequence[str]) -> List[float]:
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+        scores = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            computed = self.backend.polarities([texts[i] for i in missing])
+            for i, score in zip(missing, computed):
+                scores[i] = score
+                self.cache.put(keys[i], score)
+        return scores
+
+    def cache_info(self) -> Dict[str, float]:
+        return self.cache.info()
@@ -0,0 +1,348 @@
+"""HTTP API for the matching pipeline, on asyncio and the standard library
+
+Endpoints (JSON in, JSON out):
+
+    POST /onboarding  {"responses": {...}}                      -> profile
+    POST /match       {"profile" | "responses", "k", "explain"} -> matches
+    POST /plan        {"profile" | "responses", "charity_id"}   -> plan
+    POST /impact      {"plan": {...}, "months", "chart"}         -> impact report
+    GET  /health, GET /stats, GET /metrics (Prometheus text)
+
+``responses`` are onboarding answers in the shape main() uses; ``profile`` is
+a UserProfile as returned by /onboarding. Run with::
+
+    python -m service --port 8000 [--catalogue charities.cat]
+"""
+import argparse
+import asyncio
+import base64
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+from models import UserProfile, Charity, DonationPlan, ImpactReport
+from charity_database import CharityDatabase
+from agents import OnboardingAgent, DonationPlanningAgent, ImpactVisualizationAgent
+from instrumentation import Instrumentation, default_instruments
+
+MAX_BODY_BYTES = 1 << 20
+
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ServiceError(Exception):
+    """A request the service rejects, with the HTTP status to answer with"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class MatchingService:
+    """Async front-end over the agents
+
+    The event loop only parses and routes requests; onboarding, matching,
+    planning and chart rendering run on ``executor``. Identical /match
+    requests that arrive while one is being computed share its result instead
+    of scoring the catalogue again.
+    """
+
+    def __init__(self, charity_db: Optional[CharityDatabase] = None,
+                 executor: Optional[Executor] = None, max_workers: int = 2,
+                 instruments: Optional[Instrumentation] = None):
+        self.instruments = instruments or default_instruments()
+        self.charity_db = charity_db or CharityDatabase(instruments=self.instruments)
+        self.onboarding_agent = OnboardingAgent(instruments=self.instruments)
+        self.planning_agent = DonationPlanningAgent(instruments=self.instruments)
+        self.impact_agent = ImpactVisualizationAgent(render_mode="headless", instruments=self.instruments)
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers,
+                                                       thread_name_prefix="matching")
+
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.request_stats = {"requests": 0, "errors": 0, "match_computed": 0, "match_coalesced": 0}
+        self._routes: Dict[Tuple[str, str], Callable[[Dict], Awaitable[Union[Dict, str]]]] = {
+            ("POST", "/onboarding"): self.onboarding,
+            ("POST", "/match"): self.match,
+            ("POST", "/plan"): self.plan,
+            ("POST", "/impact"): self.impact,
+            ("GET", "/health"): self.health,
+            ("GET", "/stats"): self.stats,
+            ("GET", "/metrics"): self.metrics,
+        }
+
+    # Endpoints
+
+    async def onboarding(self, body: Dict) -> Dict:
+        profile = await self._run(self._onboard, self._require(body, "responses"))
+        return {"profile": asdict(profile)}
+
+    async def match(self, body: Dict) -> Dict:
+        key = json.dumps(body, sort_keys=True, separators=(",", ":"))
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.request_stats["match_coalesced"] += 1
+            return await asyncio.shield(future)
+
+        self.request_stats["match_computed"] += 1
+        future = asyncio.ensure_future(self._run(self._match, body))
+        self._in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def plan(self, body: Dict) -> Dict:
+        plan = await self._run(self._plan, body)
+        return {"plan": _plan_json(plan)}
+
+    async def impact(self, body: Dict) -> Dict:
+        chart_format = body.get("chart")
+        report = await self._run(self._impact, body)
+        result = _report_json(report)
+
+        if chart_format:
+            if chart_format not in ("png", "svg"):
+                raise ServiceError(400, f"Unsupported chart format {chart_format!r}")
+            chart = await asyncio.wrap_future(self.impact_agent.renderer.submit(report, chart_format))
+            result["chart"] = {"format": chart_format, "data": base64.b64encode(chart).decode("ascii")}
+        return {"report": result}
+
+    async def health(self, body: Dict) -> Dict:
+        return {"status": "ok", "charities": self.charity_db.columns.live_count}
+
+    async def stats(self, body: Dict) -> Dict:
+        return {"service": dict(self.request_stats), "matching": self.charity_db.stats(),
+                "match_cache": self.charity_db.match_cache_info(), "stages": self.instruments.snapshot()}
+
+    async def metrics(self, body: Dict) -> str:
+        return self.instruments.to_prometheus()
+
+    # CPU-bound work, run on the executor
+
+    def _onboard(self, responses: Dict) -> UserProfile:
+        return self.onboarding_agent.conduct_onboarding_batch([responses])[0]
+
+    def _profile(self, body: Dict) -> UserProfile:
+        if "profile" in body:
+            return UserProfile(**body["profile"])
+        if "responses" in body:
+            return self._onboard(body["responses"])
+        raise ServiceError(400, "Request needs a 'profile' or 'responses' object")
+
+    def _match(self, body: Dict) -> Dict:
+        profile = self._profile(body)
+        k = int(body.get("k", 5))
+        if body.get("explain"):
+            matches = self.charity_db.find_top_k(profile, k, explain=True)
+            return {"matches": [_breakdown_json(match) for match in matches]}
+        matches = self.charity_db.find_top_k(profile, k)
+        return {"matches": [{"charity": _charity_json(charity), "score": score}
+                            for charity, score in matches]}
+
+    def _plan(self, body: Dict) -> DonationPlan:
+        profile = self._profile(body)
+        charity = self._charity(self._require(body, "charity_id"))
+        return self.planning_agent.create_plans([profile], [charity])[0]
+
+    def _impact(self, body: Dict) -> ImpactReport:
+        plan = self._require(body, "plan")
+        charity_id = plan.get("charity_id") or plan.get("charity", {}).get("id")
+        if charity_id is None:
+            raise ServiceError(400, "Plan needs a 'charity_id'")
+
+        frequency_multiplier = {"weekly": 52, "monthly": 12, "quarterly": 4}
+        frequency = self._require(plan, "frequency")
+        if frequency not in frequency_multiplier:
+            raise ServiceError(400, f"Unknown frequency {frequency!r}")
+        amount = float(self._require(plan, "amount"))
+
+        donation_plan = DonationPlan(
+            charity=self._charity(charity_id),
+            amount=amount,
+            frequency=frequency,
+            annual_total=amount * frequency_multiplier[frequency],
+            impact_description=plan.get("impact_description", "")
+        )
+        return self.impact_agent.generate_impact_reports([donation_plan], int(body.get("months", 6)))[0]
+
+    def _charity(self, charity_id: str) -> Charity:
+        try:
+            return self.charity_db.get_charity(charity_id)
+        except KeyError:
+            raise ServiceError(404, f"Unknown charity {charity_id!r}")
+
+    @staticmethod
+    def _require(body: Dict, field: str) -> Any:
+        if field not in body:
+            raise ServiceError(400, f"Missing field {field!r}")
+        return body[field]
+
+    async def _run(self, function: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # HTTP
+
+    async def dispatch(self, method: str, path: str,
+                       raw_body: bytes) -> Tuple[int, Optional[Union[Dict, str]]]:
+        """Route one request and return (status, JSON payload or plain text)"""
+        self.request_stats["requests"] += 1
+        if method == "OPTIONS":
+            return 204, None
+
+        handler = self._routes.get((method, path))
+        try:
+            if handler is None:
+                known_path = any(route_path == path for _, route_path in self._routes)
+                raise ServiceError(405 if known_path else 404, f"No route for {method} {path}")
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+            except ValueError:
+                raise ServiceError(400, "Body is not valid JSON")
+            if not isinstance(body, dict):
+                raise ServiceError(400, "Body must be a JSON object")
+            with self.instruments.stage(f"http {method} {path}"):
+                return 200, await handler(body)
+        except ServiceError as error:
+            self.request_stats["errors"] += 1
+            return error.status, {"error": str(error)}
+        except (KeyError, TypeError, ValueError) as error:
+            self.request_stats["errors"] += 1
+            return 400, {"error": f"Invalid request: {error}"}
+        except Exception as error:
+            self.request_stats["errors"] += 1
+            return 500, {"error": f"{type(error).__name__}: {error}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection, honouring keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {"error": "Request body too large"}
+                    keep_alive = False
+                else:
+                    raw_body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target.split("?", 1)[0], raw_body)
+                    keep_alive = (version == "HTTP/1.1"
+                                  and headers.get("connection", "").lower() != "close")
+
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.impact_agent.renderer.shutdown(wait=False)
+
+
+def _response(status: int, payload: Optional[Union[Dict, str]], keep_alive: bool) -> bytes:
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        content_type = "application/json"
+    head = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        # The React front-end is served from a different origin
+        "Access-Control-Allow-Origin: *",
+        "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+        "Access-Control-Allow-Headers: Content-Type",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _charity_json(charity: Charity) -> Dict:
+    return {
+        "id": charity.id,
+        "name": charity.name,
+        "category": charity.category,
+        "description": charity.description,
+        "location": charity.location,
+        "efficiency_score": charity.efficiency_score,
+        "tags": list(charity.tags),
+        "min_donation": charity.min_donation,
+        "impact_metrics": dict(charity.impact_metrics),
+        "donor_retention_rate": charity.donor_retention_rate,
+        "predicted_impact_score": charity.predicted_impact_score,
+    }
+
+
+def _breakdown_json(match) -> Dict:
+    result = {name: value for name, value in vars(match).items() if name != "charity"}
+    result["charity"] = _charity_json(match.charity)
+    return result
+
+
+def _plan_json(plan: DonationPlan) -> Dict:
+    return {
+        "charity": _charity_json(plan.charity),
+        "charity_id": plan.charity.id,
+        "amount": plan.amount,
+        "frequency": plan.frequency,
+        "annual_total": plan.annual_total,
+        "impact_description": plan.impact_description,
+    }
+
+
+def _report_json(report: ImpactReport) -> Dict:
+    timeline = report.timeline.to_list() if hasattr(report.timeline, "to_list") else list(report.timeline)
+    return {
+        "charity_name": report.charity_name,
+        "total_donated": report.total_donated,
+        "impact_metrics": report.impact_metrics,
+        "beneficiaries_helped": report.beneficiaries_helped,
+        "timeline": timeline,
+    }
+
+
+async def serve(host: str, port: int, catalogue_path: Optional[str] = None):
+    service = MatchingService(CharityDatabase(catalogue_path))
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charity matching HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--catalogue", help="memory-mapped charity catalogue (default: sample charities)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.catalogue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import json
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+Subscriber = Callable[["Event"], None]
+
+
+class Event:
+    """A named, timestamped record of something the pipeline did"""
+
+    __slots__ = ("name", "time", "fields")
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self.time = time.time()
+        self.fields = fields
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"event": self.name, "time": self.time, **self.fields}
+
+
+class EventBus:
+    """Delivers structured events to subscribers, and costs nothing without them
+
+    Emitters pass raw values, never preformatted text, and guard the call
+    with ``if bus.enabled:`` so a bus nobody listens to skips building the
+    fields as well. Subscribers run synchronously in the emitting thread;
+    slow ones (files, networks) belong behind a BufferedJsonlSink.
+    """
+
+    def __init__(self, subscribers: Optional[List[Subscriber]] = None):
+        self.subscribers: List[Subscriber] = list(subscribers or [])
+        self.enabled = bool(self.subscribers)
+
+    def subscribe(self, subscriber: Subscriber) -> Subscriber:
+        self.subscribers = self.subscribers + [subscriber]
+        self.enabled = True
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers = [s for s in self.subscribers if s is not subscriber]
+        self.enabled = bool(self.subscribers)
+
+    def emit(self, name: str, /, **fields):
+        if not self.enabled:
+            return
+        event = Event(name, fields)
+        for subscriber in self.subscribers:
+            subscriber(event)
+
+
+_default_bus = EventBus()
+
+
+def default_bus() -> EventBus:
+    """The process-wide bus agents use unless given one; silent until subscribed to"""
+    return _default_bus
+
+
+def _impact_summary(fields: Dict[str, Any]) -> List[str]:
+    lines = [f"\nImpact Summary for {fields['charity_name']}",
+             f"Total Donated: ${fields['total_donated']:.2f}",
+             f"Beneficiaries Helped: {fields['beneficiaries_helped']:,}",
+             f"Donations Made: {fields['donations']}"]
+    if fields["impact_metrics"]:
+        lines.append(f"\nSpecific Impact:")
+        for metric, value in fields["impact_metrics"].items():
+            clean_name = metric.replace('_', ' ').title()
+            lines.append(f"• {clean_name}: {value:.1f}")
+    return lines
+
+
+# Event name -> the console lines it stands for
+CONSOLE_FORMATS: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "process.started": lambda f: ["Welcome to AI-Powered Charity Matching!", "=" * 50],
+    "process.step": lambda f: [f"\nStep {f['number']}: {f['title']}..."],
+    "process.profile_created": lambda f: [f"Profile created for {f['name']}!"],
+    "process.no_match": lambda f: ["No suitable matches found. Please try adjusting your preferences."],
+    "process.simulating": lambda f: [f"Simulating {f['months']} months of donations..."],
+    "process.complete": lambda f: [f"\nProcess Complete! You're now connected with {f['charity_name']}",
+                                   "Your donations are making a real difference in the world! 🌍"],
+    "onboarding.nlp_started": lambda f: ["Analyzing your passions using NLP..."],
+    "onboarding.nlp_analyzed": lambda f: [f"Discovered personality traits: {f['personality_traits']}",
+                                          f"Extracted keywords: {f['keywords'][:5]}"],
+    "onboarding.engagement_predicted": lambda f: [f"Predicted engagement score: {f['score']:.2f}"],
+    "curation.match_found": lambda f: [f"AI-Enhanced Perfect Match Found!",
+                                       f"Overall ML Score: {f['score']:.1%}",
+                                       f"Charity: {f['charity_name']}",
+                                       f"Predicted Impact Score: {f['predicted_impact_score']:.2f}",
+                                       f"Donor Retention Rate: {f['donor_retention_rate']:.1%}",
+                                       f"AI Analysis: {f['explanation']}"],
+    "planning.optimizing": lambda f: ["Optimizing donation amount using ML..."],
+    "planning.plan_created": lambda f: [f"\nML-Optimized Donation Plan",
+                                        f"Original suggestion: ${f['base_amount']:.2f}",
+                                        f"ML-optimized amount: ${f['amount']:.2f} {f['frequency']}",
+                                        f"Annual Total: ${f['annual_total']:.2f}",
+                                        f"Personalized Impact: {f['impact_description']}",
+                                        f"Engagement-optimized for your profile: {f['engagement_score']:.2f}"],
+    "impact.summary": _impact_summary,
+}
+
+
+class ConsoleSubscriber:
+    """Prints the human-readable lines of known events, as the agents used to"""
+
+    def __init__(self, stream: Optional[TextIO] = None,
+                 formats: Optional[Dict[str, Callable[[Dict[str, Any]], List[str]]]] = None):
+        self.stream = stream
+        self.formats = CONSOLE_FORMATS if formats is None else formats
+
+    def __call__(self, event: Event):
+        format_lines = self.formats.get(event.name)
+        if format_lines is not None:
+            print("\n".join(format_lines(event.fields)), file=self.stream or sys.stdout)
+
+
+class BufferedJsonlSink:
+    """Subscriber that writes events as JSON lines from a background thread
+
+    Emitting only appends to an in-memory buffer; a writer thread serializes
+    and writes the buffer every ``flush_interval`` seconds or once it holds
+    ``batch_size`` events. When the writer falls ``max_buffer`` events
+    behind, new events are dropped and counted rather than blocking the
+    request path. ``close`` writes whatever is left.
+    """
+
+    def __init__(self, stream: TextIO, flush_interval: float = 0.5, batch_size: int = 1024,
+                 max_buffer: int = 100000):
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.written = 0
+        self.dropped = 0
+        self._buffer: List[Event] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="telemetry-sink", daemon=True)
+        self._writer.start()
+
+    def __call__(self, event: Event):
+        with self._condition:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append(event)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                events, self._buffer = self._buffer, []
+                closed = self._closed
+            if events:
+                self.stream.write("".join(json.dumps(event.to_dict(), default=str) + "\n"
+                                          for event in events))
+                self.stream.flush()
+                self.written += len(events)
+            if closed:
+                return
+
+    def __enter__(self) -> "BufferedJsonlSink":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,50 @@
+"""CompiledForest must predict exactly what the sklearn forest it came from predicts"""
+import unittest
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from forest_compiler import PYTHON_ROWS, compile_forest, row_code
+
+
+class CompiledForestParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        X = rng.random((2000, 6))
+        y = X[:, 0] * 3 + np.sin(X[:, 1] * 6) - X[:, 2] * X[:, 3] + rng.normal(0, 0.1, len(X))
+        cls.forest = RandomForestRegressor(n_estimators=20, random_state=0).fit(X, y)
+        cls.rows = rng.random((1000, 6))
+        cls.expected = cls.forest.predict(cls.rows)
+
+    def setUp(self):
+        self.compiled = compile_forest(self.forest)
+
+    def test_batches_of_every_path_match(self):
+        for size in list(range(1, PYTHON_ROWS + 2)) + [64, 1000]:
+            with self.subTest(size=size):
+                np.testing.assert_array_equal(self.compiled.predict(self.rows[:size]),
+                                              self.expected[:size])
+
+    def test_predict_row_walks_nodes_without_row_code(self):
+        self.assertFalse(self.compiled.has_row_code)
+        predictions = [self.compiled.predict_row(row) for row in self.rows.tolist()]
+        np.testing.assert_array_equal(predictions, self.expected)
+
+    def test_predict_row_with_row_code(self):
+        self.compiled.load_row_code(row_code(self.compiled))
+        self.assertTrue(self.compiled.has_row_code)
+        predictions = [self.compiled.predict_row(row) for row in self.rows.tolist()]
+        np.testing.assert_array_equal(predictions, self.expected)
+        np.testing.assert_array_equal(self.compiled.predict(self.rows[:PYTHON_ROWS]),
+                                      self.expected[:PYTHON_ROWS])
+
+    def test_rejects_wrong_feature_count(self):
+        with self.assertRaises(ValueError):
+            self.compiled.predict(self.rows[:3, :5])
+        with self.assertRaises(ValueError):
+            self.compiled.predict_row([0.5] * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
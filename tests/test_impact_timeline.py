@@ -0,0 +1,54 @@
+"""Closed-form timelines must equal the per-donation loop they replaced, entry for entry"""
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from impact_timeline import FREQUENCY_DAYS, build_timeline, build_timelines, milestone_text, milestone_tier
+
+NOW = datetime(2026, 3, 14, 15, 9)
+CATEGORIES = ["water_sanitation", "education", "environment", "hunger"]
+
+
+def reference_timeline(amount, frequency, months, category):
+    """ImpactVisualizationAgent._generate_timeline before the columnar rewrite"""
+    days_between = FREQUENCY_DAYS[frequency]
+    timeline = []
+    cumulative_amount = 0
+    for i in range(months * (30 // days_between)):
+        donation_date = NOW - timedelta(days=i * days_between)
+        cumulative_amount += amount
+        milestone = None
+        if i % 5 == 4:  # Every 5th donation
+            milestone = milestone_text(category, milestone_tier(cumulative_amount))
+        timeline.append({
+            "date": donation_date.strftime("%Y-%m-%d"),
+            "amount": amount,
+            "cumulative": cumulative_amount,
+            "milestone": milestone
+        })
+    return list(reversed(timeline))
+
+
+class ImpactTimelineParityTest(unittest.TestCase):
+    def test_single_timelines_match_the_loop(self):
+        for frequency in FREQUENCY_DAYS:
+            for months in (0, 1, 7, 36):
+                for amount in (0.1, 12.5, 33.3):
+                    for category in CATEGORIES:
+                        with self.subTest(frequency=frequency, months=months, amount=amount,
+                                          category=category):
+                            timeline = build_timeline(amount, frequency, months, category, now=NOW)
+                            self.assertEqual(timeline.to_list(),
+                                             reference_timeline(amount, frequency, months, category))
+
+    def test_batched_timelines_match_the_loop(self):
+        amounts = np.array([0.1, 3.0, 7.77, 25.0, 101.0, 250.0])
+        categories = [CATEGORIES[i % len(CATEGORIES)] for i in range(len(amounts))]
+        timelines = build_timelines(amounts, "weekly", 24, categories, now=NOW)
+        for amount, category, timeline in zip(amounts.tolist(), categories, timelines):
+            self.assertEqual(timeline.to_list(), reference_timeline(amount, "weekly", 24, category))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""Keywords must not depend on which answers were analyzed before, or how they were batched"""
+import unittest
+
+from nlp_processor import NLPProcessor
+from benchmarks.sentiment_accuracy import load_corpus
+
+
+class KeywordParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.texts = load_corpus()[:50]
+
+    def test_single_and_batch_paths_match(self):
+        single = NLPProcessor()
+        batch = NLPProcessor()
+        expected = [single.extract_interests_from_text(text)['keywords'] for text in self.texts]
+        keywords = [result['keywords'] for result in batch.extract_interests_from_texts(self.texts)]
+        self.assertEqual(keywords, expected)
+
+    def test_repeated_text_keeps_its_keywords(self):
+        processor = NLPProcessor()
+        first = processor.extract_interests_from_text(self.texts[0])['keywords']
+        processor.extract_interests_from_texts(self.texts)
+        self.assertEqual(processor.extract_interests_from_text(self.texts[0])['keywords'], first)
+
+    def test_learning_ranks_before_counting_the_batch(self):
+        learning = NLPProcessor(learn_keywords=True)
+        frozen = NLPProcessor()
+        self.assertEqual(learning.extract_interests_from_texts(self.texts),
+                         frozen.extract_interests_from_texts(self.texts))
+        self.assertEqual(learning.keyword_extractor.n_documents, len(self.texts))
+        self.assertEqual(frozen.keyword_extractor.n_documents, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Keyword matching accepts inflections and compounds but never a negated keyword"""
+import unittest
+
+from nlp_processor import NLPProcessor
+
+
+class KeywordScannerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.processor = NLPProcessor()
+
+    def test_negations_score_zero(self):
+        for word in ("uncaring", "unhelpful", "careless", "hopeless", "heartless", "helpless",
+                     "hopelessness", "inaction"):
+            with self.subTest(word=word):
+                results = self.processor.extract_interests_from_text(f"i am {word}")
+                self.assertEqual(set(results['personality_traits'].values()), {0.0})
+                self.assertEqual(results['emotional_drivers'], [])
+
+    def test_inflections_and_compounds_match(self):
+        matches = self.processor.keyword_scanner.scan("caring families heartbreaking healthcare")
+        self.assertEqual(matches.keywords('personality', 'empathetic'), {'care'})
+        self.assertEqual(matches.keywords('personality', 'community-oriented'), {'family'})
+        self.assertEqual(matches.keywords('emotion', 'empathy'), {'care', 'heart'})
+        self.assertEqual(matches.keywords('category', 'health'), {'health', 'care'})
+
+    def test_agentive_form_does_not_match(self):
+        matches = self.processor.keyword_scanner.scan("careers")
+        self.assertEqual(matches.keywords('personality', 'empathetic'), frozenset())
+
+
+if __name__ == "__main__":
+    unittest.main()
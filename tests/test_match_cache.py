@@ -0,0 +1,82 @@
+"""MatchCache hits must rank exactly as scoring from scratch, for every catalogue using the cache"""
+import copy
+import os
+import tempfile
+import unittest
+
+from agents import OnboardingAgent
+from charity_catalogue import write_catalogue
+from charity_database import CharityDatabase
+from match_cache import MatchCache
+from benchmarks.generators import charities, responses
+
+
+def uncached(path=None) -> CharityDatabase:
+    charity_db = CharityDatabase(path)
+    charity_db.match_cache = None
+    return charity_db
+
+
+def ranking(matches):
+    return [(charity.id, score) for charity, score in matches]
+
+
+class MatchCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.paths = []
+        for seed in (0, 1):
+            path = os.path.join(cls.directory.name, f"charities-{seed}.cat")
+            write_catalogue(charities(200, seed=seed), path)
+            cls.paths.append(path)
+        cls.users = OnboardingAgent().conduct_onboarding_batch(list(responses(20, seed=5)))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_cached_matches_equal_uncached(self):
+        cached = CharityDatabase(self.paths[0])
+        reference = uncached(self.paths[0])
+        # Repeat visitors hit the cache; a changed engagement score reuses the entry
+        profiles = self.users * 2
+        for user, engagement in zip(self.users, (0.0, 0.35, 0.8, 1.0)):
+            variant = copy.copy(user)
+            variant.predicted_engagement_score = engagement
+            profiles.append(variant)
+        for user in profiles:
+            self.assertEqual(ranking(cached.find_matches(user)), ranking(reference.find_matches(user)))
+            self.assertEqual(cached.find_top_k(user, 3, explain=True),
+                             reference.find_top_k(user, 3, explain=True))
+        self.assertGreater(cached.match_cache_info()["hits"], 0)
+
+    def test_catalogue_changes_invalidate_entries(self):
+        cached = CharityDatabase(self.paths[0])
+        reference = uncached(self.paths[0])
+        for user in self.users:
+            cached.find_matches(user)
+        for charity_db in (cached, reference):
+            charity_db.remove_charity(list(charity_db.charities)[0].id)
+            for charity in charities(10, seed=3):
+                charity.id = f"added_{charity.id}"
+                charity_db.add_charity(charity)
+        for user in self.users:
+            self.assertEqual(ranking(cached.find_matches(user)), ranking(reference.find_matches(user)))
+        self.assertGreater(cached.match_cache_info()["invalidations"], 0)
+
+    def test_shared_cache_keeps_catalogues_apart(self):
+        shared = MatchCache()
+        databases = [CharityDatabase(path, match_cache=shared) for path in self.paths]
+        references = [uncached(path) for path in self.paths]
+        # Alternate so every lookup could be answered by the other catalogue's entry
+        for user in self.users * 2:
+            for charity_db, reference in zip(databases, references):
+                self.assertEqual(ranking(charity_db.find_matches(user)),
+                                 ranking(reference.find_matches(user)))
+        self.assertGreater(shared.info()["hits"], 0)
+        self.assertEqual(shared.info()["catalogues"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Every MicroBatcher caller gets a result or an error, whatever the batch function does"""
+import threading
+import unittest
+
+from micro_batcher import MicroBatcher
+
+
+class Abort(BaseException):
+    pass
+
+
+class MicroBatcherTest(unittest.TestCase):
+    def test_results_in_submission_order(self):
+        batcher = MicroBatcher(lambda items: [item * 2 for item in items])
+        self.assertEqual([batcher.submit(item) for item in range(5)], [0, 2, 4, 6, 8])
+
+    def test_short_result_raises(self):
+        batcher = MicroBatcher(lambda items: items[:-1])
+        with self.assertRaises(ValueError):
+            batcher.submit(1)
+        self.assertEqual(batcher._pending, [])
+
+    def test_base_exception_resolves_the_whole_batch(self):
+        def batch_fn(items):
+            raise Abort()
+
+        # The leader waits long enough for the other caller to join its batch
+        batcher = MicroBatcher(batch_fn, max_wait=0.2)
+        outcomes = {}
+
+        def call(item):
+            try:
+                outcomes[item] = batcher.submit(item)
+            except BaseException as error:
+                outcomes[item] = error
+
+        threads = [threading.Thread(target=call, args=(item,)) for item in ("first", "second")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(batcher.batches, 1)
+        # The leading caller re-raises the interruption; the other gets an error, not a hang
+        self.assertEqual(sorted(type(outcome).__name__ for outcome in outcomes.values()),
+                         ["Abort", "RuntimeError"])
+
+
+if __name__ == "__main__":
+    unittest.main()
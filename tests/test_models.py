@@ -0,0 +1,31 @@
+"""Compact models must round-trip to the profiles and charities they were built from"""
+import unittest
+
+from agents import OnboardingAgent
+from ml_engine import MLEngine
+from models import CompactCharity, CompactUserProfile, TagVocabulary
+from benchmarks.generators import charities, responses
+
+
+class CompactModelTest(unittest.TestCase):
+    def test_user_profile_round_trip_keeps_engagement_features(self):
+        engine = MLEngine()
+        for profile in OnboardingAgent().conduct_onboarding_batch(list(responses(30, seed=2))):
+            restored = CompactUserProfile.from_profile(profile).to_profile()
+            self.assertEqual(restored, profile)
+            self.assertEqual(engine._extract_user_features(restored), engine._extract_user_features(profile))
+
+    def test_charity_round_trip(self):
+        for charity in charities(30):
+            compact = CompactCharity.from_charity(charity)
+            self.assertEqual(compact.tags, charity.tags)
+            self.assertEqual(compact.semantic_keywords, charity.semantic_keywords)
+
+    def test_vocabulary_past_uint16(self):
+        vocabulary = TagVocabulary()
+        tags = [f"tag{i}" for i in range(70000)]
+        self.assertEqual(vocabulary.decode(vocabulary.encode(tags)), tags)
+
+
+if __name__ == "__main__":
+    unittest.main()
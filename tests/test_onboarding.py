@@ -0,0 +1,25 @@
+"""Batch onboarding must build exactly the profiles the single-response path builds"""
+import unittest
+
+from agents import OnboardingAgent
+from benchmarks.generators import responses
+
+
+class OnboardingParityTest(unittest.TestCase):
+    def test_batch_equals_single_path(self):
+        responses_list = list(responses(100, seed=3))
+        # Users who skip the free-text question take the no-NLP branch
+        for skipped in responses_list[::7]:
+            skipped['free_text_interests'] = ''
+
+        agent = OnboardingAgent()
+        single = [agent.conduct_onboarding(answers) for answers in responses_list]
+        # 100 rows cross the size where batch prediction moves to sklearn; 1 and 20 do not
+        for size in (1, 20, 100):
+            with self.subTest(size=size):
+                self.assertEqual(OnboardingAgent().conduct_onboarding_batch(responses_list[:size]),
+                                 single[:size])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""The lexicon backend must score exactly as TextBlob, batched, cached or not"""
+import unittest
+
+from nlp_processor import NLPProcessor
+from sentiment import CachedSentiment, LexiconSentiment, TextBlobSentiment
+from benchmarks.sentiment_accuracy import load_corpus
+
+
+class SentimentParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        raw = load_corpus()
+        clean = NLPProcessor()._clean_text
+        cls.corpora = {"raw": raw, "cleaned": [clean(text) for text in raw]}
+        cls.lexicon = LexiconSentiment()
+
+    def test_lexicon_equals_textblob(self):
+        for name, texts in self.corpora.items():
+            with self.subTest(corpus=name):
+                self.assertEqual(self.lexicon.polarities(texts), TextBlobSentiment().polarities(texts))
+
+    def test_batch_equals_single_texts(self):
+        for name, texts in self.corpora.items():
+            with self.subTest(corpus=name):
+                self.assertEqual(self.lexicon.polarities(texts),
+                                 [self.lexicon.polarity(text) for text in texts])
+
+    def test_cache_returns_the_backend_scores(self):
+        texts = self.corpora["raw"]
+        cached = CachedSentiment(LexiconSentiment(self.lexicon.lexicon), maxsize=64)
+        expected = self.lexicon.polarities(texts)
+        # Twice through a cache smaller than the corpus: hits, misses and evictions
+        self.assertEqual(cached.polarities(texts), expected)
+        self.assertEqual(cached.polarities(texts[::-1]), expected[::-1])
+        self.assertGreater(cached.cache_info()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
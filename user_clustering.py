@@ -0,0 +1,184 @@
+import os
+import numpy as np
+from typing import Callable, Iterable, List, Optional, Sequence
+from models import ClusterSummary
+
+
+class StreamingKMeans:
+    """Mini-batch k-means over a stream of feature chunks
+
+    The update is the one MiniBatchKMeans uses (Sculley, 2010): each chunk is
+    assigned to its nearest centroids, and every centroid moves towards the
+    mean of its new members with a step of (new members / all members seen),
+    so it stays the running mean of everything assigned to it. The state is
+    just centroids and per-centroid counts, which ``save`` writes and
+    ``load`` restores, so fitting resumes where it stopped and new users are
+    assigned in O(k) without refitting. Centroids are seeded with k-means++
+    on the first chunk; if it has fewer rows than ``n_clusters``, the rest
+    are seeded from later chunks, by the same distance-weighted draw, and
+    until then rows are assigned among the seeded ones.
+
+    Per-cluster statistics (size, feature sums, squared distances) are
+    accumulated for every row assigned through ``partial_fit`` or
+    ``assign(..., track=True)``, against the centroids of that moment.
+    """
+
+    def __init__(self, n_clusters: int = 3, feature_names: Optional[Sequence[str]] = None,
+                 random_state: int = 42):
+        self.n_clusters = n_clusters
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.random_state = random_state
+        self.centroids: Optional[np.ndarray] = None  # (n_clusters, n_features)
+        self.seeded = 0  # centroids[:seeded] are in use; the rest are NaN until seeded
+        self.counts = np.zeros(n_clusters, dtype=np.int64)
+        self.sizes = np.zeros(n_clusters, dtype=np.int64)
+        self.feature_sums: Optional[np.ndarray] = None
+        self.squared_distance_sums = np.zeros(n_clusters, dtype=np.float64)
+
+    @property
+    def fitted(self) -> bool:
+        return self.centroids is not None
+
+    def partial_fit(self, X: np.ndarray) -> np.ndarray:
+        """Update centroids with one chunk and return its cluster ids"""
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return np.empty(0, dtype=np.int32)
+        if self.seeded < self.n_clusters:
+            self._seed(X)
+
+        labels, squared_distances = self._nearest(X)
+        members = np.bincount(labels, minlength=self.n_clusters)
+        sums = self._grouped_sums(X, labels)
+
+        updated = members > 0
+        self.counts += members
+        step = members[updated] / self.counts[updated]
+        means = sums[updated] / members[updated, np.newaxis]
+        self.centroids[updated] += step[:, np.newaxis] * (means - self.centroids[updated])
+
+        self._track(X, labels, squared_distances)
+        return labels
+
+    def fit_stream(self, chunks: Iterable[np.ndarray],
+                   on_labels: Optional[Callable[[np.ndarray], None]] = None) -> int:
+        """partial_fit every chunk in turn, passing each chunk's cluster ids to ``on_labels``
+
+        Returns the number of rows seen; no labels are kept.
+        """
+        rows = 0
+        for X in chunks:
+            labels = self.partial_fit(X)
+            rows += len(labels)
+            if on_labels is not None:
+                on_labels(labels)
+        return rows
+
+    def assign(self, X: np.ndarray, track: bool = False) -> np.ndarray:
+        """Nearest-centroid cluster ids, without moving the centroids"""
+        if self.centroids is None:
+            raise RuntimeError("clusters are not fitted yet")
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        labels, squared_distances = self._nearest(X)
+        if track:
+            self._track(X, labels, squared_distances)
+        return labels
+
+    def summaries(self) -> List[ClusterSummary]:
+        """Per-cluster size, centroid and feature means"""
+        if self.centroids is None:
+            return []
+        names = self.feature_names or [f"feature_{i}" for i in range(self.centroids.shape[1])]
+        summaries = []
+        for cluster in range(self.seeded):
+            size = int(self.sizes[cluster])
+            means = self.feature_sums[cluster] / size if size else np.zeros(len(names))
+            summaries.append(ClusterSummary(
+                cluster_id=cluster,
+                size=size,
+                centroid=dict(zip(names, self.centroids[cluster].tolist())),
+                feature_means=dict(zip(names, means.tolist())),
+                mean_squared_distance=float(self.squared_distance_sums[cluster] / size) if size else 0.0
+            ))
+        return summaries
+
+    def save(self, path: str):
+        """Write centroids, counts and statistics atomically to an .npz file"""
+        if self.centroids is None:
+            raise RuntimeError("clusters are not fitted yet")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            np.savez(handle, centroids=self.centroids, counts=self.counts, sizes=self.sizes,
+                     feature_sums=self.feature_sums,
+                     squared_distance_sums=self.squared_distance_sums, seeded=np.array(self.seeded),
+                     feature_names=np.array(self.feature_names or [], dtype=str),
+                     random_state=np.array(self.random_state))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "StreamingKMeans":
+        with np.load(path) as saved:
+            centroids = saved["centroids"]
+            clusters = cls(n_clusters=len(centroids),
+                           feature_names=saved["feature_names"].tolist() or None,
+                           random_state=int(saved["random_state"]))
+            clusters.centroids = centroids.copy()
+            clusters.counts = saved["counts"].copy()
+            clusters.sizes = saved["sizes"].copy()
+            clusters.feature_sums = saved["feature_sums"].copy()
+            clusters.squared_distance_sums = saved["squared_distance_sums"].copy()
+            # Files written before partial seeding existed are fully seeded
+            clusters.seeded = int(saved["seeded"]) if "seeded" in saved.files else len(centroids)
+        return clusters
+
+    def _seed(self, X: np.ndarray):
+        """k-means++ seeding of the centroids not yet seeded, from this chunk"""
+        if self.seeded == 0 and len(X) >= self.n_clusters:
+            from sklearn.cluster import kmeans_plusplus
+
+            centroids, _ = kmeans_plusplus(X, self.n_clusters, random_state=self.random_state)
+            self.centroids = centroids.astype(np.float64)
+            self.feature_sums = np.zeros_like(self.centroids)
+            self.seeded = self.n_clusters
+            return
+
+        if self.centroids is None:
+            self.centroids = np.full((self.n_clusters, X.shape[1]), np.nan)
+            self.feature_sums = np.zeros_like(self.centroids)
+        # Too few rows for sklearn: draw each seed with probability proportional
+        # to its squared distance from the seeds so far, as k-means++ does
+        rng = np.random.default_rng([self.random_state, self.seeded, int(self.counts.sum())])
+        while self.seeded < self.n_clusters:
+            if self.seeded == 0:
+                weights = np.ones(len(X))
+            else:
+                # Computed directly so rows on a seed weigh exactly zero
+                offsets = X[:, np.newaxis, :] - self.centroids[np.newaxis, :self.seeded]
+                weights = (offsets ** 2).sum(axis=2).min(axis=1)
+            total = weights.sum()
+            if total <= 0:  # every row already sits on a seed
+                return
+            self.centroids[self.seeded] = X[rng.choice(len(X), p=weights / total)]
+            self.seeded += 1
+
+    def _nearest(self, X: np.ndarray):
+        """Closest seeded centroid of each row and the squared distance to it"""
+        centroids = self.centroids[:self.seeded]
+        # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, for k centroids per row
+        squared = ((X ** 2).sum(axis=1)[:, np.newaxis] - 2 * X @ centroids.T
+                   + (centroids ** 2).sum(axis=1)[np.newaxis, :])
+        labels = squared.argmin(axis=1).astype(np.int32)
+        return labels, np.maximum(squared[np.arange(len(X)), labels], 0.0)
+
+    def _track(self, X: np.ndarray, labels: np.ndarray, squared_distances: np.ndarray):
+        self.sizes += np.bincount(labels, minlength=self.n_clusters)
+        self.feature_sums += self._grouped_sums(X, labels)
+        self.squared_distance_sums += np.bincount(labels, weights=squared_distances,
+                                                  minlength=self.n_clusters)
+
+    def _grouped_sums(self, X: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """Per-cluster column sums of X"""
+        return np.stack([np.bincount(labels, weights=X[:, column], minlength=self.n_clusters)
+                         for column in range(X.shape[1])], axis=1)